@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
 from app.api.endpoints import chat as chat_endpoints
+from app.api.endpoints import system as system_endpoints
 
 # Create the API router
 api_router = APIRouter()
@@ -12,6 +13,13 @@ api_router.include_router(
     tags=["chat"]
 )
 
+# Include operational endpoints
+api_router.include_router(
+    system_endpoints.router,
+    prefix="/system",
+    tags=["system"]
+)
+
 @api_router.get("")
 async def api_v1_root():
     return {"message": "Welcome to TravelPal API v1"}
@@ -5,7 +5,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from typing import Dict, Any
 
-from app.services.langchain.agent import travel_agent
+from app.services.langchain.agent import get_travel_agent
 
 router = APIRouter()
 
@@ -26,6 +26,9 @@ async def chat(message: Dict[str, str]) -> Dict[str, str]:
             raise HTTPException(status_code=400, detail="Message text is required")
             
         # Get response from the travel agent
+        travel_agent = get_travel_agent()
+        if travel_agent is None:
+            raise HTTPException(status_code=503, detail="The travel agent is not available")
         response = await travel_agent.process_message(user_message)
         
         return {"response": response}
@@ -1,43 +1,117 @@
-from typing import Any, List
+from typing import Any, List, Optional, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.core.config import settings
+from app.crud.base import InvalidCursor
 
 router = APIRouter()
 
+def _check_batch_size(batch: Sequence[Any]) -> None:
+    if len(batch) > settings.BULK_MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_MAX_BATCH_SIZE} items per bulk request",
+        )
+
+async def _check_owned(
+    db: AsyncSession, ids: Sequence[int], current_user: models.User
+) -> None:
+    items = await crud.item.get_many(db, ids)
+    if len(items) != len(set(ids)):
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not crud.user.is_superuser(current_user) and any(
+        item.owner_id != current_user.id for item in items
+    ):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+
 @router.get("/", response_model=List[schemas.Item])
-def read_items(
-    db: Session = Depends(deps.get_db),
+async def read_items(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(
+        None, description="Keyset pagination: pass an empty cursor for the first page, then X-Next-Cursor"
+    ),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve items.
     """
-    items = crud.item.get_multi(db, skip=skip, limit=limit)
+    if cursor is None:
+        return await crud.item.get_multi(db, skip=skip, limit=limit)
+    try:
+        items, next_cursor = await crud.item.get_page(db, cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     return items
 
 @router.post("/", response_model=schemas.Item)
-def create_item(
+async def create_item(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     item_in: schemas.ItemCreate,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new item.
     """
-    item = crud.item.create_with_owner(db=db, obj_in=item_in, owner_id=current_user.id)
+    item = await crud.item.create_with_owner(db=db, obj_in=item_in, owner_id=current_user.id)
     return item
 
+@router.post("/bulk", response_model=List[schemas.Item])
+async def create_items_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    items_in: List[schemas.ItemCreate],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create many items in one statement.
+    """
+    _check_batch_size(items_in)
+    return await crud.item.create_many_with_owner(db, objs_in=items_in, owner_id=current_user.id)
+
+@router.put("/bulk", response_model=List[schemas.Item])
+async def update_items_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    items_in: List[schemas.ItemBulkUpdate],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Update many items in one statement.
+    """
+    _check_batch_size(items_in)
+    await _check_owned(db, [item_in.id for item_in in items_in], current_user)
+    return await crud.item.update_many(
+        db, objs_in=[item_in.dict(exclude_unset=True) for item_in in items_in]
+    )
+
+@router.post("/bulk/delete", response_model=schemas.BulkDeleteResult)
+async def delete_items_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    items_in: schemas.ItemBulkDelete,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Delete many items in one statement.
+    """
+    _check_batch_size(items_in.ids)
+    await _check_owned(db, items_in.ids, current_user)
+    return {"deleted": await crud.item.remove_many(db, ids=items_in.ids)}
+
 @router.put("/{id}", response_model=schemas.Item)
-def update_item(
+async def update_item(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
     item_in: schemas.ItemUpdate,
     current_user: models.User = Depends(deps.get_current_active_user),
@@ -45,25 +119,25 @@ def update_item(
     """
     Update an item.
     """
-    item = crud.item.get(db=db, id=id)
+    item = await crud.item.get(db=db, id=id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    item = crud.item.update(db=db, db_obj=item, obj_in=item_in)
+    item = await crud.item.update(db=db, db_obj=item, obj_in=item_in)
     return item
 
 @router.get("/{id}", response_model=schemas.Item)
-def read_item(
+async def read_item(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get item by ID.
     """
-    item = crud.item.get(db=db, id=id)
+    item = await crud.item.get(db=db, id=id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
@@ -71,19 +145,19 @@ def read_item(
     return item
 
 @router.delete("/{id}", response_model=schemas.Item)
-def delete_item(
+async def delete_item(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Delete an item.
     """
-    item = crud.item.get(db=db, id=id)
+    item = await crud.item.get(db=db, id=id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    item = crud.item.remove(db=db, id=id)
+    item = await crud.item.remove(db=db, id=id)
     return item
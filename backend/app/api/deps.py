@@ -1,11 +1,15 @@
 from typing import Generator
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import crud
+from app.core import auth_cache
 from app.core.config import settings
+from app.db.async_session import get_async_db  # noqa: F401 (re-exported for endpoints)
 from app.db.session import SessionLocal
 from app.models.user import User
 from app.schemas.token import TokenPayload
@@ -21,32 +25,48 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(reusable_oauth2)
 ) -> User:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=["HS256"]
-        )
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
-        )
-    user = db.query(User).filter(User.id == token_data.sub).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    return await get_user_from_token(db, token)
+
+async def get_user_from_token(db: AsyncSession, token: str) -> User:
+    """Resolve a bearer token to its user, through the auth caches."""
+    token_cache, user_cache = auth_cache.token_cache, auth_cache.user_cache
+    user_id = token_cache.get(token) if token_cache is not None else None
+    if user_id is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=["HS256"]
+            )
+            token_data = TokenPayload(**payload)
+        except (jwt.JWTError, ValidationError):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Could not validate credentials",
+            )
+        user_id = token_data.sub
+        if token_cache is not None and user_id is not None:
+            token_cache.set(token, user_id, expires_at=payload.get("exp"))
+
+    # The session only connects if the user has to be loaded
+    user = await auth_cache.user_cache_call(user_cache.get, user_id) if user_cache is not None else None
+    if user is None:
+        user = await crud.user.get(db, user_id) if user_id is not None else None
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        if user_cache is not None:
+            await auth_cache.user_cache_call(user_cache.set, user)
     return user
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_active_superuser(
+async def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if not current_user.is_superuser:
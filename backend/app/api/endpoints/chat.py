@@ -1,14 +1,25 @@
 """
 Chat API endpoints for the TravelPal application.
 """
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, Optional
-from pydantic import BaseModel, Field
+import time
+from contextlib import aclosing
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import AsyncIterator, Awaitable, Dict, Any, Literal, Optional, TypeVar, Union
+from jose import jwt
+from pydantic import BaseModel, Field, ValidationError
 
-from app.services.langchain.agent import travel_agent
-from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.db.async_session import AsyncSessionLocal
+from app.services.langchain.admission import AdmissionRejected
+from app.services.langchain.agent import TravelAgent, get_travel_agent
+from app.services.langchain.resilience import CircuitOpenError
+from app.services.langchain.sessions import DEFAULT_SESSION_ID
+from app.api.deps import get_current_active_superuser, get_current_active_user, get_user_from_token
 from app.models.user import User
 
 # Configure logger
@@ -16,9 +27,75 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+T = TypeVar("T")
+
+# Logged for requests whose client disconnected before the response (nginx convention)
+CLIENT_CLOSED_REQUEST = 499
+
 class ChatMessage(BaseModel):
     """Request model for chat messages."""
     text: str = Field(..., min_length=1, description="The message text to process")
+    session_id: Optional[str] = Field(
+        None,
+        max_length=64,
+        description="Conversation session to continue; defaults to the user's default session",
+    )
+
+
+def get_chat_agent() -> TravelAgent:
+    """Return the travel agent, building it on the first chat request."""
+    agent = get_travel_agent()
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The travel agent is not available",
+        )
+    return agent
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client disconnects before its response is ready."""
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # The body has been read, so the next ASGI message is the disconnect
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _until_disconnected(request: Request, work: Awaitable[T]) -> T:
+    """Await ``work``, cancelling it as soon as the client disconnects.
+
+    Cancelling drops the provider request, or the request's place in the
+    admission queue, and frees its concurrency slot right away.
+
+    Raises:
+        ClientDisconnected: If the client went away first.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    if task.cancelled():
+        raise ClientDisconnected()
+    return task.result()
+
+
+def _overloaded(e: Union[AdmissionRejected, CircuitOpenError]) -> HTTPException:
+    """Build the 503 returned when the agent sheds a request or the provider is down."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="The travel assistant is busy. Please try again shortly.",
+        headers={"Retry-After": str(int(e.retry_after))},
+    )
 
 @router.post(
     "",  # Empty path since the router is already adding the /chat prefix
@@ -28,7 +105,8 @@ class ChatMessage(BaseModel):
         200: {"description": "Successful response with chat message"},
         400: {"description": "Invalid request format or missing required fields"},
         401: {"description": "Not authenticated"},
-        500: {"description": "Internal server error"}
+        500: {"description": "Internal server error"},
+        503: {"description": "Overloaded; retry after the Retry-After delay"}
     },
     summary="Process a chat message",
     description="Process a chat message and return the agent's response.",
@@ -36,14 +114,21 @@ class ChatMessage(BaseModel):
 )
 async def chat(
     message: ChatMessage,
-    current_user: User = Depends(get_current_active_user)
-) -> Dict[str, str]:
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    agent: TravelAgent = Depends(get_chat_agent),
+) -> Union[Dict[str, str], Response]:
     """
     Process a chat message and return the agent's response.
     
+    The generation is cancelled if the client disconnects while it is queued
+    or waiting for the provider.
+    
     Args:
         message: The chat message to process
+        request: The HTTP request, watched for a client disconnect
         current_user: The authenticated user
+        agent: The travel agent
         
     Returns:
         Dict containing the agent's response
@@ -52,10 +137,19 @@ async def chat(
         HTTPException: If there's an error processing the message
     """
     try:
-        # Get response from the travel agent (synchronous call)
-        response = travel_agent.process_message(message.text)
+        # Get response from the travel agent without blocking the event loop
+        response = await _until_disconnected(request, agent.process_message(
+            message.text,
+            user_id=current_user.id,
+            session_id=message.session_id,
+        ))
         return {"response": response}
         
+    except ClientDisconnected:
+        logger.info(f"Client of user {current_user.id} disconnected; chat generation cancelled")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except (AdmissionRejected, CircuitOpenError) as e:
+        raise _overloaded(e)
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
@@ -67,3 +161,347 @@ async def chat(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while processing your message. Please try again later."
         )
+
+
+def _sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _ndjson_event(data: Dict[str, Any]) -> str:
+    """Format one newline-delimited JSON chunk."""
+    return json.dumps(data) + "\n"
+
+
+def _stream_error(e: Exception) -> Dict[str, Any]:
+    """Describe an error raised after a stream has started, for in-band reporting."""
+    if isinstance(e, (AdmissionRejected, CircuitOpenError)):
+        return {
+            "detail": "The travel assistant is busy. Please try again shortly.",
+            "retry_after": e.retry_after,
+        }
+    logger.error(f"Error streaming chat message: {str(e)}", exc_info=True)
+    return {"detail": "An error occurred while processing your message. Please try again later."}
+
+
+async def _stream_events(
+    agent: TravelAgent, message: ChatMessage, user_id: int, fmt: str
+) -> AsyncIterator[str]:
+    """Relay the agent's token stream in the requested wire format."""
+    parts = []
+    try:
+        async with aclosing(agent.stream_message(
+            message.text, user_id=user_id, session_id=message.session_id
+        )) as tokens:
+            async for token in tokens:
+                parts.append(token)
+                if fmt == "sse":
+                    yield _sse_event({"token": token})
+                else:
+                    yield _ndjson_event({"token": token})
+    except Exception as e:
+        # Headers are already sent, so errors are reported in-band
+        data = _stream_error(e)
+        if fmt == "sse":
+            yield _sse_event(data, event="error")
+        else:
+            yield _ndjson_event({"error": data.pop("detail"), **data})
+        return
+    
+    response = "".join(parts)
+    if fmt == "sse":
+        yield _sse_event({"response": response}, event="done")
+    else:
+        yield _ndjson_event({"done": True, "response": response})
+
+@router.post(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "Stream of response tokens"},
+        400: {"description": "Invalid request format or missing required fields"},
+        401: {"description": "Not authenticated"},
+        503: {"description": "Overloaded; retry after the Retry-After delay"},
+    },
+    summary="Stream a chat message response",
+    description=(
+        "Process a chat message and stream the agent's response token by token, "
+        "as Server-Sent Events (default) or newline-delimited JSON."
+    ),
+    tags=["chat"]
+)
+async def chat_stream(
+    message: ChatMessage,
+    format: Literal["sse", "ndjson"] = Query("sse", description="Wire format of the stream"),
+    current_user: User = Depends(get_current_active_user),
+    agent: TravelAgent = Depends(get_chat_agent),
+) -> StreamingResponse:
+    """
+    Process a chat message and stream the agent's response.
+    
+    Each token is sent as soon as the provider produces it. The final event
+    carries the assembled response; errors after the stream has started are
+    sent as an ``error`` event.
+    
+    Args:
+        message: The chat message to process
+        format: ``sse`` for Server-Sent Events or ``ndjson`` for chunked JSON lines
+        current_user: The authenticated user
+        agent: The travel agent
+        
+    Returns:
+        StreamingResponse: The token stream
+        
+    Raises:
+        HTTPException: 503 if the agent is already overloaded
+    """
+    # Shed load before any response bytes are sent
+    try:
+        agent.resilience.breaker.reject_if_open()
+        agent.admission.check(current_user.id)
+    except (AdmissionRejected, CircuitOpenError) as e:
+        raise _overloaded(e)
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    events = _stream_events(agent, message, current_user.id, format)
+    return StreamingResponse(
+        events,
+        media_type=media_type,
+        # Starlette cancels the stream when the client disconnects; closing the
+        # generator too ends the provider request even if it was mid-send
+        background=BackgroundTask(events.aclose),
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx)
+            "Content-Encoding": "identity",  # Keep GZipMiddleware from buffering tokens
+        },
+    )
+
+class _SlowConsumer(Exception):
+    """Raised when a WebSocket client stops reading for longer than the send timeout."""
+
+
+class ChatSocket:
+    """One WebSocket chat connection bound to a user's conversation session.
+
+    The connection runs at most one generation at a time; it streams tokens
+    as they arrive and can be cancelled with a ``cancel`` frame. Tokens are
+    sent as the provider yields them, so a client that reads slowly slows
+    its own generation down, and one that stops reading is disconnected.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        agent: TravelAgent,
+        user_id: int,
+        session_id: Optional[str],
+        expires_at: Optional[float] = None,
+    ) -> None:
+        self.websocket = websocket
+        self.agent = agent
+        self.user_id = user_id
+        self.session_id = session_id or DEFAULT_SESSION_ID
+        self.expires_at = expires_at
+        self._generation: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+        self._closed = False
+
+    @property
+    def generating(self) -> bool:
+        return self._generation is not None and not self._generation.done()
+
+    async def send(self, data: Dict[str, Any]) -> None:
+        async with self._send_lock:
+            try:
+                await asyncio.wait_for(
+                    self.websocket.send_json(data), settings.CHAT_WS_SEND_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                raise _SlowConsumer()
+
+    async def run(self) -> None:
+        """Serve the connection until the client disconnects or goes idle."""
+        try:
+            await self.send({"type": "ready", "session_id": self.session_id})
+            while not self._closed:
+                try:
+                    raw = await asyncio.wait_for(
+                        self.websocket.receive_text(), settings.CHAT_WS_IDLE_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    if self.generating:
+                        continue
+                    await self._close(status.WS_1000_NORMAL_CLOSURE)
+                    return
+                await self._handle(raw)
+        except (WebSocketDisconnect, _SlowConsumer):
+            pass
+        finally:
+            await self.cancel()
+
+    async def _handle(self, raw: str) -> None:
+        try:
+            frame = json.loads(raw)
+            kind = frame.get("type")
+        except (ValueError, AttributeError):
+            await self.send({"type": "error", "detail": "Frames must be JSON objects"})
+            return
+
+        if kind == "ping":
+            await self.send({"type": "pong"})
+        elif kind == "cancel":
+            if self.generating:
+                await self.cancel()
+                await self.send({"type": "cancelled"})
+        elif kind == "message":
+            await self._start(frame)
+        else:
+            await self.send({"type": "error", "detail": f"Unknown frame type: {kind!r}"})
+
+    async def _start(self, frame: Dict[str, Any]) -> None:
+        if self.expires_at is not None and time.time() >= self.expires_at:
+            await self.send({"type": "error", "detail": "The access token has expired"})
+            await self._close(status.WS_1008_POLICY_VIOLATION)
+            return
+        if self.generating:
+            await self.send({
+                "type": "error",
+                "detail": "A response is already being generated; cancel it or wait for it to finish",
+            })
+            return
+        try:
+            message = ChatMessage(text=frame.get("text"), session_id=self.session_id)
+        except ValidationError:
+            await self.send({"type": "error", "detail": "Message text is required"})
+            return
+        try:
+            # Shed load before a generation is started
+            self.agent.resilience.breaker.reject_if_open()
+            self.agent.admission.check(self.user_id)
+        except (AdmissionRejected, CircuitOpenError) as e:
+            await self.send({"type": "error", **_stream_error(e)})
+            return
+        self._generation = asyncio.create_task(self._generate(message))
+
+    async def _generate(self, message: ChatMessage) -> None:
+        parts = []
+        try:
+            async with aclosing(self.agent.stream_message(
+                message.text, user_id=self.user_id, session_id=message.session_id
+            )) as tokens:
+                async for token in tokens:
+                    parts.append(token)
+                    await self.send({"type": "token", "token": token})
+            await self.send({"type": "done", "response": "".join(parts)})
+        except (WebSocketDisconnect, _SlowConsumer):
+            logger.info(f"Chat socket of user {self.user_id} stopped reading; closing it")
+            await self._close(status.WS_1008_POLICY_VIOLATION)
+        except Exception as e:
+            try:
+                await self.send({"type": "error", **_stream_error(e)})
+            except Exception:
+                pass  # The socket is gone
+
+    async def cancel(self) -> None:
+        """Cancel the generation in progress, if any, and wait for it to stop."""
+        if self.generating:
+            self._generation.cancel()
+            try:
+                await self._generation
+            except asyncio.CancelledError:
+                pass
+        self._generation = None
+
+    async def _close(self, code: int) -> None:
+        """Close the socket; ``run`` stops reading once it is closed."""
+        self._closed = True
+        try:
+            await self.websocket.close(code=code)
+        except RuntimeError:
+            pass  # Already closed
+
+
+def _socket_token(websocket: WebSocket) -> Optional[str]:
+    """Return the socket's token, from the ``token`` query parameter or bearer header."""
+    token = websocket.query_params.get("token")
+    if not token:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    return token or None
+
+
+async def _authenticate_socket(token: Optional[str]) -> Optional[User]:
+    if not token:
+        return None
+    try:
+        # A short-lived session: the socket must not hold a pooled connection
+        async with AsyncSessionLocal() as db:
+            user = await get_user_from_token(db, token)
+    except HTTPException:
+        return None
+    return user if user.is_active else None
+
+
+@router.websocket("/ws")
+async def chat_ws(
+    websocket: WebSocket,
+    session_id: Optional[str] = Query(None, max_length=64),
+) -> None:
+    """
+    Chat over one long-lived WebSocket bound to a conversation session.
+    
+    The client authenticates once, with a ``token`` query parameter (browsers
+    cannot set headers on WebSockets) or an ``Authorization: Bearer`` header.
+    
+    Client frames: ``{"type": "message", "text": ...}``, ``{"type": "cancel"}``
+    and ``{"type": "ping"}``. Server frames: ``ready``, ``token``, ``done``,
+    ``cancelled``, ``error`` and ``pong``, each a JSON object with a ``type``.
+    """
+    token = _socket_token(websocket)
+    try:
+        user = await _authenticate_socket(token)
+        # Already verified; the connection is only served while the token is valid
+        expires_at = jwt.get_unverified_claims(token).get("exp") if user is not None else None
+    except Exception:
+        logger.exception("Could not authenticate a chat socket")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    agent = get_travel_agent()
+    if agent is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    await websocket.accept()
+    await ChatSocket(websocket, agent, user.id, session_id, expires_at).run()
+
+@router.get(
+    "/stats",
+    response_model=Dict[str, Any],
+    responses={
+        401: {"description": "Not authenticated"},
+        503: {"description": "The travel agent is not available"},
+    },
+    summary="Chat agent statistics",
+    description="Return runtime counters of the travel agent (superusers only).",
+    tags=["chat"]
+)
+async def chat_stats(
+    current_user: User = Depends(get_current_active_superuser),
+    agent: TravelAgent = Depends(get_chat_agent),
+) -> Dict[str, Any]:
+    """
+    Return runtime counters of the travel agent, such as response cache hits.
+    
+    Args:
+        current_user: The authenticated superuser
+        agent: The travel agent
+        
+    Returns:
+        Dict containing the agent's counters
+    """
+    return agent.stats()
@@ -0,0 +1,35 @@
+"""
+Operational endpoints for the TravelPal application.
+"""
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_active_superuser
+from app.db.async_session import replica_set
+from app.db.pool import pool_stats
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get(
+    "/db",
+    response_model=Dict[str, Any],
+    responses={401: {"description": "Not authenticated"}},
+    summary="Database pool statistics",
+    description="Return connection pool and read replica metrics of this worker (superusers only).",
+)
+async def db_stats(
+    current_user: User = Depends(get_current_active_superuser)
+) -> Dict[str, Any]:
+    """
+    Return per-pool checkout wait times, usage and failures, and replica health.
+
+    Args:
+        current_user: The authenticated superuser
+
+    Returns:
+        Dict containing pool and replica metrics
+    """
+    return {"pools": pool_stats(), "replicas": replica_set.stats()}
@@ -0,0 +1,195 @@
+"""
+Caches for resolving the current user without a database round trip.
+
+``get_current_user`` runs on every authenticated request, including every
+chat turn. Decoded tokens are cached by token hash and users by id, so a
+warm request needs neither a JWT decode nor a query.
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import anyio
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Columns kept in the cache; the password hash never leaves the database
+_USER_FIELDS = ("id", "email", "full_name", "is_active", "is_superuser", "created_at", "updated_at")
+_DATETIME_FIELDS = ("created_at", "updated_at")
+
+T = TypeVar("T")
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _dump_user(user: User) -> Dict[str, Any]:
+    return {field: getattr(user, field) for field in _USER_FIELDS}
+
+
+def _load_user(data: Dict[str, Any]) -> User:
+    """Build a detached ``User`` from cached columns."""
+    return User(**data)
+
+
+class TokenCache:
+    """Decoded access tokens keyed by the SHA-256 of the raw token.
+
+    An entry never outlives the token's own expiry.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[int] = None) -> None:
+        self.ttl = ttl if ttl is not None else settings.AUTH_CACHE_TTL
+        self._cache: LRUCache[str, int] = LRUCache(
+            maxsize=maxsize or settings.AUTH_TOKEN_CACHE_MAX_ENTRIES, ttl=self.ttl
+        )
+
+    def get(self, token: str) -> Optional[int]:
+        """Return the user id of a previously decoded token, or None."""
+        return self._cache.get(_token_key(token))
+
+    def set(self, token: str, user_id: int, expires_at: Optional[float] = None) -> None:
+        """Remember that ``token`` decodes to ``user_id`` until it expires."""
+        ttl: float = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+            if ttl <= 0:
+                return
+        self._cache.set(_token_key(token), user_id, ttl=ttl)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class UserCache:
+    """Users keyed by id, in process and optionally in Redis.
+
+    Entries are invalidated explicitly when a user is updated or removed. The
+    Redis tier is shared, but every worker's in-process tier may serve a
+    stale user for up to ``ttl`` seconds, so keep the TTL short. Redis
+    failures are logged and treated as misses.
+
+    Attributes:
+        hits: Lookups answered from either tier.
+        misses: Lookups that had to query the database.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[int] = None,
+        redis_client: Any = None,
+        key_prefix: Optional[str] = None,
+    ) -> None:
+        self.ttl = ttl if ttl is not None else settings.AUTH_CACHE_TTL
+        self.redis_client = redis_client
+        self.key_prefix = (
+            key_prefix if key_prefix is not None else settings.AUTH_USER_CACHE_REDIS_KEY_PREFIX
+        )
+        self._local: LRUCache[int, Dict[str, Any]] = LRUCache(
+            maxsize=maxsize or settings.AUTH_USER_CACHE_MAX_ENTRIES, ttl=self.ttl
+        )
+        self.hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        """Return a detached copy of the cached user, or None on a miss."""
+        data = self._local.get(user_id)
+        if data is None and self.redis_client is not None:
+            try:
+                raw = self.redis_client.get(f"{self.key_prefix}{user_id}")
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"User cache Redis lookup failed: {e}")
+                raw = None
+            if raw is not None:
+                data = json.loads(raw)
+                for field in _DATETIME_FIELDS:
+                    if data.get(field):
+                        data[field] = datetime.fromisoformat(data[field])
+                self._local.set(user_id, data)
+
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _load_user(data)
+
+    def set(self, user: User) -> None:
+        """Cache ``user``'s columns in both tiers."""
+        data = _dump_user(user)
+        self._local.set(user.id, data)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.set(
+                    f"{self.key_prefix}{user.id}", json.dumps(data, default=str), ex=self.ttl
+                )
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"User cache Redis write failed: {e}")
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop ``user_id`` from both tiers."""
+        self._local.pop(user_id)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.delete(f"{self.key_prefix}{user_id}")
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"User cache Redis invalidation failed: {e}")
+
+    def clear(self) -> None:
+        """Drop every in-process entry."""
+        self._local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._local),
+            "redis_errors": self.redis_errors,
+        }
+
+
+def _create_user_cache() -> Optional[UserCache]:
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+    redis_client = None
+    if settings.AUTH_USER_CACHE_REDIS_ENABLED:
+        from app.core.redis_client import get_redis_client
+        try:
+            redis_client = get_redis_client()
+        except RuntimeError as e:
+            logger.warning(f"User cache Redis tier disabled: {e}")
+    return UserCache(redis_client=redis_client)
+
+
+token_cache: Optional[TokenCache] = TokenCache() if settings.AUTH_CACHE_ENABLED else None
+user_cache: Optional[UserCache] = _create_user_cache()
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget the cached copy of a user after it was changed or deleted."""
+    if user_cache is not None:
+        user_cache.invalidate(user_id)
+
+
+async def user_cache_call(fn: Callable[..., T], *args: Any) -> T:
+    """Run a user cache operation from async code.
+
+    The Redis tier uses the blocking client, so only then is ``fn`` moved off
+    the event loop; the in-process tier is called inline.
+    """
+    if user_cache is None or user_cache.redis_client is None:
+        return fn(*args)
+    return await anyio.to_thread.run_sync(fn, *args)
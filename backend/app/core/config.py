@@ -18,9 +18,140 @@ class Settings(BaseSettings):
     # SQL Alchemy
     SQL_ECHO: bool = os.getenv("SQL_ECHO", "False").lower() == "true"
     
+    # Database startup: "bootstrap" creates tables and the first superuser on every boot;
+    # "verify" only checks the schema stamp left by `python -m app.db.init_db`, which the
+    # deploy must then run once before starting workers. "bootstrap" is the default so
+    # deployments without that step (e.g. docker-compose) keep initialising themselves.
+    DB_STARTUP_MODE: str = "bootstrap"
+    
+    # Database pool (per engine, per worker process)
+    DB_POOL_SIZE: int = 10  # Connections kept open
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds a checkout waits before failing
+    DB_POOL_RECYCLE: int = 3600  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout
+    DB_SQLITE_POOLED: bool = True  # Keep SQLite file connections open instead of reopening per session
+    
+    # Read replicas (async sessions send plain reads here, everything else to the primary)
+    ASYNC_DATABASE_REPLICA_URLS: List[str] = []
+    DATABASE_REPLICA_MAX_LAG: float = 5.0  # Seconds behind the primary before a replica is skipped
+    DATABASE_REPLICA_CHECK_INTERVAL: float = 5.0  # Seconds between replica health checks
+    
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # "text" or "json"
+    LOG_FILE: Optional[str] = None  # Also write to this file (from the background writer)
+    LOG_PAYLOAD_SAMPLE_RATE: float = 0.0  # Share of LLM requests/responses dumped at DEBUG
+    LOG_PAYLOAD_MAX_CHARS: int = 2000  # Longer payload dumps are clipped
+    LOG_REDACT_FIELDS: List[str] = [
+        "password", "api_key", "apikey", "authorization", "token", "access_token", "secret",
+    ]
+    
+    # LLM HTTP client
+    LLM_REQUEST_TIMEOUT: float = 30.0  # Seconds
+    LLM_HTTP2: bool = True
+    LLM_POOL_MAX_CONNECTIONS: int = 100
+    LLM_POOL_MAX_KEEPALIVE: int = 20
+    LLM_POOL_KEEPALIVE_EXPIRY: float = 30.0  # Seconds
+    
+    # Chat agent: built on the first chat request, or during startup when preloaded
+    CHAT_AGENT_PRELOAD: bool = False
+    
+    # Chat sessions
+    CHAT_SESSION_MAX_SESSIONS: int = 10000  # Per worker, least recently used evicted first
+    CHAT_SESSION_TTL: int = 60 * 60 * 24  # Seconds of inactivity before a session expires
+    CHAT_MEMORY_BACKEND: str = "memory"  # "memory" (per worker) or "redis" (shared)
+    CHAT_HISTORY_MAX_MESSAGES: int = 200  # Per session, oldest trimmed first
+    CHAT_REDIS_KEY_PREFIX: str = "travelpal:chat:"
+    
+    # Chat WebSocket (/chat/ws)
+    CHAT_WS_IDLE_TIMEOUT: float = 300.0  # Seconds without a client frame before the socket is closed
+    CHAT_WS_SEND_TIMEOUT: float = 10.0  # Seconds a send may wait on a slow client before it is dropped
+    
+    # LLM prompt window (prompt tokens per model; older turns are summarized)
+    LLM_DEFAULT_CONTEXT_TOKEN_BUDGET: int = 3000
+    LLM_CONTEXT_TOKEN_BUDGETS: Dict[str, int] = {
+        "Llama-4-Maverick-17B-128E-Instruct-FP8": 6000,
+    }
+    LLM_SUMMARY_MAX_TOKENS: int = 400
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 5000  # In-process tier, per worker
+    LLM_CACHE_TTL: int = 60 * 60  # Seconds
+    # Only (near-)deterministic requests are cached, by both response caches. The agent's
+    # default temperature (0.7) is above this, so caching must be enabled explicitly by
+    # running the agent at or below it.
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.3
+    LLM_CACHE_REDIS_ENABLED: bool = False  # Share cached responses between workers
+    LLM_CACHE_REDIS_KEY_PREFIX: str = "travelpal:llm:"
+    
+    # LLM semantic cache (paraphrase matching). The built-in hashing embedder only matches
+    # near-identical wording (case, punctuation, function words); matching real paraphrases
+    # needs LLM_SEMANTIC_CACHE_EMBEDDING_MODEL and the sentence-transformers package.
+    LLM_SEMANTIC_CACHE_ENABLED: bool = True
+    LLM_SEMANTIC_CACHE_MAX_ENTRIES: int = 2000
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = 0.92  # Minimum cosine similarity for a hit
+    LLM_SEMANTIC_CACHE_DIMENSIONS: int = 512  # Hashing embedder only
+    LLM_SEMANTIC_CACHE_EMBEDDING_MODEL: Optional[str] = None  # sentence-transformers model name
+    
+    # Share one upstream call between concurrent identical requests
+    LLM_COALESCE_REQUESTS: bool = True
+    
+    # LLM admission control
+    LLM_MAX_CONCURRENCY: int = 32  # Concurrent provider calls per worker
+    LLM_MAX_QUEUE: int = 256  # Callers waiting for a slot before shedding
+    LLM_QUEUE_TIMEOUT: float = 10.0  # Seconds a caller may wait for a slot
+    LLM_PER_USER_MAX_REQUESTS: int = 4  # Admitted plus queued requests per user
+    
+    # LLM resilience
+    LLM_RETRY_MAX_ATTEMPTS: int = 3  # Including the first attempt
+    LLM_RETRY_BASE_DELAY: float = 0.2  # Seconds; doubled per retry, fully jittered
+    LLM_RETRY_MAX_DELAY: float = 2.0
+    LLM_BREAKER_FAILURE_RATE: float = 0.5  # Failure ratio that opens the breaker
+    LLM_BREAKER_MIN_CALLS: int = 10  # Calls in the window before the breaker may open
+    LLM_BREAKER_WINDOW: int = 50  # Recent calls considered
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0  # Fail fast for this long before probing
+    LLM_HEDGE_ENABLED: bool = False  # Send a second request for slow completions
+    LLM_HEDGE_PERCENTILE: float = 0.95  # Latency percentile after which to hedge
+    LLM_HEDGE_MIN_DELAY: float = 0.5  # Never hedge sooner than this (seconds)
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # Latency samples needed before hedging
+    
+    # LLM providers
+    LLM_PROVIDERS: List[str] = ["llama"]  # Routing candidates (llama, openai, local) in order of preference
+    LLM_CHEAP_PROVIDER: Optional[str] = None  # Provider tried first for small talk, e.g. a smaller model
+    OPENAI_COMPAT_API_URL: str = "http://localhost:11434/v1/chat/completions"  # vLLM, Ollama, ...
+    OPENAI_COMPAT_API_KEY: Optional[str] = None
+    OPENAI_COMPAT_MODEL: str = "llama3.1:8b"
+    LLM_LOCAL_FALLBACK_MESSAGE: str = (
+        "I'm having trouble reaching my travel knowledge right now. Please try again in a moment."
+    )
+    LLM_ROUTER_WINDOW: int = 100  # Recent calls per provider used for latency and error rate
+    LLM_ROUTER_MIN_SAMPLES: int = 5  # Latencies needed before a provider is ranked by speed
+    LLM_ROUTER_MAX_ERROR_RATE: float = 0.5  # Providers above this error rate are tried last
+    
+    # Password hashing (bcrypt runs on a dedicated thread pool, off the event loop)
+    PASSWORD_HASH_WORKERS: int = 4  # Per worker; bounds the CPU spent on hashing
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Further logins are rejected with 503 + Retry-After
+    PASSWORD_HASH_AUTOTUNE: bool = True  # Pick the bcrypt cost on startup from a benchmark
+    PASSWORD_HASH_TARGET_SECONDS: float = 0.25  # Latency budget of one hash
+    PASSWORD_BCRYPT_MIN_ROUNDS: int = 10  # Never tuned below this cost
+    PASSWORD_BCRYPT_MAX_ROUNDS: int = 15
+    
+    # Auth caches (decoded tokens and current users, so requests skip the user query)
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_TTL: int = 60  # Seconds; bounds how long another worker may serve a stale user
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000  # Per worker
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10000  # Per worker
+    AUTH_USER_CACHE_REDIS_ENABLED: bool = False  # Share cached users between workers
+    AUTH_USER_CACHE_REDIS_KEY_PREFIX: str = "travelpal:user:"
+    
+    # Bulk endpoints
+    BULK_MAX_BATCH_SIZE: int = 500  # Rows per bulk request
+    
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
@@ -0,0 +1,178 @@
+"""
+Application logging: non-blocking output, structured records and redaction.
+
+Records are put on an in-memory queue by the calling thread and written by a
+background listener, so request handlers never wait on stdout or disk.
+Records are queued unformatted: message rendering (including ``LazyJSON``
+payload dumps), redaction and output formatting run in the listener thread.
+Only records with mutable arguments, and tracebacks, are rendered eagerly.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+from typing import Any, Iterable, List, Mapping, Optional
+
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _redaction_patterns(fields: Iterable[str]) -> List[re.Pattern]:
+    names = "|".join(re.escape(f) for f in fields)
+    return [
+        re.compile(r"(?i)(bearer\s+)([A-Za-z0-9._~+/=-]+)"),
+        # "password": "...", api_key=..., Authorization: ...
+        re.compile(rf"""(?i)(["']?(?:{names})["']?\s*[:=]\s*["']?)([^"',\s}}&]+)"""),
+        re.compile(r"()\bsk-[A-Za-z0-9_-]{8,}"),
+    ]
+
+
+class RedactingFilter(logging.Filter):
+    """Masks credentials in log messages before they are written."""
+
+    def __init__(self, fields: Optional[Iterable[str]] = None) -> None:
+        super().__init__()
+        self.patterns = _redaction_patterns(fields if fields is not None else settings.LOG_REDACT_FIELDS)
+
+    def redact(self, text: str) -> str:
+        for pattern in self.patterns:
+            text = pattern.sub(r"\1[REDACTED]", text)
+        return text
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = self.redact(record.getMessage())
+        record.args = None
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats each record as one JSON object, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = self.formatException(record.exc_info)
+        if exc_text:
+            data["exc_info"] = exc_text
+        return json.dumps(data, default=str)
+
+
+class LazyJSON:
+    """Defers ``json.dumps`` of a payload until a handler actually formats it.
+
+    The dump is compact and clipped to ``max_chars``. It happens on the log
+    listener thread, so the payload must not be mutated after it is logged.
+    """
+
+    __slots__ = ("payload", "max_chars")
+
+    def __init__(self, payload: Any, max_chars: Optional[int] = None) -> None:
+        self.payload = payload
+        self.max_chars = max_chars or settings.LOG_PAYLOAD_MAX_CHARS
+
+    def __str__(self) -> str:
+        text = json.dumps(self.payload, separators=(",", ":"), default=str)
+        if len(text) > self.max_chars:
+            text = f"{text[:self.max_chars]}... ({len(text)} chars)"
+        return text
+
+
+# Arguments that cannot change before the listener thread renders them
+_DEFERRABLE_ARGS = (str, int, float, bool, bytes, type(None), LazyJSON)
+
+_exception_formatter = logging.Formatter()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """A ``QueueHandler`` that leaves message rendering to the listener thread.
+
+    ``QueueHandler.prepare`` formats every record in the calling thread. Here a
+    copy of the record is queued with its arguments, unless one of them is
+    mutable and could change before it is rendered. Tracebacks are rendered to
+    text up front so their frames are not kept alive in the queue.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        args = record.args
+        values = args.values() if isinstance(args, Mapping) else (args or ())
+        if not isinstance(record.msg, str) or not all(isinstance(v, _DEFERRABLE_ARGS) for v in values):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def log_payload(logger: logging.Logger, label: str, payload: Any) -> None:
+    """Log a sampled debug dump of ``payload``.
+
+    Only ``LOG_PAYLOAD_SAMPLE_RATE`` of the calls are logged, and nothing is
+    serialized unless DEBUG is enabled for ``logger``.
+    """
+    rate = settings.LOG_PAYLOAD_SAMPLE_RATE
+    if rate <= 0 or not logger.isEnabledFor(logging.DEBUG):
+        return
+    if rate < 1 and random.random() >= rate:
+        return
+    logger.debug("%s: %s", label, LazyJSON(payload))
+
+
+def configure_logging() -> None:
+    """Route all logging through a queue to a background writer thread.
+
+    Safe to call more than once; later calls are ignored.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter: logging.Formatter = (
+        JSONFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if settings.LOG_FILE:
+        handlers.append(logging.FileHandler(settings.LOG_FILE))
+    redactor = RedactingFilter()
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.addFilter(redactor)
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    root = logging.getLogger()
+    root.handlers = [DeferredQueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,27 @@
+"""
+Shared Redis client for the application.
+"""
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+@lru_cache()
+def get_redis_client() -> Any:
+    """Return the process-wide ``redis.Redis`` client for ``REDIS_URL``.
+
+    The client owns a connection pool, so every caller in a worker shares it.
+
+    Raises:
+        RuntimeError: If the ``redis`` package is not installed.
+    """
+    if not REDIS_AVAILABLE:
+        raise RuntimeError("The 'redis' package is required for Redis-backed features")
+    return redis.Redis.from_url(settings.REDIS_URL)
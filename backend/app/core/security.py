@@ -1,5 +1,11 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Callable, Optional, TypeVar, Union
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -7,8 +13,32 @@ from pydantic import ValidationError
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+# Cost of one hash at the current rounds, used to estimate Retry-After;
+# replaced by the measured value once tune_password_hashing has run
+_hash_seconds = 0.25
+
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+_hash_pending = 0
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when too many password hashes are already queued.
+
+    Attributes:
+        retry_after: Suggested seconds before retrying.
+    """
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
 ) -> str:
@@ -30,6 +60,100 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash",
+                )
+    return _hash_executor
+
+async def _run_hashing(fn: Callable[..., T], *args: Any) -> T:
+    """Run a bcrypt call on the hashing pool.
+
+    bcrypt releases the GIL, so the pool's threads hash in parallel while the
+    event loop keeps serving other requests.
+
+    Raises:
+        PasswordHashingBusy: If ``PASSWORD_HASH_MAX_PENDING`` calls are already
+            running or queued.
+    """
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        waves = _hash_pending / settings.PASSWORD_HASH_WORKERS
+        raise PasswordHashingBusy(
+            "Too many concurrent logins", retry_after=max(1, math.ceil(waves * _hash_seconds))
+        )
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Like ``verify_password``, without blocking the event loop."""
+    return await _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Like ``get_password_hash``, without blocking the event loop."""
+    return await _run_hashing(pwd_context.hash, password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash uses a deprecated scheme or a lower cost than configured."""
+    return pwd_context.needs_update(hashed_password)
+
+def tune_password_hashing(target_seconds: Optional[float] = None) -> int:
+    """Pick the bcrypt cost whose hash time fits ``target_seconds`` on this host.
+
+    Each bcrypt round doubles the work, so one hash is timed at
+    ``PASSWORD_BCRYPT_MIN_ROUNDS`` and the cost is raised while the estimate
+    stays within budget. New hashes use the tuned cost, and existing hashes
+    below it are reported by ``password_needs_rehash`` so they are upgraded
+    on the next successful login.
+
+    Args:
+        target_seconds: Latency budget of one hash, defaults to
+            ``PASSWORD_HASH_TARGET_SECONDS``.
+
+    Returns:
+        int: The selected bcrypt rounds.
+    """
+    global _hash_seconds
+    target = target_seconds or settings.PASSWORD_HASH_TARGET_SECONDS
+    min_rounds = settings.PASSWORD_BCRYPT_MIN_ROUNDS
+    bcrypt = pwd_context.handler("bcrypt").using(rounds=min_rounds)
+
+    bcrypt.hash("warm-up")
+    elapsed = float("inf")
+    for _ in range(2):
+        started = time.perf_counter()
+        bcrypt.hash("benchmark")
+        elapsed = min(elapsed, time.perf_counter() - started)
+
+    rounds = min_rounds
+    if elapsed > 0:
+        rounds += max(0, int(math.log2(target / elapsed)))
+    rounds = min(rounds, settings.PASSWORD_BCRYPT_MAX_ROUNDS)
+
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+    _hash_seconds = elapsed * 2 ** (rounds - min_rounds)
+    logger.info(
+        "Password hashing tuned to bcrypt cost %d (~%.0f ms per hash)", rounds, _hash_seconds * 1000
+    )
+    return rounds
+
+def shutdown_password_hashing() -> None:
+    """Stop the hashing pool's threads."""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False)
+            _hash_executor = None
+
 def create_verification_token(email: str) -> str:
     """Create a verification token for email confirmation"""
     expires = timedelta(hours=24)
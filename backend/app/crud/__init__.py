@@ -6,4 +6,5 @@ for the application's models.
 """
 
 # Import all CRUD modules here
+from .crud_item import item  # noqa: F401
 from .user import user  # noqa: F401
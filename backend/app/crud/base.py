@@ -1,64 +1,243 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, delete, insert, tuple_, update
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 
-from app.db.base_class import Base
+from app.models.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+_UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+def _as_dict(obj_in: Union[BaseModel, Dict[str, Any]], exclude_unset: bool = False) -> Dict[str, Any]:
+    if isinstance(obj_in, dict):
+        return obj_in
+    return obj_in.dict(exclude_unset=exclude_unset)
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    raw = json.dumps([created_at.isoformat(), id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor made by ``encode_cursor``.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise InvalidCursor(f"Invalid pagination cursor: {cursor!r}") from e
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
-        CRUD object with default methods to Create, Read, Update, Delete (CRUD).
-        
+        Async CRUD object with default methods to Create, Read, Update, Delete (CRUD).
+
         **Parameters**
         * `model`: A SQLAlchemy model class
-        * `schema`: A Pydantic model (schema) class
         """
         self.model = model
+        self._columns: Optional[FrozenSet[str]] = None
 
-    def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.get(self.model, id)
 
-    def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+    async def get_many(self, db: AsyncSession, ids: Sequence[int]) -> List[ModelType]:
+        """
+        Fetch the rows with the given ids in one query, ordered by id.
+        """
+        result = await db.scalars(
+            select(self.model)
+            .where(self.model.id.in_(ids))
+            .order_by(self.model.id)
+            .execution_options(populate_existing=True)
+        )
+        return result.all()
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        result = await db.execute(
+            select(self.model).order_by(self.model.id).offset(skip).limit(limit)
+        )
+        return result.scalars().all()
 
-    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = jsonable_encoder(obj_in)
+    async def get_page(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset-paginated listing ordered by ``(created_at, id)``.
+
+        Unlike ``get_multi`` the cost of a page does not grow with its depth.
+        Returns the rows and the cursor of the next page, or None on the last page.
+        """
+        return await self._keyset_page(db, select(self.model), cursor=cursor, limit=limit)
+
+    async def _keyset_page(
+        self, db: AsyncSession, stmt: Select, *, cursor: Optional[str], limit: int
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        key = tuple_(self.model.created_at, self.model.id)
+        if cursor:
+            stmt = stmt.where(key > tuple_(*decode_cursor(cursor)))
+        # One extra row tells whether there is a next page
+        result = await db.execute(
+            stmt.order_by(self.model.created_at, self.model.id).limit(limit + 1)
+        )
+        rows = result.scalars().all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    async def create(
+        self, db: AsyncSession, *, obj_in: Union[CreateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        obj_in_data = obj_in if isinstance(obj_in, dict) else jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
 
-    def update(
+    async def update(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        """
+        Apply ``obj_in`` to ``db_obj`` with one ``UPDATE ... RETURNING``.
+
+        Only mapped columns are written. The returned row, including
+        server-side ``onupdate`` values, is loaded back into ``db_obj``, so no
+        refresh query follows the commit.
+        """
+        columns = self._column_names()
+        update_data = {
+            field: value
+            for field, value in _as_dict(obj_in, exclude_unset=True).items()
+            if field in columns and field != "id"
+        }
+        if not update_data:
+            return db_obj
+        result = await db.scalars(
+            update(self.model)
+            .where(self.model.id == db_obj.id)
+            .values(**update_data)
+            .returning(self.model),
+            execution_options={"populate_existing": True, "synchronize_session": False},
+        )
+        db_obj = result.one()
+        await db.commit()
         return db_obj
 
-    def remove(self, db: Session, *, id: int) -> ModelType:
-        obj = db.query(self.model).get(id)
-        db.delete(obj)
-        db.commit()
+    def _column_names(self) -> FrozenSet[str]:
+        if self._columns is None:
+            self._columns = frozenset(attr.key for attr in sa_inspect(self.model).column_attrs)
+        return self._columns
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+        obj = await db.get(self.model, id)
+        if obj is not None:
+            await db.delete(obj)
+            await db.commit()
         return obj
+
+    async def create_many(
+        self, db: AsyncSession, *, objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]]
+    ) -> List[ModelType]:
+        """
+        Insert rows with one ``INSERT ... RETURNING`` and a single commit.
+        """
+        if not objs_in:
+            return []
+        result = await db.scalars(
+            insert(self.model).returning(self.model), [_as_dict(obj) for obj in objs_in]
+        )
+        rows = result.all()
+        await db.commit()
+        return rows
+
+    async def update_many(
+        self, db: AsyncSession, *, objs_in: Sequence[Dict[str, Any]]
+    ) -> List[ModelType]:
+        """
+        Update rows by primary key in one executemany ``UPDATE`` and a single commit.
+
+        Each dict holds the row's ``id`` and the columns to change.
+        """
+        if not objs_in:
+            return []
+        await db.execute(update(self.model), list(objs_in))
+        await db.commit()
+        return await self.get_many(db, [obj["id"] for obj in objs_in])
+
+    async def remove_many(self, db: AsyncSession, *, ids: Sequence[int]) -> int:
+        """
+        Delete rows with one ``DELETE ... WHERE id IN`` and return how many were deleted.
+        """
+        if not ids:
+            return 0
+        result = await db.execute(
+            delete(self.model).where(self.model.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        await db.commit()
+        return result.rowcount
+
+    async def upsert_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        index_elements: Sequence[str] = ("id",),
+    ) -> List[ModelType]:
+        """
+        Insert rows, updating those that conflict on ``index_elements``, with batched
+        ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING`` and a single commit.
+        Rows are batched per distinct set of columns.
+
+        Only PostgreSQL and SQLite support ``ON CONFLICT``.
+        """
+        if not objs_in:
+            return []
+        dialect = db.get_bind().dialect.name
+        if dialect not in _UPSERT_INSERTS:
+            raise NotImplementedError(f"upsert_many is not supported on {dialect}")
+        rows = [_as_dict(obj) for obj in objs_in]
+        stmt = _UPSERT_INSERTS[dialect](self.model)
+        updated = {
+            name for row in rows for name in row if name not in index_elements
+        }
+        if updated:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(index_elements),
+                set_={name: stmt.excluded[name] for name in updated},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+        stmt = stmt.returning(self.model)
+        result = await db.scalars(stmt, rows, execution_options={"populate_existing": True})
+        objs = result.all()
+        await db.commit()
+        return objs
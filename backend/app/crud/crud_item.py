@@ -1,30 +1,39 @@
-from typing import Optional
+from typing import List, Sequence
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 
 from app.crud.base import CRUDBase
 from app.models.item import Item
 from app.schemas.item import ItemCreate, ItemUpdate
 
 class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
-    def create_with_owner(
-        self, db: Session, *, obj_in: ItemCreate, owner_id: int
+    async def create_with_owner(
+        self, db: AsyncSession, *, obj_in: ItemCreate, owner_id: int
     ) -> Item:
         db_obj = self.model(**obj_in.dict(), owner_id=owner_id)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
 
-    def get_multi_by_owner(
-        self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
-    ) -> list[Item]:
-        return (
-            db.query(self.model)
+    async def create_many_with_owner(
+        self, db: AsyncSession, *, objs_in: Sequence[ItemCreate], owner_id: int
+    ) -> List[Item]:
+        return await self.create_many(
+            db, objs_in=[{**obj_in.dict(), "owner_id": owner_id} for obj_in in objs_in]
+        )
+
+    async def get_multi_by_owner(
+        self, db: AsyncSession, *, owner_id: int, skip: int = 0, limit: int = 100
+    ) -> List[Item]:
+        result = await db.execute(
+            select(self.model)
             .filter(Item.owner_id == owner_id)
+            .order_by(Item.id)
             .offset(skip)
             .limit(limit)
-            .all()
         )
+        return result.scalars().all()
 
 item = CRUDItem(Item)
@@ -1,46 +1,59 @@
 """
 CRUD operations for User model.
 """
-from typing import Optional, Dict, Any, List
+import asyncio
+import logging
+from typing import Optional, Dict, Any, Set, Union
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import or_
 
+from app.crud.base import CRUDBase
 from app.models.user import User
-from app.core.security import get_password_hash, verify_password
+from app.schemas.user import UserCreate, UserUpdate
+from app.core.auth_cache import invalidate_user, user_cache_call
+from app.core.security import (
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from app.db.async_session import AsyncSessionLocal
+from app.db.replicas import on_primary
+
+logger = logging.getLogger(__name__)
 
+# Background rehash tasks, referenced until done so they are not collected
+_rehash_tasks: Set["asyncio.Task[None]"] = set()
 
-class CRUDUser:
+
+class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     """
     CRUD operations for User model.
     """
 
-    @staticmethod
-    async def get(db: AsyncSession, user_id: int) -> Optional[User]:
-        """Get a user by ID."""
-        result = await db.execute(select(User).filter(User.id == user_id))
+    async def get(self, db: AsyncSession, id: Any) -> Optional[User]:
+        """Get a user by id, from the primary (see ``get_by_email``)."""
+        result = await db.execute(on_primary(select(User).filter(User.id == id)))
         return result.scalars().first()
 
-    @staticmethod
-    async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
-        """Get a user by email."""
-        result = await db.execute(select(User).filter(User.email == email))
-        return result.scalars().first()
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
+        """Get a user by email.
 
-    @staticmethod
-    async def get_multi(
-        db: AsyncSession, *, skip: int = 0, limit: int = 100
-    ) -> List[User]:
-        """Get multiple users with pagination."""
-        result = await db.execute(select(User).offset(skip).limit(limit))
-        return result.scalars().all()
+        Read from the primary: a replica may not yet have a new account, a
+        changed password or a deactivation, and auth must not act on stale rows.
+        """
+        result = await db.execute(on_primary(select(User).filter(User.email == email)))
+        return result.scalars().first()
 
-    @staticmethod
-    async def create(db: AsyncSession, *, obj_in: Dict[str, Any]) -> User:
+    async def create(
+        self, db: AsyncSession, *, obj_in: Union[UserCreate, Dict[str, Any]]
+    ) -> User:
         """Create a new user."""
+        if not isinstance(obj_in, dict):
+            obj_in = obj_in.dict()
         db_obj = User(
             email=obj_in["email"],
-            hashed_password=get_password_hash(obj_in["password"]),
+            hashed_password=await get_password_hash_async(obj_in["password"]),
             full_name=obj_in.get("full_name"),
             is_superuser=obj_in.get("is_superuser", False),
             is_active=obj_in.get("is_active", True),
@@ -50,46 +63,71 @@ class CRUDUser:
         await db.refresh(db_obj)
         return db_obj
 
-    @staticmethod
     async def update(
-        db: AsyncSession, *, db_obj: User, obj_in: Dict[str, Any]
+        self, db: AsyncSession, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
     ) -> User:
         """Update a user."""
-        update_data = obj_in.copy()
-        if "password" in update_data:
-            hashed_password = get_password_hash(update_data["password"])
-            del update_data["password"]
+        if isinstance(obj_in, dict):
+            update_data = obj_in.copy()
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("password"):
+            hashed_password = await get_password_hash_async(update_data["password"])
             update_data["hashed_password"] = hashed_password
+        update_data.pop("password", None)
 
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        await user_cache_call(invalidate_user, db_obj.id)
         return db_obj
 
-    @staticmethod
-    async def remove(db: AsyncSession, *, user_id: int) -> Optional[User]:
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[User]:
         """Delete a user."""
-        user = await CRUDUser.get(db, user_id)
-        if user:
-            await db.delete(user)
-            await db.commit()
+        user = await super().remove(db, id=id)
+        if user is not None:
+            await user_cache_call(invalidate_user, id)
         return user
 
-    @staticmethod
     async def authenticate(
-        db: AsyncSession, *, email: str, password: str
+        self, db: AsyncSession, *, email: str, password: str
     ) -> Optional[User]:
         """Authenticate a user."""
-        user = await CRUDUser.get_by_email(db, email=email)
+        user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
+        if password_needs_rehash(user.hashed_password):
+            task = asyncio.create_task(self.rehash_password(user.id, password))
+            _rehash_tasks.add(task)
+            task.add_done_callback(_rehash_tasks.discard)
         return user
 
+    async def rehash_password(self, user_id: int, password: str) -> None:
+        """Re-hash a user's password with the current parameters and persist it.
+
+        Runs after a successful login, in its own session so the login
+        response does not wait for it.
+        """
+        try:
+            hashed_password = await get_password_hash_async(password)
+            async with AsyncSessionLocal() as db:
+                user = await self.get(db, user_id)
+                if user is None or not password_needs_rehash(user.hashed_password):
+                    return
+                user.hashed_password = hashed_password
+                await db.commit()
+            logger.info("Upgraded password hash of user %s", user_id)
+        except Exception:
+            logger.exception("Failed to upgrade password hash of user %s", user_id)
+
+    def is_active(self, user: User) -> bool:
+        """Check if a user is active."""
+        return user.is_active
+
+    def is_superuser(self, user: User) -> bool:
+        """Check if a user is a superuser."""
+        return user.is_superuser
+
 
 # Create a singleton instance
-user = CRUDUser()
+user = CRUDUser(User)
@@ -8,26 +8,13 @@ from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
+from app.db.pool import engine_options, instrument_engine
+from app.db.replicas import ReplicaSet, RoutingSession
 
-# Async database engine configuration
-engine_args = {
-    'pool_pre_ping': True,  # Enable connection health checks
-    'pool_recycle': 3600,   # Recycle connections after 1 hour
-    'echo': settings.SQL_ECHO,  # Echo SQL queries
-}
-
-# Add PostgreSQL-specific configurations if not using SQLite
-if 'sqlite' not in settings.ASYNC_DATABASE_URL:
-    engine_args.update({
-        'pool_size': 10,        # Number of connections to keep open
-        'max_overflow': 20,     # Number of connections to allow in overflow
-    })
-else:
-    # Use NullPool for SQLite as it doesn't support connection pooling
-    engine_args['poolclass'] = NullPool
+# Async database engine configuration (pool parameters come from Settings)
+engine_args = engine_options(settings.ASYNC_DATABASE_URL, name="primary", async_=True)
 
 # Create async database engine
 async_engine = create_async_engine(
@@ -35,12 +22,24 @@ async_engine = create_async_engine(
     **engine_args
 )
 
+instrument_engine(async_engine)
+
+# Read replicas; without any, RoutingSession sends everything to the primary
+replica_set = ReplicaSet([
+    create_async_engine(url, **engine_options(url, name=f"replica-{i}", async_=True))
+    for i, url in enumerate(settings.ASYNC_DATABASE_REPLICA_URLS, 1)
+])
+for replica in replica_set.replicas:
+    instrument_engine(replica.engine)
+
 # Create async session factory with specific configurations
 async_session_maker = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=async_engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replica_set if replica_set else None,
     expire_on_commit=False,  # Important for async sessions
 )
 
@@ -1,79 +1,158 @@
-from typing import Optional
+"""
+Database bootstrap and schema version checks.
+
+``init_db`` is the one-shot bootstrap: it creates the database and tables,
+the first superuser, and stamps ``SCHEMA_VERSION``. Run it once per deploy
+with ``python -m app.db.init_db``, then start workers with
+``DB_STARTUP_MODE=verify`` so each boot only reads the stamp.
+"""
+import asyncio
 import logging
-from sqlalchemy.ext.asyncio import AsyncSession
+import time
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
 from app import crud, schemas
 from app.core.config import settings
-from app.db.base import Base  # noqa: F401
+from app.models import Base  # noqa: F401 (registers every model)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Bump whenever the models change in a way that needs a bootstrap run
+SCHEMA_VERSION = 1
+
+# Kept out of the models' metadata so it is never part of their DDL
+schema_version_table = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+)
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database has not been bootstrapped for this release."""
+
+
+def _create_database() -> None:
+    """Create the PostgreSQL database if it does not exist yet."""
+    from sqlalchemy import create_engine
+    from sqlalchemy_utils import database_exists, create_database
+
+    if not settings.DATABASE_URL.startswith("postgresql"):
+        return
+    sync_engine = create_engine(settings.DATABASE_URL)
+    try:
+        if not database_exists(sync_engine.url):
+            create_database(sync_engine.url)
+    finally:
+        sync_engine.dispose()
+
+
+async def get_schema_version(db: AsyncSession) -> Optional[int]:
+    """Return the highest stamped schema version, or None if never stamped."""
+    def _read(conn) -> Optional[int]:
+        if not inspect(conn).has_table(schema_version_table.name):
+            return None
+        return conn.execute(select(func.max(schema_version_table.c.version))).scalar()
+
+    conn = await db.connection()
+    return await conn.run_sync(_read)
+
+
+async def verify_schema_version(db: AsyncSession) -> None:
+    """Check that the database was bootstrapped for ``SCHEMA_VERSION``.
+
+    Raises:
+        SchemaVersionError: If the stamp is missing or older.
+    """
+    version = await get_schema_version(db)
+    if version is None or version < SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"Database schema version is {version}, this release needs {SCHEMA_VERSION}; "
+            f"run `python -m app.db.init_db` first"
+        )
+
+
+def _sync_indexes(sync_conn) -> None:
+    """Create the models' indexes missing from existing tables.
+
+    ``create_all`` only creates indexes together with their table, so tables
+    created before an index was added to the models would never get it.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+async def _create_tables(conn: AsyncConnection) -> None:
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.run_sync(_sync_indexes)
+    await conn.run_sync(schema_version_table.metadata.create_all)
+
+
 async def init_db(db: AsyncSession) -> None:
     """
-    Initialize the database with initial data.
-    
+    Bootstrap the database: tables, the first superuser and the schema stamp.
+
+    Idempotent, so it is safe to run on every deploy.
+
     Args:
         db: Database session
     """
-    # Get the engine URL from settings
-    from sqlalchemy import create_engine
-    from sqlalchemy_utils import database_exists, create_database
-    
-    # Convert async URL to sync URL for table creation
-    sync_db_url = settings.DATABASE_URL
-    if sync_db_url.startswith("postgresql+asyncpg:"):
-        sync_db_url = sync_db_url.replace("postgresql+asyncpg:", "postgresql:", 1)
-    
-    # Create sync engine for table creation
-    sync_engine = create_engine(sync_db_url)
-    
-    # Create database if it doesn't exist (PostgreSQL only)
-    if sync_db_url.startswith("postgresql"):
-        if not database_exists(sync_engine.url):
-            create_database(sync_engine.url)
-    
-    # Create all tables
-    Base.metadata.create_all(bind=sync_engine)
-    
-    # Close the sync engine
-    sync_engine.dispose()
-    
+    await asyncio.to_thread(_create_database)
+
+    conn = await db.connection()
+    await _create_tables(conn)
+
     # Create first superuser if it doesn't exist
     if not settings.FIRST_SUPERUSER or not settings.FIRST_SUPERUSER_PASSWORD:
         logger.warning(
             "Skipping superuser creation: FIRST_SUPERUSER or FIRST_SUPERUSER_PASSWORD not set"
         )
-        return
-    
-    try:
-        # Check if users table exists and has data
-        from sqlalchemy import text
-        result = await db.execute(
-            text("SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'users')")
-        )
-        users_table_exists = result.scalar()
-        
-        if not users_table_exists:
-            logger.error("Users table does not exist after initialization")
-            return
-            
-        # Check if user exists
-        user = await crud.user.get_by_email(db, email=settings.FIRST_SUPERUSER)
-        if not user:
-            user_in = schemas.UserCreate(
-                email=settings.FIRST_SUPERUSER,
-                password=settings.FIRST_SUPERUSER_PASSWORD,
-                is_superuser=True,
-                is_active=True,
-                full_name="Admin User"
-            )
-            # Convert Pydantic model to dict before passing to CRUD
-            user_data = user_in.dict()
-            user = await crud.user.create(db, obj_in=user_data)
-            await db.commit()
-            logger.info(f"Created first superuser with email: {user.email}")
-    except Exception as e:
-        logger.error(f"Error during database initialization: {e}")
-        await db.rollback()
-        raise
+    else:
+        try:
+            user = await crud.user.get_by_email(db, email=settings.FIRST_SUPERUSER)
+            if not user:
+                user_in = schemas.UserCreate(
+                    email=settings.FIRST_SUPERUSER,
+                    password=settings.FIRST_SUPERUSER_PASSWORD,
+                    is_superuser=True,
+                    is_active=True,
+                    full_name="Admin User"
+                )
+                user = await crud.user.create(db, obj_in=user_in.dict())
+                logger.info(f"Created first superuser with email: {user.email}")
+        except Exception as e:
+            logger.error(f"Error during database initialization: {e}")
+            await db.rollback()
+            raise
+
+    if (await get_schema_version(db) or 0) < SCHEMA_VERSION:
+        await db.execute(schema_version_table.insert().values(version=SCHEMA_VERSION))
+    await db.commit()
+
+
+async def _bootstrap() -> None:
+    from app.db.async_session import AsyncSessionLocal, async_engine
+    from app.db.replicas import use_primary
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        use_primary(session)
+        await init_db(session)
+    await async_engine.dispose()
+    logger.info(
+        f"Database bootstrapped at schema version {SCHEMA_VERSION} "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    from app.core.logging import configure_logging
+
+    configure_logging()
+    asyncio.run(_bootstrap())
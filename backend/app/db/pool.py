@@ -0,0 +1,169 @@
+"""
+Connection pool configuration and instrumentation.
+
+Every engine gets its pool parameters from ``Settings`` through
+``engine_options``. Queue pools are instrumented: time spent waiting for a
+connection, connections checked out, overflow in use, checkout timeouts and
+invalidations (which include failed pre-pings) are collected per pool once
+``instrument_engine`` is called, and exposed by ``pool_stats``.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool, StaticPool
+
+from app.core.config import settings
+
+
+class PoolMetrics:
+    """Counters and checkout wait times of one pool.
+
+    Attributes:
+        checkouts: Connections handed out.
+        connects: New DBAPI connections opened.
+        invalidations: Connections discarded as broken, including failed pre-pings.
+        timeouts: Checkouts that gave up after ``pool_timeout``.
+    """
+
+    def __init__(self, window: int = 1000) -> None:
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            self.max_wait = max(self.max_wait, seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self._waits)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# Keyed by the pool's logging name, which survives pool.recreate()
+_metrics: Dict[str, PoolMetrics] = {}
+_pools: Dict[str, Pool] = {}
+
+
+def _metrics_for(pool: Pool) -> PoolMetrics:
+    name = pool.logging_name or "default"
+    metrics = _metrics.get(name)
+    if metrics is None:
+        metrics = _metrics[name] = PoolMetrics()
+    _pools[name] = pool
+    return metrics
+
+
+class _TimedCheckoutMixin:
+    """Times how long each checkout waits for a pooled or new connection."""
+
+    def _do_get(self) -> Any:
+        metrics = _metrics_for(self)  # type: ignore[arg-type]
+        started = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except sa_exc.TimeoutError:
+            metrics.timeouts += 1
+            raise
+        finally:
+            metrics.record_wait(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine: Union[Engine, AsyncEngine]) -> None:
+    """Count checkouts, new connections and invalidations of ``engine``'s pool.
+
+    Checkout wait times are recorded by the instrumented pool classes
+    themselves; engines with other pools are left alone.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if not isinstance(sync_engine.pool, _TimedCheckoutMixin):
+        return
+    metrics = _metrics_for(sync_engine.pool)
+
+    def on_checkout(dbapi_connection: Any, record: Any, proxy: Any) -> None:
+        metrics.checkouts += 1
+
+    def on_connect(dbapi_connection: Any, record: Any) -> None:
+        metrics.connects += 1
+
+    def on_invalidate(dbapi_connection: Any, record: Any, exception: Optional[BaseException]) -> None:
+        metrics.invalidations += 1
+
+    event.listen(sync_engine, "checkout", on_checkout)
+    event.listen(sync_engine, "connect", on_connect)
+    event.listen(sync_engine, "invalidate", on_invalidate)
+
+
+def engine_options(url: str, name: str, async_: bool = False) -> Dict[str, Any]:
+    """Return ``create_engine`` keyword arguments for ``url`` from the pool settings.
+
+    Args:
+        url: The database URL.
+        name: Names the pool in logs and ``pool_stats``.
+        async_: Whether the engine is created with ``create_async_engine``.
+    """
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_logging_name": name,
+        "echo": settings.SQL_ECHO,
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database in (None, "", ":memory:"):
+            # One shared connection, or every session would see an empty database
+            options["poolclass"] = StaticPool
+            return options
+        if not settings.DB_SQLITE_POOLED:
+            options["poolclass"] = NullPool
+            return options
+
+    options.update({
+        "poolclass": InstrumentedAsyncQueuePool if async_ else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    })
+    return options
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the metrics of every instrumented pool, by pool name."""
+    stats = {}
+    for name, metrics in _metrics.items():
+        pool = _pools[name]
+        stats[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(0, pool.overflow()),
+            "checkouts": metrics.checkouts,
+            "connects": metrics.connects,
+            "invalidations": metrics.invalidations,
+            "timeouts": metrics.timeouts,
+            "wait_p50": metrics.percentile(0.5),
+            "wait_p95": metrics.percentile(0.95),
+            "wait_max": metrics.max_wait,
+        }
+    return stats
+
@@ -0,0 +1,156 @@
+"""
+Read-replica routing for database sessions.
+
+``RoutingSession`` sends plain SELECTs to a healthy replica picked round
+robin from a ``ReplicaSet`` and everything else (flushes, DML, locking reads,
+raw SQL) to the primary. Once a session has written it stays on the primary,
+so a request always reads its own writes; ``use_primary`` pins a session to
+the primary up front, and a statement carrying the ``FORCE_PRIMARY`` execution
+option is sent there on its own.
+"""
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import Select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FORCE_PRIMARY = "force_primary"
+
+# Seconds the replica is behind the primary; 0 when not in recovery
+_POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "ELSE 0 END"
+)
+
+
+class Replica:
+    """One replica engine and its last health check.
+
+    Attributes:
+        healthy: Whether the replica may serve reads.
+        lag: Replication lag in seconds at the last check, if known.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.healthy = True
+        self.lag: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaSet:
+    """Replica engines with lag-aware health checks and round-robin selection.
+
+    A replica is taken out of rotation when it cannot be reached or lags the
+    primary by more than ``max_lag`` seconds, and put back once a later check
+    passes. When no replica is healthy, reads go to the primary.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], max_lag: Optional[float] = None) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self.max_lag = max_lag if max_lag is not None else settings.DATABASE_REPLICA_MAX_LAG
+        self._next = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def pick(self) -> Optional[Engine]:
+        """Return the sync engine of the next healthy replica, or None."""
+        if self._next is None:
+            return None
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next)]
+            if replica.healthy:
+                return replica.engine.sync_engine
+        return None
+
+    async def check(self) -> None:
+        """Probe every replica and update its health."""
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                if replica.engine.dialect.name == "postgresql":
+                    replica.lag = float(await conn.scalar(_POSTGRES_LAG_SQL))
+                else:
+                    await conn.execute(text("SELECT 1"))
+                    replica.lag = 0.0
+        except Exception as e:
+            if replica.healthy:
+                logger.warning(f"Read replica {replica.name} is unreachable: {e}")
+            replica.healthy = False
+            replica.lag = None
+            return
+
+        healthy = replica.lag <= self.max_lag
+        if healthy != replica.healthy:
+            logger.warning(
+                f"Read replica {replica.name} {'is back in' if healthy else 'taken out of'} "
+                f"rotation (lag {replica.lag:.1f}s)"
+            )
+        replica.healthy = healthy
+
+    async def run_health_checks(self, interval: Optional[float] = None) -> None:
+        """Check the replicas every ``interval`` seconds until cancelled."""
+        interval = interval or settings.DATABASE_REPLICA_CHECK_INTERVAL
+        while True:
+            await self.check()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"replica": r.name, "healthy": r.healthy, "lag": r.lag} for r in self.replicas
+        ]
+
+
+class RoutingSession(Session):
+    """A session that sends plain reads to a replica and the rest to the primary."""
+
+    def __init__(self, *args: Any, replicas: Optional[ReplicaSet] = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._wrote = False
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Any:
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            # DML, or raw SQL that may write
+            self._wrote = True
+            return primary
+        if (
+            self.replicas is None
+            or self._wrote
+            or self.info.get(FORCE_PRIMARY)
+            or clause is None
+            or clause._for_update_arg is not None
+            or clause.get_execution_options().get(FORCE_PRIMARY)
+        ):
+            return primary
+        return self.replicas.pick() or primary
+
+
+def on_primary(statement: Select) -> Select:
+    """Mark ``statement`` to run on the primary, leaving the rest of its session alone."""
+    return statement.execution_options(**{FORCE_PRIMARY: True})
+
+
+def use_primary(session: Union[Session, AsyncSession]) -> None:
+    """Route every later statement of ``session`` to the primary (read-your-writes)."""
+    session.info[FORCE_PRIMARY] = True
@@ -13,30 +13,25 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.db.pool import engine_options, instrument_engine
 
-# Database engine configuration
-engine_args = {
-    'pool_pre_ping': True,  # Enable connection health checks
-    'pool_recycle': 3600,    # Recycle connections after 1 hour
-}
+# Database engine configuration (pool parameters come from Settings)
+engine_args = engine_options(settings.DATABASE_URL, name="primary-sync")
 
 # Add PostgreSQL-specific configurations if not using SQLite
 if 'sqlite' not in settings.DATABASE_URL:
-    engine_args.update({
-        'pool_size': 10,        # Number of connections to keep open
-        'max_overflow': 20,     # Number of connections to allow in overflow
-        'connect_args': {
-            "connect_timeout": 10,  # Connection timeout in seconds
-            "keepalives": 1,       # Enable TCP keepalive
-            "keepalives_idle": 30,  # TCP keepalive idle time in seconds
-            "keepalives_interval": 10,  # TCP keepalive interval in seconds
-            "keepalives_count": 5,      # TCP keepalive count
-        },
-    })
+    engine_args['connect_args'] = {
+        "connect_timeout": 10,  # Connection timeout in seconds
+        "keepalives": 1,       # Enable TCP keepalive
+        "keepalives_idle": 30,  # TCP keepalive idle time in seconds
+        "keepalives_interval": 10,  # TCP keepalive interval in seconds
+        "keepalives_count": 5,      # TCP keepalive count
+    }
 
 
 # Create database engine
 engine: Engine = create_engine(settings.DATABASE_URL, **engine_args)
+instrument_engine(engine)
 
 # Create session factory with specific configurations
 SessionLocal: sessionmaker = sessionmaker(
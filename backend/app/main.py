@@ -1,5 +1,8 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Iterator
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -11,40 +14,78 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.api_v1.api import api_router
 from app.core.config import settings
+from app.core.logging import configure_logging
+from app.core.security import shutdown_password_hashing, tune_password_hashing
 from app.db.session import SessionLocal, engine
-from app.db.async_session import async_engine, AsyncSessionLocal
-from app.db.init_db import init_db
+from app.db.async_session import async_engine, AsyncSessionLocal, replica_set
+from app.db.replicas import use_primary
+from app.db.init_db import init_db, verify_schema_version
+from app.services.langchain.agent import close_travel_agent, get_travel_agent
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (non-blocking, see app.core.logging)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+@contextmanager
+def _startup_phase(name: str, timings: Dict[str, float]) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = (time.perf_counter() - started) * 1000
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Handle application startup and shutdown events.
     """
-    # Startup: Initialize database
-    logger.info("Initializing database...")
+    timings: Dict[str, float] = {}
+    
+    # Startup: Size the bcrypt cost to this host before anything is hashed
+    if settings.PASSWORD_HASH_AUTOTUNE:
+        with _startup_phase("password_hashing", timings):
+            await asyncio.to_thread(tune_password_hashing)
+    
+    # Startup: Bootstrap the database, or only check that it was bootstrapped
     try:
-        # Initialize database
-        async with AsyncSessionLocal() as session:
-            await init_db(session)
-            await session.commit()
-            
-        logger.info("Database initialization complete")
+        with _startup_phase(f"database_{settings.DB_STARTUP_MODE}", timings):
+            async with AsyncSessionLocal() as session:
+                use_primary(session)
+                if settings.DB_STARTUP_MODE == "verify":
+                    await verify_schema_version(session)
+                else:
+                    await init_db(session)
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         raise
     
+    # Startup: Take lagging or unreachable read replicas out of rotation
+    replica_checks = None
+    if replica_set:
+        with _startup_phase("replicas", timings):
+            await replica_set.check()
+        replica_checks = asyncio.create_task(replica_set.run_health_checks())
+    
+    # Startup: Build the chat agent now rather than on the first chat request
+    if settings.CHAT_AGENT_PRELOAD:
+        with _startup_phase("chat_agent", timings):
+            await asyncio.to_thread(get_travel_agent)
+    
+    logger.info(
+        "Startup complete in %.0f ms (%s)",
+        sum(timings.values()),
+        ", ".join(f"{name}={ms:.0f}ms" for name, ms in timings.items()),
+    )
+    
     yield
     
     # Shutdown: Clean up resources
     logger.info("Shutting down application...")
-    # Add any cleanup code here if needed
+    if replica_checks is not None:
+        replica_checks.cancel()
+        await replica_set.dispose()
+    await close_travel_agent()
+    shutdown_password_hashing()
 
 # Create FastAPI app with lifespan events
 app = FastAPI(
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -20,6 +20,10 @@ class Item(Base):
         updated_at: Timestamp when the item was last updated
     """
     __tablename__ = "items"
+    __table_args__ = (
+        # Keyset pagination, see CRUDBase.get_page
+        Index("ix_items_created_at_id", "created_at", "id"),
+    )
 
     id: int = Column(Integer, primary_key=True, index=True)
     title: str = Column(String(200), index=True, nullable=False)
@@ -27,7 +31,8 @@ class Item(Base):
     owner_id: int = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Timestamps
-    created_at: datetime = Column(DateTime(timezone=True), server_default=func.now())
+    # Part of the keyset pagination key, so never NULL
+    created_at: datetime = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: datetime = Column(
         DateTime(timezone=True), 
         server_default=func.now(),
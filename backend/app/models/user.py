@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -22,6 +22,10 @@ class User(Base):
         updated_at: Timestamp when the user was last updated
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination, see CRUDBase.get_page
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id: int = Column(Integer, primary_key=True, index=True)
     email: str = Column(String(255), unique=True, index=True, nullable=False)
@@ -31,7 +35,8 @@ class User(Base):
     is_superuser: bool = Column(Boolean, default=False, nullable=False)
     
     # Timestamps
-    created_at: datetime = Column(DateTime(timezone=True), server_default=func.now())
+    # Part of the keyset pagination key, so never NULL
+    created_at: datetime = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: datetime = Column(
         DateTime(timezone=True), 
         server_default=func.now(),
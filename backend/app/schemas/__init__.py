@@ -1,5 +1,13 @@
 from .user import User, UserCreate, UserInDB, UserUpdate
-from .item import Item, ItemCreate, ItemInDB, ItemUpdate
+from .item import (
+    BulkDeleteResult,
+    Item,
+    ItemBulkDelete,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemInDB,
+    ItemUpdate,
+)
 from .token import Token, TokenPayload
 
 __all__ = [
@@ -11,6 +19,9 @@ __all__ = [
     "ItemCreate",
     "ItemInDB",
     "ItemUpdate",
+    "ItemBulkUpdate",
+    "ItemBulkDelete",
+    "BulkDeleteResult",
     "Token",
     "TokenPayload",
 ]
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 # Shared properties
@@ -14,6 +14,18 @@ class ItemCreate(ItemBase):
 class ItemUpdate(ItemBase):
     pass
 
+# Properties to receive on bulk update, one entry per item
+class ItemBulkUpdate(ItemUpdate):
+    id: int
+
+# Items to remove in one bulk request
+class ItemBulkDelete(BaseModel):
+    ids: List[int]
+
+# Result of a bulk removal
+class BulkDeleteResult(BaseModel):
+    deleted: int
+
 # Properties shared by models stored in DB
 class ItemInDBBase(ItemBase):
     id: int
@@ -5,6 +5,15 @@ This module provides LangChain-based services for natural language processing
 and conversation handling in the TravelPal application.
 """
 
-from .agent import TravelAgent, travel_agent
+from typing import Any
 
-__all__ = ["TravelAgent", "travel_agent"]
+__all__ = ["TravelAgent", "get_travel_agent", "travel_agent"]
+
+
+def __getattr__(name: str) -> Any:
+    # Importing a submodule (e.g. the sessions store) must not import the agent
+    if name in __all__:
+        from . import agent
+
+        return getattr(agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
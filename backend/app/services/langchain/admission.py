@@ -0,0 +1,227 @@
+"""
+Admission control for outbound LLM requests.
+
+Bounds the number of concurrent provider calls, queues a bounded number of
+callers in priority lanes with per-user fairness, and sheds everything else
+immediately so overload surfaces as a fast 503 instead of piled-up timeouts.
+"""
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Admission lanes; lower values are served first."""
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+_HIGH_PRIORITY_RE = re.compile(
+    r"\b(book|booking|booked|confirm|confirmation|reservation|reserve|payment|pay|"
+    r"refund|cancel|cancellation|ticket|itinerary)\b",
+    re.IGNORECASE,
+)
+_SMALL_TALK_RE = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|thx|ok|okay|cool|great|bye|good (morning|evening|night)|"
+    r"how are you)\W*$",
+    re.IGNORECASE,
+)
+
+
+def classify_priority(message: str) -> Priority:
+    """Pick the admission lane for a chat message.
+
+    Turns about bookings, payments and cancellations are served first and
+    greetings or acknowledgements last.
+    """
+    if _HIGH_PRIORITY_RE.search(message):
+        return Priority.HIGH
+    if _SMALL_TALK_RE.match(message):
+        return Priority.LOW
+    return Priority.NORMAL
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of queued.
+
+    Attributes:
+        retry_after: Suggested seconds to wait before retrying.
+    """
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Async semaphore with a bounded, prioritized and fair wait queue.
+
+    Waiting callers are grouped in one lane per ``Priority``; inside a lane
+    users are served round-robin, so one user's burst cannot starve the
+    others. A caller is rejected with ``AdmissionRejected`` when the queue is
+    full, when the user already has ``per_user_limit`` requests admitted or
+    queued, or when no slot frees up within ``max_wait`` seconds.
+
+    Attributes:
+        max_concurrency: Maximum concurrent provider calls.
+        max_queue: Maximum callers waiting for a slot.
+        max_wait: Maximum seconds a caller waits for a slot.
+        per_user_limit: Maximum admitted plus queued requests per user.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        per_user_limit: Optional[int] = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.max_queue = max_queue if max_queue is not None else settings.LLM_MAX_QUEUE
+        self.max_wait = max_wait if max_wait is not None else settings.LLM_QUEUE_TIMEOUT
+        self.per_user_limit = per_user_limit or settings.LLM_PER_USER_MAX_REQUESTS
+
+        self._active = 0
+        self._queued = 0
+        self._lanes: Dict[Priority, "OrderedDict[Hashable, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        self._per_user: Dict[Hashable, int] = {}
+        # Moving average of how long a slot is held, for Retry-After estimates
+        self._avg_hold = 1.0
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _retry_after(self) -> float:
+        return float(max(1, math.ceil(self._avg_hold * (self._queued + 1) / self.max_concurrency)))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected += 1
+        logger.warning(f"LLM request shed: {reason}")
+        return AdmissionRejected(reason, retry_after=self._retry_after())
+
+    def check(self, user_id: Optional[Hashable] = None) -> None:
+        """Raise ``AdmissionRejected`` if a request would be shed right now.
+
+        Lets streaming endpoints fail with a status code before any response
+        bytes are sent.
+        """
+        if user_id is not None and self._per_user.get(user_id, 0) >= self.per_user_limit:
+            raise self._reject("too many concurrent requests for this user")
+        if self._active >= self.max_concurrency and self._queued >= self.max_queue:
+            raise self._reject("LLM request queue is full")
+
+    async def acquire(self, user_id: Optional[Hashable] = None, priority: Priority = Priority.NORMAL) -> None:
+        """Wait for a slot.
+
+        Raises:
+            AdmissionRejected: If the request is shed.
+        """
+        self.check(user_id)
+        if self._active < self.max_concurrency and self._queued == 0:
+            self._admit(user_id)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._lanes[priority].setdefault(user_id, deque()).append(future)
+        self._queued += 1
+        self._track_user(user_id, 1)
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            if not self._dequeue(priority, user_id, future) and future.done() and not future.cancelled():
+                return  # Granted just as the wait timed out
+            self.timeouts += 1
+            raise self._reject(f"no LLM capacity within {self.max_wait:g}s")
+        except asyncio.CancelledError:
+            if not self._dequeue(priority, user_id, future) and future.done() and not future.cancelled():
+                # Granted and cancelled at the same time: hand the slot on
+                self.release(user_id)
+            raise
+
+    def release(self, user_id: Optional[Hashable] = None) -> None:
+        """Return a slot and admit the next waiter."""
+        self._active -= 1
+        self._track_user(user_id, -1)
+        self._grant_next()
+
+    @asynccontextmanager
+    async def slot(
+        self, user_id: Optional[Hashable] = None, priority: Priority = Priority.NORMAL
+    ) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the ``async with`` block."""
+        await self.acquire(user_id, priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_hold = 0.9 * self._avg_hold + 0.1 * (time.monotonic() - started)
+            self.release(user_id)
+
+    def _admit(self, user_id: Optional[Hashable]) -> None:
+        self._active += 1
+        self.admitted += 1
+        self._track_user(user_id, 1)
+
+    def _track_user(self, user_id: Optional[Hashable], delta: int) -> None:
+        if user_id is None:
+            return
+        count = self._per_user.get(user_id, 0) + delta
+        if count > 0:
+            self._per_user[user_id] = count
+        else:
+            self._per_user.pop(user_id, None)
+
+    def _dequeue(self, priority: Priority, user_id: Optional[Hashable], future: asyncio.Future) -> bool:
+        """Remove a waiter that gave up; return False if it was already granted."""
+        waiters = self._lanes[priority].get(user_id)
+        if waiters is None or future not in waiters:
+            return False
+        waiters.remove(future)
+        if not waiters:
+            del self._lanes[priority][user_id]
+        self._queued -= 1
+        self._track_user(user_id, -1)
+        return True
+
+    def _grant_next(self) -> None:
+        for lane in self._lanes.values():
+            while lane and self._active < self.max_concurrency:
+                # Round-robin between users: serve the first user, then move them last
+                user_id, waiters = next(iter(lane.items()))
+                future = waiters.popleft()
+                if waiters:
+                    lane.move_to_end(user_id)
+                else:
+                    del lane[user_id]
+                self._queued -= 1
+                self._track_user(user_id, -1)
+                if future.done():
+                    continue
+                self._admit(user_id)
+                future.set_result(None)
+            if self._active >= self.max_concurrency:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Return admission counters."""
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
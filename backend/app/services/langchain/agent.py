@@ -1,111 +1,90 @@
 """
 LangChain agent service for handling chat interactions with Llama API.
+
+Importing this module does not build the shared ``TravelAgent`` or import
+``langchain`` and ``langchain_community``; both happen on the first call to
+``get_travel_agent`` (or at startup when ``CHAT_AGENT_PRELOAD`` is set). The
+session store still imports the lighter ``langchain_core.messages`` up front.
 """
+import asyncio
+import importlib.util
 import logging
-import sys
 import os
+import sys
+import threading
 import traceback
-import json
-import requests
-from typing import Dict, Any, Optional, List, Union, Type
+from contextlib import aclosing
+
+import httpx
+from typing import Dict, Any, AsyncIterator, Optional, List, Type
 
-# Configure logging with detailed format
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('travel_agent_debug.log')
-    ]
+from app.core.config import settings
+from app.core.logging import log_payload
+from app.core.redis_client import get_redis_client
+from app.services.langchain.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    Priority,
+    classify_priority,
 )
+from app.services.langchain.cache import ResponseCache, make_cache_key
+from app.services.langchain.cancellation import CancellationStats
+from app.services.langchain.client import LlamaClient
+from app.services.langchain.coalescing import SingleFlight
+from app.services.langchain.context import ContextWindow, get_context_budget
+from app.services.langchain.providers import Completion, LLMProvider, LlamaProvider, ProviderRouter, create_router
+from app.services.langchain.resilience import ResilientCaller
+from app.services.langchain.semantic_cache import NUMPY_AVAILABLE, SemanticCache, semantic_namespace
+from app.services.langchain.sessions import SessionStore, create_session_backend
+
 logger = logging.getLogger(__name__)
-logger.info(f"Python path: {sys.path}")
-logger.info(f"Current working directory: {os.getcwd()}")
-logger.info(f"Environment variables: {os.environ.get('PYTHONPATH', 'Not set')}")
 
-# Try to import LangChain components
-try:
-    logger.info("Attempting to import LangChain components...")
-    
-    try:
-        import langchain
-        import langchain_core
-        import langchain_community
-        logger.info(f"Successfully imported langchain ({langchain.__version__}), langchain_core, and langchain_community")
-    except ImportError as e:
-        logger.error(f"Failed to import LangChain core packages: {e}")
-        raise
-    
-    try:
-        # Import required components
-        import requests
-        import json
-        from typing import Dict, Any, Optional
-        from langchain.chains import LLMChain
-        from langchain.prompts import (
-            SystemMessagePromptTemplate,
-            HumanMessagePromptTemplate,
-            ChatPromptTemplate,
-        )
-        logger.info("Successfully imported components for Meta Cloud API")
-    except ImportError as e:
-        logger.error(f"Failed to import required components: {e}")
-        raise
-    
-    try:
-        # Import memory components
-        from langchain.memory import ConversationBufferMemory
-        # Try different import paths for BaseChatMessageHistory
+# Checked without importing anything; the packages are imported on first use
+LANGCHAIN_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None
+    for name in ("langchain", "langchain_core", "langchain_community")
+)
+if not LANGCHAIN_AVAILABLE:
+    logger.error("LangChain is not installed; the travel agent is disabled")
+
+_history_class: Optional[Type[Any]] = None
+
+
+def _chat_history_class() -> Type[Any]:
+    """Return the chat history class handed to LangChain, importing LangChain on first call."""
+    global _history_class
+    if _history_class is None:
         try:
-            from langchain.memory.chat_message_histories.base import BaseChatMessageHistory
-            logger.info("Successfully imported BaseChatMessageHistory from langchain.memory.chat_message_histories.base")
+            from langchain_core.chat_history import BaseChatMessageHistory
         except ImportError:
-            try:
-                from langchain.schema import BaseChatMessageHistory
-                logger.info("Successfully imported BaseChatMessageHistory from langchain.schema")
-            except ImportError as e:
-                logger.error(f"Failed to import BaseChatMessageHistory: {e}")
-                raise
-        logger.info("Successfully imported memory components")
-    except ImportError as e:
-        logger.error(f"Failed to import memory components: {e}")
-        raise
-    
-    try:
-        # Import our custom memory implementation
+            from langchain.schema import BaseChatMessageHistory
         from app.services.langchain.memory import PydanticV2CompatibleChatMessageHistory
-        logger.info("Successfully imported custom memory implementation")
-    except ImportError as e:
-        logger.error(f"Failed to import custom memory implementation: {e}")
-        logger.error(f"Current working directory: {os.getcwd()}")
-        logger.error(f"Files in current directory: {os.listdir()}")
-        raise
-    
-    try:
-        # Set up the chat message history class to use our custom implementation
+
         class CustomChatMessageHistory(PydanticV2CompatibleChatMessageHistory, BaseChatMessageHistory):
             """Wrapper class to make our custom history work with LangChain."""
             pass
-        logger.info("Successfully created CustomChatMessageHistory class")
-    except Exception as e:
-        logger.error(f"Failed to create CustomChatMessageHistory: {e}")
-        raise
-    
-    LANGCHAIN_AVAILABLE = True
-except ImportError as e:
-    logger.error(f"Failed to import LangChain components: {e}", exc_info=True)
-    LANGCHAIN_AVAILABLE = False
+
+        _history_class = CustomChatMessageHistory
+    return _history_class
+
+SYSTEM_PROMPT = "You are a helpful travel assistant."
 
 class TravelAgent:
     """A LangChain-based travel agent for handling chat interactions.
     
-    This class provides a simple interface for processing chat messages using LangChain's
-    LLMChain with conversation memory.
+    This class provides a simple interface for processing chat messages with the Llama API,
+    keeping a separate conversation memory for every user session.
     
     Attributes:
-        llm: The language model used for generating responses.
-        memory: The conversation memory for storing chat history.
-        conversation: The LLMChain for processing messages.
+        router: Picks the LLM provider for each call and falls back on failure.
+        client: The pooled async client used to call the Llama API.
+        sessions: The store of conversation histories keyed by user and session.
+        response_cache: Exact-match cache of responses, or None when disabled.
+        semantic_cache: Paraphrase-matching cache of responses, or None when disabled.
+        inflight: Deduplicates concurrent identical requests, or None when disabled.
+        admission: Bounds and prioritizes concurrent provider calls.
+        resilience: Retries, circuit breaker and hedging around provider calls.
+        cancellations: Generations abandoned by their callers, and tokens saved.
     """
     _instance = None
     
@@ -125,6 +104,7 @@ class TravelAgent:
         temperature: float = 0.7,
         max_tokens: int = 500,
         verbose: bool = True,
+        session_store: Optional[SessionStore] = None,
         **model_kwargs
     ) -> None:
         """Initialize the TravelAgent with the specified language model.
@@ -134,6 +114,8 @@ class TravelAgent:
             temperature: Controls randomness in the output (0.0 to 1.0).
             max_tokens: Maximum number of tokens to generate.
             verbose: Whether to enable verbose mode.
+            session_store: Store of per-user, per-session histories. Defaults to
+                the backend selected by ``CHAT_MEMORY_BACKEND``.
             **model_kwargs: Additional keyword arguments to pass to the model.
         """
         # Skip initialization if already initialized to avoid reinitialization in singleton pattern
@@ -158,14 +140,51 @@ class TravelAgent:
                 
             logger.info(f"Initializing TravelAgent with Llama API at {self.api_url}")
             logger.info(f"Using model: {self.model_name}")
+            
+            # Providers (each with a pooled async HTTP client) and the router between them
+            self.router: ProviderRouter = create_router(self.api_url, self.api_key)
                 
-            # Initialize conversation memory with our custom implementation
-            self.memory = ConversationBufferMemory(
-                memory_key="chat_history",
-                return_messages=True,
-                chat_memory=CustomChatMessageHistory()
+            # Conversation histories are kept per (user_id, session_id)
+            if session_store is None:
+                session_store = SessionStore(
+                    create_session_backend(history_factory=_chat_history_class())
+                )
+            self.sessions = session_store
+            
+            # Keeps each prompt within the model's token budget
+            self.context = ContextWindow(budget=get_context_budget(self.model_name))
+            
+            # Exact-match response cache in front of the API
+            self.response_cache: Optional[ResponseCache] = None
+            if settings.LLM_CACHE_ENABLED:
+                self.response_cache = ResponseCache(
+                    redis_client=get_redis_client() if settings.LLM_CACHE_REDIS_ENABLED else None
+                )
+            self.semantic_cache: Optional[SemanticCache] = None
+            if settings.LLM_SEMANTIC_CACHE_ENABLED:
+                if NUMPY_AVAILABLE:
+                    self.semantic_cache = SemanticCache()
+                else:
+                    logger.warning("NumPy is not installed; the semantic cache is disabled")
+            caching = self.response_cache is not None or self.semantic_cache is not None
+            if caching and self.temperature > settings.LLM_CACHE_MAX_TEMPERATURE:
+                logger.info(
+                    f"Response caching is inactive: temperature {self.temperature} is above "
+                    f"LLM_CACHE_MAX_TEMPERATURE ({settings.LLM_CACHE_MAX_TEMPERATURE})"
+                )
+            
+            # Concurrent identical prompts share one upstream call, which is only
+            # cancelled (and counted as such) once its last caller went away
+            self.cancellations = CancellationStats()
+            self.inflight: Optional[SingleFlight] = (
+                SingleFlight(on_abandon=lambda: self.cancellations.record(self.max_tokens))
+                if settings.LLM_COALESCE_REQUESTS else None
             )
             
+            # Bounds concurrent provider calls and sheds excess load
+            self.admission = AdmissionController()
+            self.resilience = ResilientCaller()
+            
             self.initialized = True
             logger.info(f"TravelAgent initialized with model: {model_name}")
             
@@ -173,18 +192,232 @@ class TravelAgent:
             logger.error(f"Failed to initialize TravelAgent: {e}")
             raise
     
-    def process_message(self, message: str) -> str:
+    def _build_messages(
+        self,
+        message: str,
+        history: List[Any],
+        session_key: Optional[Any] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages sent to the API for a new user message.
+        
+        The most recent history that fits the model's token budget is sent
+        verbatim; older turns are folded into a rolling summary.
+        
+        Args:
+            message: The user's (already stripped) message
+            history: The messages of the caller's session
+            session_key: Identifies the session whose rolling summary to reuse
+            offset: Messages trimmed from the head of ``history``
+            
+        Returns:
+            List[Dict[str, str]]: The system prompt, conversation context and new message
+        """
+        return self.context.build(
+            SYSTEM_PROMPT, history, message, state_key=session_key, offset=offset
+        )
+    
+    def _build_payload(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Build the request payload for the chat completions API."""
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            **self.model_kwargs
+        }
+    
+    async def _get_cached_response(self, payload: Dict[str, Any], message: str) -> Optional[str]:
+        """Return a cached response for the request, trying exact then semantic matches."""
+        if self.response_cache is not None and self.response_cache.is_cacheable(self.temperature):
+            cached = await self.response_cache.get(make_cache_key(payload))
+            if cached is not None:
+                logger.debug("Response cache hit")
+                return cached
+        if self.semantic_cache is not None and self.semantic_cache.is_cacheable(self.temperature):
+            cached = await self.semantic_cache.get(semantic_namespace(payload), message)
+            if cached is not None:
+                logger.debug("Semantic cache hit")
+                return cached
+        return None
+    
+    def _lookup_payload(self, payload: Dict[str, Any], priority: Priority) -> Dict[str, Any]:
+        """Return ``payload`` keyed on the model of the provider the request is routed to.
+        
+        Only used to look answers up, before any provider is called; answers are
+        stored under the model that actually produced them (see ``_remember``).
+        """
+        return self.router.rank(cheap=priority == Priority.LOW)[0].served_payload(payload)
+    
+    async def _remember(
+        self, history: Any, payload: Dict[str, Any], message: str, completion: Completion
+    ) -> None:
+        """Commit a fresh response to the session's memory and the response caches.
+        
+        The response is cached under the model of the provider that answered,
+        which after a fallback is not the one the request was routed to.
+        Stand-in answers from a fallback-only provider are neither remembered nor
+        cached: the model must not see them as its own turns, and they must stop
+        being served once the real providers recover.
+        """
+        if completion.provider.fallback_only:
+            return
+        await history.aadd_turn(message, completion.text)
+        await self._cache_response(
+            completion.provider.served_payload(payload), message, completion.text
+        )
+    
+    async def _cache_response(self, payload: Dict[str, Any], message: str, response: str) -> None:
+        """Store a fresh response in the caches that accept the request."""
+        if self.response_cache is not None and self.response_cache.is_cacheable(self.temperature):
+            await self.response_cache.set(make_cache_key(payload), response)
+        if self.semantic_cache is not None and self.semantic_cache.is_cacheable(self.temperature):
+            await self.semantic_cache.set(semantic_namespace(payload), message, response)
+    
+    @property
+    def client(self) -> Optional[LlamaClient]:
+        """The pooled client of the Llama provider, or None when ``LLM_PROVIDERS`` has none."""
+        provider = self.router.providers.get(LlamaProvider.name)
+        return provider.client if provider is not None else None
+    
+    @client.setter
+    def client(self, client: LlamaClient) -> None:
+        provider = self.router.providers.get(LlamaProvider.name)
+        if provider is None:
+            raise ValueError(
+                f"No {LlamaProvider.name!r} provider is configured; add it to LLM_PROVIDERS"
+            )
+        provider.client = client
+    
+    async def _admitted_complete(
+        self, payload: Dict[str, Any], user_id: Optional[int], priority: Priority
+    ) -> Completion:
+        # Fail fast while the provider is down instead of queueing for a slot
+        self.resilience.breaker.reject_if_open()
+        async with self.admission.slot(user_id, priority):
+            return await self.resilience.call(
+                lambda: self.router.complete(payload, cheap=priority == Priority.LOW)
+            )
+    
+    async def _complete(
+        self, payload: Dict[str, Any], user_id: Optional[int], priority: Priority
+    ) -> Completion:
+        """Send a completion request, joining an identical one already in flight."""
+        if self.inflight is None:
+            try:
+                return await self._admitted_complete(payload, user_id, priority)
+            except asyncio.CancelledError:
+                self.cancellations.record(self.max_tokens)
+                raise
+        return await self.inflight.do(
+            make_cache_key(payload),
+            lambda: self._admitted_complete(payload, user_id, priority),
+        )
+    
+    async def stream_message(
+        self,
+        message: str,
+        *,
+        user_id: Optional[int] = None,
+        session_id: Optional[str] = None,
+        priority: Optional[Priority] = None,
+    ) -> AsyncIterator[str]:
+        """Process a message and yield the assistant's response token by token.
+        
+        The assembled response is only committed to the conversation memory once
+        the provider stream has completed, so an aborted stream leaves no trace.
+        
+        Args:
+            message: The user's message to process
+            user_id: The ID of the user the conversation belongs to
+            session_id: The user's conversation session, or the default session
+            priority: Admission lane; classified from the message if omitted
+            
+        Yields:
+            str: Each text delta as it arrives from the API
+            
+        Raises:
+            ValueError: If the message is empty or contains only whitespace
+            AdmissionRejected: If the request is shed under load
+            httpx.HTTPError: If there's an error making the API request
+        """
+        if not message or not message.strip():
+            raise ValueError("Message cannot be empty")
+            
+        if not self.api_key:
+            raise ValueError("API key is not set. Please set LLAMA_API_KEY environment variable.")
+            
+        message = message.strip()
+        session_key = self.sessions.make_key(user_id, session_id)
+        history = self.sessions.get_history(user_id, session_id)
+        offset, past_messages = await history.aget_window()
+        payload = self._build_payload(self._build_messages(message, past_messages, session_key, offset))
+        if priority is None:
+            priority = classify_priority(message)
+        
+        # A cached response is replayed as a single chunk
+        cached = await self._get_cached_response(self._lookup_payload(payload, priority), message)
+        if cached is not None:
+            yield cached
+            await history.aadd_turn(message, cached)
+            return
+        
+        log_payload(logger, "Streaming request payload", payload)
+        
+        parts: List[str] = []
+        provider: Optional[LLMProvider] = None
+        try:
+            self.resilience.breaker.reject_if_open()
+            async with self.admission.slot(user_id, priority):
+                # Closed as soon as this stream is, so the provider request is dropped too
+                async with aclosing(self.resilience.stream(
+                    lambda: self.router.stream(payload, cheap=priority == Priority.LOW)
+                )) as chunks:
+                    async for chunk in chunks:
+                        provider = chunk.provider
+                        parts.append(chunk.text)
+                        yield chunk.text
+        except httpx.HTTPError as e:
+            logger.error(f"Error streaming from Llama API: {str(e)}")
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # The caller went away: neither the response nor the memory update is needed
+            self.cancellations.record(
+                self.max_tokens, self.context.counter.count("".join(parts)), stream=True
+            )
+            raise
+        
+        # Update conversation memory once the full response is known
+        if provider is not None:
+            await self._remember(history, payload, message, Completion("".join(parts), provider))
+    
+    async def process_message(
+        self,
+        message: str,
+        *,
+        user_id: Optional[int] = None,
+        session_id: Optional[str] = None,
+        priority: Optional[Priority] = None,
+    ) -> str:
         """Process a message using Llama API and return the assistant's response.
         
+        The request is sent over the agent's pooled async HTTP client, so awaiting
+        this method never blocks the event loop. Only the history of the given
+        user's session is sent along with the message.
+        
         Args:
             message: The user's message to process
+            user_id: The ID of the user the conversation belongs to
+            session_id: The user's conversation session, or the default session
+            priority: Admission lane; classified from the message if omitted
             
         Returns:
             str: The assistant's response
             
         Raises:
             ValueError: If the message is empty or contains only whitespace
-            requests.exceptions.RequestException: If there's an error making the API request
+            AdmissionRejected: If the request is shed under load
+            httpx.HTTPError: If there's an error making the API request
             Exception: For other unexpected errors
         """
         # Validate input
@@ -197,104 +430,107 @@ class TravelAgent:
         message = message.strip()
             
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Prepare the conversation history
-            messages = [
-                {"role": "system", "content": "You are a helpful travel assistant."}
-            ]
-            
-            # Add conversation history if available
-            if hasattr(self, 'memory') and hasattr(self.memory, 'chat_memory'):
-                for msg in self.memory.chat_memory.messages:
-                    role = "user" if msg.type == "human" else "assistant"
-                    messages.append({
-                        "role": role,
-                        "content": msg.content
-                    })
-            
-            # Add the new message
-            messages.append({"role": "user", "content": message})
-            
             # Prepare the request payload
-            payload = {
-                "model": self.model_name,
-                "messages": messages,
-                "temperature": self.temperature,
-                "max_tokens": self.max_tokens,
-                **self.model_kwargs
-            }
-            
-            logger.debug(f"Sending request to {self.api_url} with payload: {json.dumps(payload, indent=2)}")
-            
-            # Make the API request
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=30
+            session_key = self.sessions.make_key(user_id, session_id)
+            history = self.sessions.get_history(user_id, session_id)
+            offset, past_messages = await history.aget_window()
+            payload = self._build_payload(
+                self._build_messages(message, past_messages, session_key, offset)
             )
-            response.raise_for_status()
+            if priority is None:
+                priority = classify_priority(message)
             
-            # Extract the response
-            result = response.json()
-            logger.debug(f"Received response: {json.dumps(result, indent=2)}")
+            # Serve repeated and paraphrased prompts from the response caches
+            cached = await self._get_cached_response(self._lookup_payload(payload, priority), message)
+            if cached is not None:
+                await history.aadd_turn(message, cached)
+                return cached
             
-            # Handle error responses
-            if 'error' in result:
-                error_msg = result.get('error', {}).get('message', 'Unknown error')
-                logger.error(f"API error: {error_msg}")
-                raise requests.exceptions.HTTPError(f"API error: {error_msg}", response=response)
+            log_payload(logger, "Request payload", payload)
             
-            # Handle different successful response formats
-            if 'completion_message' in result and 'content' in result['completion_message']:
-                content = result['completion_message']['content']
-                if isinstance(content, dict) and 'text' in content:
-                    assistant_message = content['text']
-                else:
-                    assistant_message = str(content)
-            elif 'choices' in result and result['choices']:
-                assistant_message = result['choices'][0]['message']['content']
-            else:
-                logger.error(f"Unexpected response format: {result}")
-                raise ValueError("Unexpected response format from API")
+            # Make the API request
+            completion = await self._complete(payload, user_id, priority)
+            log_payload(logger, "Response", completion.text)
             
-            # Update conversation memory
-            if hasattr(self, 'memory') and hasattr(self.memory, 'chat_memory'):
-                self.memory.chat_memory.add_user_message(message)
-                self.memory.chat_memory.add_ai_message(assistant_message)
+            # Update the session's conversation memory
+            await self._remember(history, payload, message, completion)
             
-            return assistant_message
+            return completion.text
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             error_msg = f"Error making request to Llama API: {str(e)}"
-            if hasattr(e, 'response') and e.response is not None:
+            if isinstance(e, httpx.HTTPStatusError):
                 error_msg += f"\nStatus code: {e.response.status_code}"
                 try:
                     error_msg += f"\nResponse: {e.response.text}"
-                except:
+                except Exception:
                     pass
             logger.error(error_msg)
             raise
             
+        except AdmissionRejected:
+            raise
+            
         except Exception as e:
             logger.error(f"Unexpected error processing message: {str(e)}")
             logger.error(f"Error type: {type(e).__name__}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             return "I'm sorry, I encountered an error while processing your request. Please try again later."
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return runtime counters of the agent's components."""
+        return {
+            "response_cache": self.response_cache.stats() if self.response_cache is not None else None,
+            "semantic_cache": self.semantic_cache.stats() if self.semantic_cache is not None else None,
+            "coalescing": self.inflight.stats() if self.inflight is not None else None,
+            "admission": self.admission.stats(),
+            "resilience": self.resilience.stats(),
+            "cancellations": self.cancellations.stats(),
+            "providers": self.router.stats(),
+        }
+    
+    async def aclose(self) -> None:
+        """Release the pooled HTTP connections held by the agent."""
+        if hasattr(self, 'router'):
+            await self.router.aclose()
+
+# The shared agent, built on first use so importing this module stays cheap
+_travel_agent: Optional[TravelAgent] = None
+_travel_agent_failed = False
+_travel_agent_lock = threading.Lock()
+
+
+def get_travel_agent() -> Optional[TravelAgent]:
+    """Return the shared travel agent, building it on the first call.
+
+    Returns None when LangChain is not installed or the agent cannot be built
+    (e.g. no API key); the failure is logged once and not retried.
+    """
+    global _travel_agent, _travel_agent_failed
+    if _travel_agent is not None or _travel_agent_failed:
+        return _travel_agent
+    with _travel_agent_lock:
+        if _travel_agent is None and not _travel_agent_failed:
+            if not LANGCHAIN_AVAILABLE:
+                _travel_agent_failed = True
+                return None
+            try:
+                _travel_agent = TravelAgent()
+                logger.info("Initialized global travel_agent instance")
+            except Exception as e:
+                logger.error(f"Failed to initialize global travel_agent: {e}")
+                _travel_agent_failed = True
+    return _travel_agent
+
+
+async def close_travel_agent() -> None:
+    """Release the shared agent's connections, if it was ever built."""
+    if _travel_agent is not None:
+        await _travel_agent.aclose()
+
 
-# Singleton instance of the travel agent
-# Only create the singleton if we're not in test mode
-if 'pytest' not in sys.modules and LANGCHAIN_AVAILABLE:
-    try:
-        travel_agent = TravelAgent()
-        logger.info("Initialized global travel_agent instance")
-    except Exception as e:
-        logger.error(f"Failed to initialize global travel_agent: {e}")
-        travel_agent = None
-else:
-    # In test mode, we'll create the instance in the tests
-    travel_agent = None
+def __getattr__(name: str) -> Any:
+    # ``travel_agent`` is kept importable, but is now built on first access
+    if name == "travel_agent":
+        return get_travel_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
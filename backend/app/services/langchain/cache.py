@@ -0,0 +1,136 @@
+"""
+Exact-match cache of LLM responses for the travel agent.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import anyio
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and collapse whitespace so trivially different prompts share a key."""
+    return " ".join(str(text).casefold().split())
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """Hash a chat completion payload into a cache key.
+
+    The key covers the model, sampling parameters, system prompt, the history
+    actually sent and the new message, with message text normalized.
+
+    Args:
+        payload: The chat completion request body.
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    params = {k: v for k, v in payload.items() if k not in ("messages", "stream")}
+    messages = [
+        [m.get("role"), normalize_text(m.get("content", ""))]
+        for m in payload.get("messages", [])
+    ]
+    raw = json.dumps([params, messages], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache of assistant responses keyed by ``make_cache_key``.
+
+    An in-process LRU serves repeated prompts without any I/O; an optional
+    Redis tier shares entries between workers. Redis failures are logged and
+    treated as misses so the cache can never break a chat turn.
+
+    Attributes:
+        max_temperature: Requests sampled above this temperature are not cached.
+        hits: Lookups answered from either tier.
+        misses: Lookups that had to go to the provider.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[int] = None,
+        max_temperature: Optional[float] = None,
+        redis_client: Any = None,
+        key_prefix: Optional[str] = None,
+    ) -> None:
+        """Create the cache.
+
+        Args:
+            maxsize: Entries kept in process.
+            ttl: Seconds an entry stays valid in both tiers.
+            max_temperature: Highest temperature considered deterministic enough to cache.
+            redis_client: Optional ``redis.Redis`` compatible client for the shared tier.
+            key_prefix: Prefix of the Redis keys.
+        """
+        self.ttl = ttl if ttl is not None else settings.LLM_CACHE_TTL
+        self.max_temperature = (
+            max_temperature if max_temperature is not None
+            else settings.LLM_CACHE_MAX_TEMPERATURE
+        )
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix if key_prefix is not None else settings.LLM_CACHE_REDIS_KEY_PREFIX
+        self._local: LRUCache[str, str] = LRUCache(
+            maxsize=maxsize or settings.LLM_CACHE_MAX_ENTRIES, ttl=self.ttl
+        )
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.redis_errors = 0
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Whether responses sampled at ``temperature`` may be cached."""
+        return temperature <= self.max_temperature
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key``, or None on a miss."""
+        value = self._local.get(key)
+        if value is None and self.redis_client is not None:
+            try:
+                raw = await anyio.to_thread.run_sync(self.redis_client.get, self.key_prefix + key)
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Response cache Redis lookup failed: {e}")
+                raw = None
+            if raw is not None:
+                value = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+                self._local.set(key, value)
+                self.redis_hits += 1
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key`` in both tiers."""
+        self._local.set(key, value)
+        if self.redis_client is not None:
+            try:
+                await anyio.to_thread.run_sync(
+                    lambda: self.redis_client.set(self.key_prefix + key, value, ex=self.ttl)
+                )
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Response cache Redis write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "redis_hits": self.redis_hits,
+            "redis_errors": self.redis_errors,
+            "entries": len(self._local),
+            "evictions": self._local.evictions,
+        }
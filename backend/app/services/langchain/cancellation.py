@@ -0,0 +1,43 @@
+"""
+Accounting of LLM generations cancelled before they finished.
+"""
+from typing import Any, Dict
+
+
+class CancellationStats:
+    """Counts generations abandoned because their caller went away.
+
+    A generation is cancelled when the client disconnects, cancels it over the
+    WebSocket, or the server shuts down; its provider request, queued admission
+    and memory update are dropped with it.
+
+    Attributes:
+        cancelled: Generations cancelled while queued for or awaiting a provider.
+        cancelled_streams: Of those, streamed generations.
+        tokens_streamed: Tokens already generated when their stream was cancelled.
+        tokens_saved: Upper-bound estimate of completion tokens not generated: the
+            ``max_tokens`` budget of every cancelled generation minus what it streamed.
+    """
+
+    def __init__(self) -> None:
+        self.cancelled = 0
+        self.cancelled_streams = 0
+        self.tokens_streamed = 0
+        self.tokens_saved = 0
+
+    def record(self, max_tokens: int, streamed_tokens: int = 0, stream: bool = False) -> None:
+        """Record one cancelled generation."""
+        self.cancelled += 1
+        if stream:
+            self.cancelled_streams += 1
+        self.tokens_streamed += streamed_tokens
+        self.tokens_saved += max(0, max_tokens - streamed_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cancellation counters."""
+        return {
+            "cancelled": self.cancelled,
+            "cancelled_streams": self.cancelled_streams,
+            "tokens_streamed": self.tokens_streamed,
+            "tokens_saved": self.tokens_saved,
+        }
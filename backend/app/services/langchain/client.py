@@ -0,0 +1,151 @@
+"""
+Async HTTP client for the Llama chat completions API.
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional ``h2`` package (installed by ``httpx[http2]``)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class LlamaAPIError(httpx.HTTPError):
+    """Raised when the API answers with an error payload instead of a completion."""
+
+
+class LlamaClient:
+    """A long-lived, pooled async client for the Llama API.
+
+    One instance is shared by every request handled by a worker, so TCP/TLS
+    connections are kept alive and reused instead of being re-established for
+    each chat turn.
+
+    Attributes:
+        api_url: The chat completions endpoint.
+        api_key: The bearer token sent with every request.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        api_key: Optional[str],
+        *,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """Configure the client; the underlying connection pool is created lazily.
+
+        Args:
+            api_url: The chat completions endpoint.
+            api_key: The bearer token sent with every request.
+            timeout: Per-request timeout in seconds.
+            http2: Whether to negotiate HTTP/2 (ignored if ``h2`` is not installed).
+            max_connections: Upper bound on open connections in the pool.
+            max_keepalive_connections: Idle connections kept alive for reuse.
+            keepalive_expiry: Seconds an idle connection is kept before closing.
+            transport: Optional transport override, mainly for tests.
+        """
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = timeout if timeout is not None else settings.LLM_REQUEST_TIMEOUT
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=(
+                max_keepalive_connections or settings.LLM_POOL_MAX_KEEPALIVE
+            ),
+            keepalive_expiry=(
+                keepalive_expiry if keepalive_expiry is not None
+                else settings.LLM_POOL_KEEPALIVE_EXPIRY
+            ),
+        )
+
+        http2 = settings.LLM_HTTP2 if http2 is None else http2
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but 'h2' is not installed; falling back to HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared ``httpx.AsyncClient``, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def complete(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a chat completion request and return the decoded JSON body.
+
+        Args:
+            payload: The request body.
+
+        Returns:
+            Dict[str, Any]: The decoded response.
+
+        Raises:
+            httpx.HTTPError: On transport errors or non-2xx responses.
+        """
+        response = await self.client.post(self.api_url, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Send a streaming chat completion request and yield each decoded event.
+
+        The API answers with Server-Sent Events; every ``data:`` line is decoded
+        and yielded until the stream ends or a ``[DONE]`` sentinel arrives.
+
+        Args:
+            payload: The request body; ``stream`` is forced on.
+
+        Yields:
+            Dict[str, Any]: Each decoded stream event.
+
+        Raises:
+            httpx.HTTPError: On transport errors or non-2xx responses.
+        """
+        async with self.client.stream(
+            "POST", self.api_url, json={**payload, "stream": True}
+        ) as response:
+            if response.is_error:
+                await response.aread()
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                if data:
+                    yield json.loads(data)
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
@@ -0,0 +1,94 @@
+"""
+Single-flight deduplication of concurrent identical LLM requests.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call(Generic[T]):
+    """An upstream call shared by every caller waiting on the same key."""
+    task: "asyncio.Task[T]"
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one upstream call.
+
+    The first caller for a key (the leader) starts the call as a task; callers
+    arriving while it is in flight await the same task and share its result or
+    exception. A caller that is cancelled stops waiting without affecting the
+    others, and the upstream call is cancelled once nobody waits for it.
+
+    Attributes:
+        leaders: Calls that went upstream.
+        collapsed: Calls answered by another caller's upstream call.
+        abandoned: Upstream calls cancelled because every waiter went away.
+    """
+
+    def __init__(self, on_abandon: Optional[Callable[[], None]] = None) -> None:
+        """
+        Args:
+            on_abandon: Called whenever an upstream call is cancelled because
+                its last waiter went away.
+        """
+        self._calls: Dict[Hashable, _Call[Any]] = {}
+        self.on_abandon = on_abandon
+        self.leaders = 0
+        self.collapsed = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of ``fn()``, sharing it with concurrent callers of ``key``.
+
+        Args:
+            key: Identifies identical calls.
+            fn: Starts the upstream call; only invoked by the leader.
+
+        Returns:
+            The upstream call's result.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(task=asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.leaders += 1
+        else:
+            self.collapsed += 1
+            logger.debug("Joined in-flight request (%d already waiting)", call.waiters)
+
+        call.waiters += 1
+        try:
+            # Shielded so one cancelled waiter does not cancel the shared call
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
+                self.abandoned += 1
+                if self.on_abandon is not None:
+                    self.on_abandon()
+
+    def _forget(self, key: Hashable, call: _Call[Any]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return collapse counters."""
+        return {
+            "leaders": self.leaders,
+            "collapsed": self.collapsed,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._calls),
+        }
@@ -0,0 +1,225 @@
+"""
+Token-budgeted prompt window for the travel agent.
+
+Keeps the most recent turns of a conversation within a per-model token budget
+and folds older turns into a rolling summary message.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Tokens added by the chat format around every message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+# (previous summary, newly folded messages) -> new summary
+Summarizer = Callable[[str, Sequence[Any]], str]
+
+
+def get_context_budget(model_name: str) -> int:
+    """Return the prompt token budget configured for ``model_name``."""
+    return settings.LLM_CONTEXT_TOKEN_BUDGETS.get(
+        model_name, settings.LLM_DEFAULT_CONTEXT_TOKEN_BUDGET
+    )
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken, caching the count of every message seen.
+
+    History messages are re-sent on every turn, so each one is tokenized once
+    and then served from an LRU cache. Falls back to a ~4 characters per token
+    estimate when tiktoken (or its encoding data) is unavailable.
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base", cache_size: int = 50_000) -> None:
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._encoding_failed = not TIKTOKEN_AVAILABLE
+        self._cache: LRUCache[str, int] = LRUCache(maxsize=cache_size)
+
+    def _encode_len(self, text: str) -> int:
+        if self._encoding is None and not self._encoding_failed:
+            try:
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception as e:
+                logger.warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+                self._encoding_failed = True
+        if self._encoding is None:
+            return len(text) // 4 + 1
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in ``text``."""
+        cached = self._cache.get(text)
+        if cached is None:
+            cached = self._encode_len(text)
+            self._cache.set(text, cached)
+        return cached
+
+    def count_message(self, content: str) -> int:
+        """Return the tokens a chat message with ``content`` takes up."""
+        return self.count(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _role(message: Any) -> str:
+    return "user" if getattr(message, "type", "human") == "human" else "assistant"
+
+
+def extractive_summarizer(max_chars_per_message: int = 200) -> Summarizer:
+    """Build a summarizer that appends a clipped line per folded message.
+
+    It needs no model call, so folding old turns adds no latency.
+    """
+    def summarize(summary: str, messages: Sequence[Any]) -> str:
+        lines = [summary] if summary else []
+        for message in messages:
+            text = " ".join(str(message.content).split())
+            if len(text) > max_chars_per_message:
+                text = text[:max_chars_per_message].rstrip() + "..."
+            speaker = "User" if _role(message) == "user" else "Assistant"
+            lines.append(f"{speaker}: {text}")
+        return "\n".join(lines)
+    return summarize
+
+
+@dataclass
+class _SummaryState:
+    """Rolling summary of the first ``folded`` messages of a session.
+
+    Messages are counted from the start of the session, including those since
+    trimmed from the head of its history.
+    """
+    summary: str
+    folded: int
+    boundary: str  # Content of the last folded message, to detect replaced histories
+
+
+class ContextWindow:
+    """Builds the prompt for a turn within a token budget.
+
+    The newest messages that fit in the budget are sent verbatim; everything
+    older is folded into a summary message that is maintained incrementally per
+    session, so each turn only summarizes the messages that just fell out of the
+    window.
+
+    Attributes:
+        budget: Maximum prompt tokens, including system prompt and new message.
+        summary_max_tokens: Upper bound on the summary message.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        counter: Optional[TokenCounter] = None,
+        summary_max_tokens: Optional[int] = None,
+        summarizer: Optional[Summarizer] = None,
+    ) -> None:
+        self.budget = budget
+        self.counter = counter or TokenCounter()
+        self.summary_max_tokens = (
+            summary_max_tokens if summary_max_tokens is not None
+            else settings.LLM_SUMMARY_MAX_TOKENS
+        )
+        self.summarizer = summarizer or extractive_summarizer()
+        self._summaries: LRUCache[Hashable, _SummaryState] = LRUCache(
+            maxsize=settings.CHAT_SESSION_MAX_SESSIONS,
+            ttl=settings.CHAT_SESSION_TTL,
+        )
+
+    def _summary_tokens(self, summary: str) -> int:
+        return self.counter.count_message(SUMMARY_PREFIX + summary)
+
+    def _clip_summary(self, summary: str) -> str:
+        """Drop the oldest summary lines until the summary message fits ``summary_max_tokens``."""
+        lines = summary.split("\n")
+        while lines and self._summary_tokens("\n".join(lines)) > self.summary_max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def _summarize(
+        self, state_key: Optional[Hashable], history: Sequence[Any], cut: int, offset: int = 0
+    ) -> str:
+        """Return the summary of everything before ``history[cut]``, reusing earlier work.
+
+        ``history[i]`` is message ``offset + i`` of the session, so a history
+        trimmed at the head (with ``offset`` advanced accordingly) keeps
+        extending the same summary.
+        """
+        end = offset + cut
+        state = self._summaries.get(state_key) if state_key is not None else None
+        if (
+            state is None
+            or state.folded > end
+            or (
+                state.folded > offset
+                and str(history[state.folded - offset - 1].content) != state.boundary
+            )
+        ):
+            # No usable state (new session, or history was cleared or replaced)
+            state = _SummaryState(summary="", folded=0, boundary="")
+
+        if end > state.folded:
+            # Messages trimmed before they were ever folded are lost
+            start = max(state.folded - offset, 0)
+            summary = self._clip_summary(self.summarizer(state.summary, history[start:cut]))
+            state = _SummaryState(summary=summary, folded=end, boundary=str(history[cut - 1].content))
+            if state_key is not None:
+                self._summaries.set(state_key, state)
+        return state.summary
+
+    def build(
+        self,
+        system_prompt: str,
+        history: Sequence[Any],
+        message: str,
+        state_key: Optional[Hashable] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for a turn.
+
+        Args:
+            system_prompt: The system prompt.
+            history: The session's messages, oldest first.
+            message: The new user message.
+            state_key: Identifies the session whose rolling summary to reuse.
+            offset: Messages trimmed from the head of ``history`` since the session began.
+
+        Returns:
+            List[Dict[str, str]]: The system prompt, optional summary, recent history and new message.
+        """
+        used = self.counter.count_message(system_prompt) + self.counter.count_message(message)
+        available = self.budget - used
+
+        # Walk back from the newest message while the window has room; reserve
+        # space for the summary as soon as anything has to be dropped.
+        cut = len(history)
+        kept = 0
+        for index in range(len(history) - 1, -1, -1):
+            cost = self.counter.count_message(str(history[index].content))
+            reserve = self.summary_max_tokens if index > 0 else 0
+            if kept + cost + reserve > available:
+                break
+            kept += cost
+            cut = index
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if cut > 0:
+            summary = self._summarize(state_key, history, cut, offset)
+            if summary:
+                messages.append({"role": "system", "content": SUMMARY_PREFIX + summary})
+        for msg in history[cut:]:
+            messages.append({"role": _role(msg), "content": msg.content})
+        messages.append({"role": "user", "content": message})
+        return messages
@@ -1,12 +1,12 @@
 """
 Custom memory implementations for LangChain to handle Pydantic v2 compatibility.
 """
+import json
 import logging
-import sys
-from typing import List, Dict, Any, Optional, Sequence
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import anyio
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Try to import LangChain message types
@@ -14,9 +14,7 @@ try:
     from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, message_to_dict, messages_from_dict
     LANGCHAIN_MESSAGES_AVAILABLE = True
 except ImportError as e:
-    logger.error(f"Failed to import LangChain message types: {e}")
-    logger.error(f"Python path: {sys.path}")
-    logger.error(f"Installed packages: {__import__('pip').internal.utils.misc.get_installed_distributions()}")
+    logger.warning(f"LangChain message types are not available, using fallback classes: {e}")
     LANGCHAIN_MESSAGES_AVAILABLE = False
     
     # Create dummy classes for type checking when imports fail
@@ -44,51 +42,93 @@ except ImportError as e:
 class PydanticV2CompatibleChatMessageHistory:
     """A chat message history that's compatible with Pydantic v2 and LangChain."""
     
-    def __init__(self, messages: Optional[List[BaseMessage]] = None):
-        """Initialize with optional list of messages."""
+    def __init__(
+        self,
+        messages: Optional[List[BaseMessage]] = None,
+        max_messages: Optional[int] = None,
+    ):
+        """Initialize with optional list of messages.
+        
+        Args:
+            messages: Initial messages, oldest first
+            max_messages: Keep only the most recent messages, or all if None
+        """
         logger.debug("Initializing PydanticV2CompatibleChatMessageHistory")
         if not LANGCHAIN_MESSAGES_AVAILABLE:
             logger.warning("LangChain message types not available, using fallback implementation")
         self._messages: List[BaseMessage] = messages or []
-        logger.debug(f"Initialized with {len(self._messages)} messages")
+        self.max_messages = max_messages
+        self._appended = len(self._messages)
+        logger.debug("Initialized with %d messages", len(self._messages))
     
     @property
     def messages(self) -> List[BaseMessage]:
         """Retrieve the current list of messages."""
-        logger.debug(f"Getting {len(self._messages)} messages")
+        logger.debug("Getting %d messages", len(self._messages))
         return self._messages
     
     @messages.setter
     def messages(self, value: List[BaseMessage]) -> None:
         """Set the messages list."""
-        logger.debug(f"Setting {len(value) if value else 0} messages")
+        logger.debug("Setting %d messages", len(value) if value else 0)
         if not isinstance(value, list):
             logger.warning(f"Expected list of messages, got {type(value)}")
             value = []
         self._messages = value
+        self._appended = len(value)
     
-    def add_message(self, message: BaseMessage) -> None:
-        """Add a message to the history."""
-        logger.debug(f"Adding message: {getattr(message, 'content', '[no content]')}")
+    @property
+    def offset(self) -> int:
+        """Number of messages trimmed from the head of the history."""
+        return self._appended - len(self._messages)
+    
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Append messages, dropping the oldest beyond ``max_messages``."""
         if not hasattr(self, '_messages'):
             self._messages = []
-        self._messages.append(message)
+            self._appended = 0
+        self._messages.extend(messages)
+        self._appended += len(messages)
+        if self.max_messages and len(self._messages) > self.max_messages:
+            del self._messages[:-self.max_messages]
+    
+    def add_message(self, message: BaseMessage) -> None:
+        """Add a message to the history."""
+        logger.debug("Adding %s message", getattr(message, 'type', 'unknown'))
+        self.add_messages([message])
     
     def add_user_message(self, message: str) -> None:
         """Add a user message to the history."""
-        self._messages.append(HumanMessage(content=message))
+        self.add_messages([HumanMessage(content=message)])
     
     def add_ai_message(self, message: str) -> None:
         """Add an AI message to the history."""
-        self._messages.append(AIMessage(content=message))
+        self.add_messages([AIMessage(content=message)])
     
     def add_system_message(self, message: str) -> None:
         """Add a system message to the history."""
-        self._messages.append(SystemMessage(content=message))
+        self.add_messages([SystemMessage(content=message)])
+    
+    def add_turn(self, user_message: str, ai_message: str) -> None:
+        """Add a user message and the AI reply to the history."""
+        self.add_messages([HumanMessage(content=user_message), AIMessage(content=ai_message)])
+    
+    async def aget_messages(self) -> List[BaseMessage]:
+        """Retrieve the current list of messages from async code."""
+        return self._messages
+    
+    async def aget_window(self) -> Tuple[int, List[BaseMessage]]:
+        """Retrieve ``offset`` and the current messages from async code."""
+        return self.offset, self._messages
+    
+    async def aadd_turn(self, user_message: str, ai_message: str) -> None:
+        """Add a user message and the AI reply from async code."""
+        self.add_turn(user_message, ai_message)
     
     def clear(self) -> None:
         """Clear all messages from the history."""
         self._messages = []
+        self._appended = 0
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the history to a dictionary."""
@@ -115,3 +155,126 @@ class PydanticV2CompatibleChatMessageHistory:
     def __add__(self, other: 'PydanticV2CompatibleChatMessageHistory') -> 'PydanticV2CompatibleChatMessageHistory':
         """Combine two chat histories."""
         return PydanticV2CompatibleChatMessageHistory(messages=self._messages + other.messages)
+
+
+
+# Compact type tags used when serializing messages to Redis
+_MESSAGE_TYPE_TAGS = {"human": "h", "ai": "a", "system": "s"}
+_MESSAGE_CLASSES = {"h": HumanMessage, "a": AIMessage, "s": SystemMessage}
+
+
+class RedisChatMessageHistory:
+    """A chat message history stored in a Redis list.
+    
+    Exposes the same interface as ``PydanticV2CompatibleChatMessageHistory`` so
+    conversations can be shared between horizontally scaled workers. Each
+    message is stored as a compact JSON object; every write appends, trims the
+    list to ``max_messages``, counts the appended messages and refreshes the
+    TTL in a single pipelined round trip.
+    """
+    
+    def __init__(
+        self,
+        client: Any,
+        key: str,
+        max_messages: Optional[int] = None,
+        ttl: Optional[int] = None,
+    ):
+        """Initialize the history.
+        
+        Args:
+            client: A ``redis.Redis`` compatible client
+            key: The Redis key of the message list
+            max_messages: Keep only the most recent messages, or all if None
+            ttl: Expiry in seconds refreshed on every write, or None for no expiry
+        """
+        self.client = client
+        self.key = key
+        # Messages ever appended, so the number trimmed from the head is known
+        self.count_key = f"{key}:count"
+        self.max_messages = max_messages
+        self.ttl = ttl
+    
+    @staticmethod
+    def _dumps(message: BaseMessage) -> str:
+        tag = _MESSAGE_TYPE_TAGS.get(getattr(message, "type", "human"), "h")
+        return json.dumps({"t": tag, "c": message.content}, separators=(",", ":"))
+    
+    @staticmethod
+    def _loads(raw: Any) -> BaseMessage:
+        data = json.loads(raw)
+        return _MESSAGE_CLASSES.get(data.get("t"), HumanMessage)(content=data.get("c", ""))
+    
+    @property
+    def messages(self) -> List[BaseMessage]:
+        """Retrieve the stored messages in one round trip."""
+        return [self._loads(raw) for raw in self.client.lrange(self.key, 0, -1)]
+    
+    @property
+    def offset(self) -> int:
+        """Number of messages trimmed from the head of the history."""
+        return self.window()[0]
+    
+    def window(self) -> Tuple[int, List[BaseMessage]]:
+        """Retrieve ``offset`` and the stored messages in one round trip."""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lrange(self.key, 0, -1)
+        pipe.get(self.count_key)
+        raw_messages, count = pipe.execute()
+        # Histories written before the counter existed report no trimming
+        offset = max(int(count or 0) - len(raw_messages), 0)
+        return offset, [self._loads(raw) for raw in raw_messages]
+    
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Append messages, trim and refresh the TTL in one pipelined round trip."""
+        if not messages:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        pipe.rpush(self.key, *[self._dumps(message) for message in messages])
+        pipe.incrby(self.count_key, len(messages))
+        if self.max_messages:
+            pipe.ltrim(self.key, -self.max_messages, -1)
+        if self.ttl:
+            pipe.expire(self.key, self.ttl)
+            pipe.expire(self.count_key, self.ttl)
+        pipe.execute()
+    
+    def add_message(self, message: BaseMessage) -> None:
+        """Add a message to the history."""
+        self.add_messages([message])
+    
+    def add_user_message(self, message: str) -> None:
+        """Add a user message to the history."""
+        self.add_message(HumanMessage(content=message))
+    
+    def add_ai_message(self, message: str) -> None:
+        """Add an AI message to the history."""
+        self.add_message(AIMessage(content=message))
+    
+    def add_system_message(self, message: str) -> None:
+        """Add a system message to the history."""
+        self.add_message(SystemMessage(content=message))
+    
+    def add_turn(self, user_message: str, ai_message: str) -> None:
+        """Add a user message and the AI reply in one round trip."""
+        self.add_messages([HumanMessage(content=user_message), AIMessage(content=ai_message)])
+    
+    async def aget_messages(self) -> List[BaseMessage]:
+        """Retrieve the stored messages without blocking the event loop."""
+        return await anyio.to_thread.run_sync(lambda: self.messages)
+    
+    async def aget_window(self) -> Tuple[int, List[BaseMessage]]:
+        """Retrieve ``offset`` and the stored messages without blocking the event loop."""
+        return await anyio.to_thread.run_sync(self.window)
+    
+    async def aadd_turn(self, user_message: str, ai_message: str) -> None:
+        """Add a user message and the AI reply without blocking the event loop."""
+        await anyio.to_thread.run_sync(self.add_turn, user_message, ai_message)
+    
+    def clear(self) -> None:
+        """Clear all messages from the history."""
+        self.client.delete(self.key, self.count_key)
+    
+    def __len__(self) -> int:
+        """Get the number of messages in the history."""
+        return self.client.llen(self.key)
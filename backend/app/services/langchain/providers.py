@@ -0,0 +1,376 @@
+"""
+LLM provider registry and latency-aware routing for the travel agent.
+
+Providers wrap one chat completions backend each (the Llama API, any
+OpenAI-compatible server such as vLLM or Ollama, or a local stand-in). The
+router orders them by recent latency and error rate and falls back to the
+next one when a call fails.
+"""
+import logging
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.services.langchain.client import LlamaAPIError, LlamaClient
+
+logger = logging.getLogger(__name__)
+
+
+def parse_completion(result: Dict[str, Any]) -> str:
+    """Extract the assistant's message from a chat completions response.
+
+    Handles both the Llama API ``completion_message`` shape and OpenAI-style
+    ``choices``.
+
+    Args:
+        result: The decoded API response
+
+    Returns:
+        str: The assistant's message
+
+    Raises:
+        LlamaAPIError: If the API returned an error payload
+        ValueError: If the response format is not recognised
+    """
+    if 'error' in result:
+        error_msg = result.get('error', {}).get('message', 'Unknown error')
+        logger.error(f"API error: {error_msg}")
+        raise LlamaAPIError(f"API error: {error_msg}")
+
+    if 'completion_message' in result and 'content' in result['completion_message']:
+        content = result['completion_message']['content']
+        if isinstance(content, dict) and 'text' in content:
+            return content['text']
+        return str(content)
+    if 'choices' in result and result['choices']:
+        return result['choices'][0]['message']['content']
+
+    logger.error(f"Unexpected response format: {result}")
+    raise ValueError("Unexpected response format from API")
+
+
+def parse_stream_chunk(chunk: Dict[str, Any]) -> str:
+    """Extract the text delta from one streamed completion event.
+
+    Handles both the Llama API event shape and OpenAI-style ``choices`` deltas.
+
+    Args:
+        chunk: One decoded stream event
+
+    Returns:
+        str: The text delta, or an empty string for non-text events
+
+    Raises:
+        LlamaAPIError: If the stream carries an error event
+    """
+    if 'error' in chunk:
+        error_msg = chunk.get('error', {}).get('message', 'Unknown error')
+        logger.error(f"API error: {error_msg}")
+        raise LlamaAPIError(f"API error: {error_msg}")
+
+    if 'event' in chunk:
+        delta = chunk['event'].get('delta') or {}
+        if delta.get('type', 'text') == 'text':
+            return delta.get('text') or ''
+        return ''
+    if chunk.get('choices'):
+        delta = chunk['choices'][0].get('delta') or {}
+        return delta.get('content') or ''
+    return ''
+
+
+class LLMProvider:
+    """Interface of a chat completions backend.
+
+    Attributes:
+        name: Registry name used in settings and stats.
+        model: Model requested from the backend, or None to keep the payload's.
+        fallback_only: Never preferred by latency; only used when others fail.
+    """
+
+    name = "provider"
+    fallback_only = False
+
+    def __init__(self, model: Optional[str] = None) -> None:
+        self.model = model
+
+    def _request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {**payload, "model": self.model} if self.model else payload
+
+    def served_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Return ``payload`` with the model this provider actually serves it with."""
+        return self._request(payload)
+
+    async def complete(self, payload: Dict[str, Any]) -> str:
+        """Return the assistant's message for a chat completions payload."""
+        raise NotImplementedError
+
+    def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the assistant's message as text deltas."""
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Release the provider's connections."""
+
+
+class HTTPChatProvider(LLMProvider):
+    """A provider speaking the chat completions protocol over the pooled client.
+
+    Attributes:
+        client: The pooled async HTTP client for the backend.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        api_key: Optional[str],
+        model: Optional[str] = None,
+        client: Optional[LlamaClient] = None,
+    ) -> None:
+        super().__init__(model)
+        self.client = client or LlamaClient(api_url, api_key)
+
+    async def complete(self, payload: Dict[str, Any]) -> str:
+        return parse_completion(await self.client.complete(self._request(payload)))
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        async with aclosing(self.client.stream(self._request(payload))) as chunks:
+            async for chunk in chunks:
+                token = parse_stream_chunk(chunk)
+                if token:
+                    yield token
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class LlamaProvider(HTTPChatProvider):
+    """The Llama API."""
+    name = "llama"
+
+
+class OpenAICompatibleProvider(HTTPChatProvider):
+    """Any OpenAI-compatible server, e.g. an open-source model behind vLLM or Ollama."""
+    name = "openai"
+
+
+class StaticProvider(LLMProvider):
+    """Local stand-in that answers with a fixed message without any network call.
+
+    Useful in development and as the last resort when every real provider fails.
+    """
+    name = "local"
+    fallback_only = True
+
+    def __init__(self, message: Optional[str] = None) -> None:
+        super().__init__()
+        self.message = message or settings.LLM_LOCAL_FALLBACK_MESSAGE
+
+    async def complete(self, payload: Dict[str, Any]) -> str:
+        return self.message
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        yield self.message
+
+
+class Completion(NamedTuple):
+    """A provider's answer, or one streamed piece of it, and who produced it."""
+    text: str
+    provider: LLMProvider
+
+
+class ProviderStats:
+    """Rolling latency and error rate of one provider."""
+
+    def __init__(self, window: int) -> None:
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        self._outcomes.append(ok)
+        if ok and latency is not None:
+            self._latencies.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+
+class ProviderRouter:
+    """Routes each call to the best provider and falls back on failure.
+
+    Providers are ranked by the mean of their rolling p50 and p95 latency.
+    Providers with fewer than ``min_samples`` latencies keep their registration
+    order behind measured ones, providers above ``max_error_rate`` go last,
+    and fallback-only providers are used only after every other one failed.
+    Cheap requests (e.g. small talk) go to ``cheap_provider`` first.
+
+    Attributes:
+        providers: The registered providers by name, in order of preference.
+        cheap_provider: Name of the provider serving cheap requests, if any.
+        fallbacks: Calls answered by a provider after an earlier one failed.
+    """
+
+    def __init__(
+        self,
+        providers: List[LLMProvider],
+        cheap_provider: Optional[str] = None,
+        min_samples: Optional[int] = None,
+        max_error_rate: Optional[float] = None,
+        window: Optional[int] = None,
+    ) -> None:
+        if not providers:
+            raise ValueError("At least one LLM provider is required")
+        self.providers: Dict[str, LLMProvider] = {p.name: p for p in providers}
+        if cheap_provider is not None and cheap_provider not in self.providers:
+            raise ValueError(f"Unknown cheap LLM provider: {cheap_provider}")
+        self.cheap_provider = cheap_provider
+        self.min_samples = min_samples or settings.LLM_ROUTER_MIN_SAMPLES
+        self.max_error_rate = (
+            max_error_rate if max_error_rate is not None else settings.LLM_ROUTER_MAX_ERROR_RATE
+        )
+        window = window or settings.LLM_ROUTER_WINDOW
+        self._stats = {name: ProviderStats(window) for name in self.providers}
+        self.fallbacks = 0
+
+    def get(self, name: str) -> LLMProvider:
+        """Return the provider registered as ``name``."""
+        return self.providers[name]
+
+    def _score(self, order: int, provider: LLMProvider) -> Tuple[int, int, float, int]:
+        stats = self._stats[provider.name]
+        latency = float("inf")
+        if stats.samples >= self.min_samples:
+            latency = (stats.percentile(0.5) + stats.percentile(0.95)) / 2
+        unhealthy = stats.error_rate > self.max_error_rate
+        return (int(provider.fallback_only), int(unhealthy), latency, order)
+
+    def rank(self, cheap: bool = False) -> List[LLMProvider]:
+        """Return the providers in the order they should be tried."""
+        ranked = [
+            provider for _, provider in sorted(
+                enumerate(self.providers.values()), key=lambda item: self._score(*item)
+            )
+        ]
+        if cheap and self.cheap_provider is not None:
+            cheap_provider = self.providers[self.cheap_provider]
+            ranked.remove(cheap_provider)
+            ranked.insert(0, cheap_provider)
+        return ranked
+
+    async def complete(self, payload: Dict[str, Any], cheap: bool = False) -> Completion:
+        """Return the first successful provider's answer and that provider.
+
+        Raises:
+            Exception: The last provider's error if every provider failed.
+        """
+        last_error: Optional[Exception] = None
+        for provider in self.rank(cheap):
+            started = time.monotonic()
+            try:
+                text = await provider.complete(payload)
+            except Exception as e:
+                self._stats[provider.name].record(False)
+                logger.warning(f"LLM provider {provider.name} failed: {e!r}")
+                last_error = e
+                continue
+            self._stats[provider.name].record(True, time.monotonic() - started)
+            if last_error is not None:
+                self.fallbacks += 1
+            return Completion(text, provider)
+        raise last_error
+
+    async def stream(self, payload: Dict[str, Any], cheap: bool = False) -> AsyncIterator[Completion]:
+        """Relay the first working provider's stream, each token with that provider.
+
+        Falls back only while nothing has been yielded; latency is measured to
+        the first token.
+        """
+        last_error: Optional[Exception] = None
+        for provider in self.rank(cheap):
+            started = time.monotonic()
+            first = True
+            try:
+                async with aclosing(provider.stream(payload)) as tokens:
+                    async for token in tokens:
+                        if first:
+                            first = False
+                            self._stats[provider.name].record(True, time.monotonic() - started)
+                            if last_error is not None:
+                                self.fallbacks += 1
+                        yield Completion(token, provider)
+            except Exception as e:
+                self._stats[provider.name].record(False)
+                if not first:
+                    raise
+                logger.warning(f"LLM provider {provider.name} failed: {e!r}")
+                last_error = e
+                continue
+            if first:
+                # An empty answer still counts as a response
+                self._stats[provider.name].record(True, time.monotonic() - started)
+            return
+        raise last_error
+
+    async def aclose(self) -> None:
+        """Release every provider's connections."""
+        for provider in self.providers.values():
+            await provider.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-provider latency percentiles and error rates."""
+        return {
+            "fallbacks": self.fallbacks,
+            "providers": {
+                name: {
+                    "p50": stats.percentile(0.5),
+                    "p95": stats.percentile(0.95),
+                    "error_rate": stats.error_rate,
+                }
+                for name, stats in self._stats.items()
+            },
+        }
+
+
+def create_router(llama_api_url: str, llama_api_key: Optional[str]) -> ProviderRouter:
+    """Build the router for the providers listed in ``LLM_PROVIDERS``.
+
+    Args:
+        llama_api_url: The Llama chat completions endpoint.
+        llama_api_key: The Llama API key.
+
+    Returns:
+        ProviderRouter: The configured router.
+
+    Raises:
+        ValueError: If a provider name is unknown.
+    """
+    providers: List[LLMProvider] = []
+    for name in settings.LLM_PROVIDERS:
+        if name == LlamaProvider.name:
+            providers.append(LlamaProvider(llama_api_url, llama_api_key))
+        elif name == OpenAICompatibleProvider.name:
+            providers.append(OpenAICompatibleProvider(
+                settings.OPENAI_COMPAT_API_URL,
+                settings.OPENAI_COMPAT_API_KEY,
+                model=settings.OPENAI_COMPAT_MODEL,
+            ))
+        elif name == StaticProvider.name:
+            providers.append(StaticProvider())
+        else:
+            raise ValueError(f"Unsupported LLM provider: {name}")
+    return ProviderRouter(providers, cheap_provider=settings.LLM_CHEAP_PROVIDER)
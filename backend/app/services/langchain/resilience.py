@@ -0,0 +1,339 @@
+"""
+Retries, circuit breaking and request hedging for LLM provider calls.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+from app.core.config import settings
+from app.services.langchain.client import LlamaAPIError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses worth retrying: the request was not processed or the provider is overloaded
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(LlamaAPIError):
+    """Raised without calling the provider while the circuit breaker is open.
+
+    Attributes:
+        retry_after: Seconds until the breaker lets a probe request through.
+    """
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether a failed provider call may be retried and counts against the breaker."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    Attributes:
+        max_attempts: Total attempts, including the first one.
+        base_delay: Backoff cap of the first retry, in seconds.
+        max_delay: Upper bound of any backoff, in seconds.
+    """
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+    ) -> None:
+        self.max_attempts = max_attempts or settings.LLM_RETRY_MAX_ATTEMPTS
+        self.base_delay = base_delay if base_delay is not None else settings.LLM_RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else settings.LLM_RETRY_MAX_DELAY
+
+    def backoff(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        """Return the delay before retry number ``attempt`` (starting at 1).
+
+        A ``Retry-After`` header on the failed response raises the delay, up
+        to ``max_delay``.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if isinstance(exc, httpx.HTTPStatusError):
+            try:
+                retry_after = float(exc.response.headers.get("Retry-After", 0))
+            except ValueError:
+                retry_after = 0.0
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """Fails fast once the recent failure rate of provider calls is too high.
+
+    The breaker is ``closed`` while the failure rate over the last ``window``
+    calls stays below ``failure_rate`` (after at least ``min_calls``). It then
+    ``open``s and rejects calls for ``open_seconds``, after which it is
+    ``half_open``: one probe call is let through and closes the breaker on
+    success or re-opens it on failure.
+
+    Attributes:
+        state: ``closed``, ``open`` or ``half_open``.
+        opened: Number of times the breaker tripped.
+        rejected: Calls rejected while open.
+    """
+
+    def __init__(
+        self,
+        failure_rate: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        window: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+    ) -> None:
+        self.failure_rate = failure_rate if failure_rate is not None else settings.LLM_BREAKER_FAILURE_RATE
+        self.min_calls = min_calls or settings.LLM_BREAKER_MIN_CALLS
+        self.open_seconds = open_seconds if open_seconds is not None else settings.LLM_BREAKER_OPEN_SECONDS
+        self._outcomes: Deque[bool] = deque(maxlen=window or settings.LLM_BREAKER_WINDOW)
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.state = "closed"
+        self.opened = 0
+        self.rejected = 0
+
+    def reject_if_open(self) -> None:
+        """Raise ``CircuitOpenError`` while the breaker is open, without taking the probe.
+
+        Lets callers fail fast before queueing for a call that ``check`` would reject.
+        """
+        if self.state == "open":
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    "LLM provider circuit breaker is open",
+                    retry_after=max(1.0, self.open_seconds - elapsed),
+                )
+
+    def check(self) -> None:
+        """Raise ``CircuitOpenError`` if a call must not be attempted now."""
+        if self.state == "closed":
+            return
+        now = time.monotonic()
+        if self.state == "open" and now - self._opened_at >= self.open_seconds:
+            self.state = "half_open"
+        if self.state == "half_open":
+            # One probe at a time; a probe that never reported is assumed lost
+            if self._probe_started is None or now - self._probe_started >= self.open_seconds:
+                self._probe_started = now
+                return
+        self.rejected += 1
+        retry_after = max(1.0, self.open_seconds - (now - self._opened_at))
+        raise CircuitOpenError("LLM provider circuit breaker is open", retry_after=retry_after)
+
+    def record_success(self) -> None:
+        """Record a call the provider answered."""
+        if self.state != "closed":
+            logger.info("LLM circuit breaker closed")
+            self.state = "closed"
+            self._outcomes.clear()
+            self._probe_started = None
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """Record a call that failed for a retryable reason."""
+        if self.state == "half_open":
+            self._trip()
+            return
+        self._outcomes.append(False)
+        failures = self._outcomes.count(False)
+        if (
+            self.state == "closed"
+            and len(self._outcomes) >= self.min_calls
+            and failures / len(self._outcomes) >= self.failure_rate
+        ):
+            self._trip()
+
+    def _trip(self) -> None:
+        logger.warning("LLM circuit breaker opened")
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._probe_started = None
+        self.opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return breaker state and counters."""
+        return {"state": self.state, "opened": self.opened, "rejected": self.rejected}
+
+
+class LatencyTracker:
+    """Keeps the latencies of recent successful calls to derive percentiles."""
+
+    def __init__(self, size: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the ``q`` quantile (0-1) of recent latencies, or None without samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class ResilientCaller:
+    """Runs provider calls with retries, a circuit breaker and optional hedging.
+
+    With hedging enabled, a completion that has not finished after the recent
+    ``hedge_percentile`` latency gets a second, identical request; whichever
+    answers first wins and the other is cancelled. Only idempotent calls
+    (completions) are hedged; streams are retried only before their first
+    event.
+
+    Attributes:
+        retry: The retry policy.
+        breaker: The circuit breaker.
+        latency: Recent successful call latencies.
+        retries: Retries performed.
+        hedges: Hedged requests sent.
+        hedge_wins: Hedged requests that answered first.
+    """
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: Optional[bool] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_delay: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None,
+    ) -> None:
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.hedge = hedge if hedge is not None else settings.LLM_HEDGE_ENABLED
+        self.hedge_percentile = (
+            hedge_percentile if hedge_percentile is not None else settings.LLM_HEDGE_PERCENTILE
+        )
+        self.hedge_min_delay = (
+            hedge_min_delay if hedge_min_delay is not None else settings.LLM_HEDGE_MIN_DELAY
+        )
+        self.hedge_min_samples = hedge_min_samples or settings.LLM_HEDGE_MIN_SAMPLES
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(self.hedge_percentile))
+
+    async def _timed(self, fn: Callable[[], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        result = await fn()
+        self.latency.record(time.monotonic() - started)
+        return result
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]]) -> T:
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._timed(fn)
+
+        primary = asyncio.ensure_future(self._timed(fn))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(self._timed(fn)))
+            # First success wins; fail only once every request failed
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    if not tasks:
+                        raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` (a provider call) with the resilience policies.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+            httpx.HTTPError: The last error once retries are exhausted.
+        """
+        attempt = 1
+        while True:
+            self.breaker.check()
+            try:
+                result = await self._attempt(fn)
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_success()  # The provider is up; the request is bad
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.retry.max_attempts:
+                    raise
+                delay = self.retry.backoff(attempt, e)
+                logger.warning(f"LLM call failed ({e!r}); retry {attempt} in {delay:.2f}s")
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def stream(self, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Relay a provider stream, retrying only failures before its first item."""
+        attempt = 1
+        while True:
+            self.breaker.check()
+            started = False
+            try:
+                async with aclosing(fn()) as items:
+                    async for item in items:
+                        started = True
+                        yield item
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if started or attempt >= self.retry.max_attempts:
+                    raise
+                delay = self.retry.backoff(attempt, e)
+                logger.warning(f"LLM stream failed ({e!r}); retry {attempt} in {delay:.2f}s")
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return
+
+    def stats(self) -> Dict[str, Any]:
+        """Return retry, hedging and breaker counters."""
+        return {
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p95_latency": self.latency.percentile(0.95),
+            "breaker": self.breaker.stats(),
+        }
@@ -0,0 +1,257 @@
+"""
+Semantic cache of LLM responses for the travel agent.
+
+Paraphrased questions are matched by the cosine similarity of their
+embeddings, computed in one vectorized pass over a contiguous matrix of all
+cached query vectors. How loose a paraphrase may be depends on the embedder:
+see ``create_embedder``.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import anyio
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.langchain.cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# text -> 1-D float vector
+Embedder = Callable[[str], Any]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Function words carry little meaning on their own; they still count inside bigrams
+_STOPWORDS = frozenset(
+    "a an and are at be by can do for from how i in is it me my of on or the "
+    "to what when where which who with".split()
+)
+
+
+def semantic_namespace(payload: Dict[str, Any]) -> int:
+    """Return the partition of the semantic cache a request belongs to.
+
+    Everything except the newest user message (model, sampling parameters,
+    system prompt and history) must match exactly for a paraphrase to reuse a
+    response, so it is hashed into a 63-bit integer that can be compared in the
+    vectorized lookup.
+    """
+    context = {**payload, "messages": payload.get("messages", [])[:-1]}
+    return int(make_cache_key(context)[:15], 16)
+
+
+class HashingEmbedder:
+    """Dependency-free embedder using the hashing trick.
+
+    Content words and word bigrams are hashed into ``dimensions`` signed
+    buckets and the vector is L2-normalized. Bigrams keep word order, so
+    "Paris to Rome" and "Rome to Paris" do not collide.
+
+    It has no notion of synonyms: only rewordings that differ in case,
+    punctuation or a few function words clear the default threshold, while
+    "inexpensive May flights to Paris" does not match "cheap flights to Paris
+    in May". Use a sentence-transformers model for real paraphrases.
+    """
+
+    def __init__(self, dimensions: int = 512) -> None:
+        self.dimensions = dimensions
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN_RE.findall(text.casefold())
+        features = [w for w in words if w not in _STOPWORDS]
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        return features
+
+    def __call__(self, text: str) -> "np.ndarray":
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        return vector
+
+
+def create_embedder() -> Embedder:
+    """Create the embedder selected by ``LLM_SEMANTIC_CACHE_EMBEDDING_MODEL``.
+
+    Falls back to ``HashingEmbedder`` when no model is configured or
+    sentence-transformers is not installed.
+    """
+    model_name = settings.LLM_SEMANTIC_CACHE_EMBEDDING_MODEL
+    if model_name:
+        if SENTENCE_TRANSFORMERS_AVAILABLE:
+            logger.info(f"Using sentence-transformers model {model_name} for the semantic cache")
+            model = SentenceTransformer(model_name)
+            return lambda text: model.encode(text, normalize_embeddings=True)
+        logger.warning("sentence-transformers is not installed; using the hashing embedder")
+    return HashingEmbedder(settings.LLM_SEMANTIC_CACHE_DIMENSIONS)
+
+
+class SemanticCache:
+    """Bounded nearest-neighbour cache of assistant responses.
+
+    Query vectors live in one preallocated ``(capacity, dimensions)`` float32
+    matrix, so a lookup is a single matrix-vector product masked to live rows
+    of the request's namespace. When full, the least recently used row is
+    overwritten.
+
+    Attributes:
+        threshold: Minimum cosine similarity for a hit.
+        capacity: Maximum number of cached responses.
+        max_temperature: Requests sampled above this temperature are not cached.
+        hits: Lookups answered from the cache.
+        misses: Lookups that had to go to the provider.
+        evictions: Live entries overwritten for capacity.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        capacity: Optional[int] = None,
+        threshold: Optional[float] = None,
+        ttl: Optional[float] = None,
+        max_temperature: Optional[float] = None,
+    ) -> None:
+        """Create the cache.
+
+        Args:
+            embedder: Callable turning text into a 1-D vector; see ``create_embedder``.
+            capacity: Maximum number of cached responses.
+            threshold: Minimum cosine similarity for a hit.
+            ttl: Seconds an entry stays valid.
+            max_temperature: Highest temperature considered deterministic enough to cache.
+
+        Raises:
+            RuntimeError: If NumPy is not installed.
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("The 'numpy' package is required for the semantic cache")
+        self.embedder = embedder or create_embedder()
+        self.capacity = capacity or settings.LLM_SEMANTIC_CACHE_MAX_ENTRIES
+        self.threshold = threshold if threshold is not None else settings.LLM_SEMANTIC_CACHE_THRESHOLD
+        self.ttl = ttl if ttl is not None else settings.LLM_CACHE_TTL
+        self.max_temperature = (
+            max_temperature if max_temperature is not None
+            else settings.LLM_CACHE_MAX_TEMPERATURE
+        )
+        # Model embedders are too slow to run on the event loop
+        self._embed_in_thread = not isinstance(self.embedder, HashingEmbedder)
+        # Recent query vectors, so a miss does not embed the same text again on store
+        self._embeddings: LRUCache[str, "np.ndarray"] = LRUCache(maxsize=1024)
+
+        self._vectors: Optional["np.ndarray"] = None  # Allocated on first insert
+        self._namespaces = np.zeros(self.capacity, dtype=np.int64)
+        self._expires_at = np.full(self.capacity, -np.inf)
+        self._last_used = np.zeros(self.capacity)
+        self._responses: List[Optional[str]] = [None] * self.capacity
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Whether responses sampled at ``temperature`` may be cached."""
+        return temperature <= self.max_temperature
+
+    async def _embed(self, text: str) -> "np.ndarray":
+        vector = self._embeddings.get(text)
+        if vector is None:
+            if self._embed_in_thread:
+                raw = await anyio.to_thread.run_sync(self.embedder, text)
+            else:
+                raw = self.embedder(text)
+            vector = np.asarray(raw, dtype=np.float32).ravel()
+            norm = float(np.linalg.norm(vector))
+            if norm > 0:
+                vector = vector / norm
+            self._embeddings.set(text, vector)
+        return vector
+
+    async def get(self, namespace: int, text: str) -> Optional[str]:
+        """Return the response cached for the most similar query, or None on a miss.
+
+        Args:
+            namespace: The request's partition, see ``semantic_namespace``.
+            text: The user's message.
+        """
+        vector = await self._embed(text)
+        now = time.monotonic()
+        with self._lock:
+            response = None
+            if self._vectors is not None and vector.any():
+                live = (self._namespaces == namespace) & (self._expires_at > now)
+                if live.any():
+                    scores = self._vectors @ vector
+                    scores[~live] = -np.inf
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.threshold:
+                        response = self._responses[best]
+                        self._last_used[best] = now
+
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    async def set(self, namespace: int, text: str, response: str) -> None:
+        """Cache ``response`` for the query ``text`` in ``namespace``."""
+        vector = await self._embed(text)
+        if not vector.any():
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+
+            # Prefer an empty or expired row, else overwrite the least recently used one
+            free = np.flatnonzero(self._expires_at <= now)
+            if free.size:
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            self._vectors[slot] = vector
+            self._namespaces[slot] = namespace
+            self._expires_at[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._responses[slot] = response
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._expires_at[:] = -np.inf
+            self._responses = [None] * self.capacity
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires_at > time.monotonic()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,174 @@
+"""
+Per-user, per-session conversation storage for the travel agent.
+"""
+import logging
+from typing import Any, Callable, Optional, Tuple
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.redis_client import get_redis_client
+from app.services.langchain.memory import (
+    PydanticV2CompatibleChatMessageHistory,
+    RedisChatMessageHistory,
+)
+
+logger = logging.getLogger(__name__)
+
+# (user_id, session_id); user_id is None for anonymous callers
+SessionKey = Tuple[Optional[int], str]
+
+DEFAULT_SESSION_ID = "default"
+
+
+class ChatSessionBackend:
+    """Interface for conversation storage backends.
+
+    A backend maps a session key to a chat message history object exposing
+    ``messages``, ``add_user_message``, ``add_ai_message`` and ``clear``.
+    """
+
+    def get_history(self, key: SessionKey) -> PydanticV2CompatibleChatMessageHistory:
+        """Return the history for ``key``, creating an empty one if needed."""
+        raise NotImplementedError
+
+    def delete(self, key: SessionKey) -> None:
+        """Forget the history for ``key``."""
+        raise NotImplementedError
+
+
+class InMemorySessionBackend(ChatSessionBackend):
+    """Keeps histories in process memory with bounded LRU eviction.
+
+    The least recently used sessions are dropped once ``max_sessions`` is
+    reached, idle sessions expire after ``ttl`` seconds, and each history keeps
+    only its ``max_messages`` most recent messages, so memory use is bounded
+    regardless of how many users a worker serves or how long they talk.
+    """
+
+    def __init__(
+        self,
+        max_sessions: Optional[int] = None,
+        ttl: Optional[float] = None,
+        history_factory: Callable[..., PydanticV2CompatibleChatMessageHistory] = (
+            PydanticV2CompatibleChatMessageHistory
+        ),
+        max_messages: Optional[int] = None,
+    ) -> None:
+        """Create the backend.
+
+        Args:
+            max_sessions: Maximum number of sessions kept in memory.
+            ttl: Seconds of inactivity after which a session is dropped.
+            history_factory: Callable creating an empty history, given ``max_messages``.
+            max_messages: Messages kept per session.
+        """
+        self.history_factory = history_factory
+        self.max_messages = max_messages or settings.CHAT_HISTORY_MAX_MESSAGES
+        self._sessions: LRUCache[SessionKey, PydanticV2CompatibleChatMessageHistory] = LRUCache(
+            maxsize=max_sessions or settings.CHAT_SESSION_MAX_SESSIONS,
+            ttl=ttl if ttl is not None else settings.CHAT_SESSION_TTL,
+        )
+
+    def get_history(self, key: SessionKey) -> PydanticV2CompatibleChatMessageHistory:
+        history = self._sessions.get(key)
+        if history is None:
+            history = self.history_factory(max_messages=self.max_messages)
+        # Re-setting refreshes both recency and the idle TTL
+        self._sessions.set(key, history)
+        return history
+
+    def delete(self, key: SessionKey) -> None:
+        self._sessions.pop(key)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class RedisSessionBackend(ChatSessionBackend):
+    """Keeps histories in Redis so every worker sees the same conversations.
+    
+    Each session is a Redis list trimmed to ``max_messages`` and expiring after
+    ``ttl`` seconds without writes.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        key_prefix: Optional[str] = None,
+        max_messages: Optional[int] = None,
+        ttl: Optional[int] = None,
+    ) -> None:
+        """Create the backend.
+
+        Args:
+            client: A ``redis.Redis`` compatible client; built from ``REDIS_URL`` if omitted.
+            key_prefix: Prefix of the per-session Redis keys.
+            max_messages: Messages kept per session.
+            ttl: Seconds of inactivity after which a session expires.
+        """
+        self.client = client if client is not None else get_redis_client()
+        self.key_prefix = key_prefix if key_prefix is not None else settings.CHAT_REDIS_KEY_PREFIX
+        self.max_messages = max_messages or settings.CHAT_HISTORY_MAX_MESSAGES
+        self.ttl = ttl if ttl is not None else settings.CHAT_SESSION_TTL
+
+    def _redis_key(self, key: SessionKey) -> str:
+        user_id, session_id = key
+        return f"{self.key_prefix}{user_id if user_id is not None else 'anon'}:{session_id}"
+
+    def get_history(self, key: SessionKey) -> RedisChatMessageHistory:
+        return RedisChatMessageHistory(
+            self.client,
+            self._redis_key(key),
+            max_messages=self.max_messages,
+            ttl=self.ttl,
+        )
+
+    def delete(self, key: SessionKey) -> None:
+        self.get_history(key).clear()
+
+
+def create_session_backend(
+    history_factory: Callable[..., PydanticV2CompatibleChatMessageHistory] = (
+        PydanticV2CompatibleChatMessageHistory
+    ),
+) -> ChatSessionBackend:
+    """Create the session backend selected by ``CHAT_MEMORY_BACKEND``.
+
+    Args:
+        history_factory: Callable creating an empty in-memory history.
+
+    Returns:
+        ChatSessionBackend: The configured backend.
+    """
+    if settings.CHAT_MEMORY_BACKEND == "redis":
+        logger.info("Using Redis chat session backend")
+        return RedisSessionBackend()
+    if settings.CHAT_MEMORY_BACKEND != "memory":
+        raise ValueError(f"Unsupported CHAT_MEMORY_BACKEND: {settings.CHAT_MEMORY_BACKEND}")
+    return InMemorySessionBackend(history_factory=history_factory)
+
+
+class SessionStore:
+    """Resolves conversation histories by ``(user_id, session_id)``.
+
+    Attributes:
+        backend: The storage backend holding the histories.
+    """
+
+    def __init__(self, backend: Optional[ChatSessionBackend] = None) -> None:
+        self.backend = backend if backend is not None else InMemorySessionBackend()
+
+    @staticmethod
+    def make_key(user_id: Optional[int], session_id: Optional[str]) -> SessionKey:
+        """Build the storage key for a user's session."""
+        return (user_id, session_id or DEFAULT_SESSION_ID)
+
+    def get_history(
+        self, user_id: Optional[int] = None, session_id: Optional[str] = None
+    ) -> PydanticV2CompatibleChatMessageHistory:
+        """Return the history of a user's session, creating it on first use."""
+        return self.backend.get_history(self.make_key(user_id, session_id))
+
+    def clear(self, user_id: Optional[int] = None, session_id: Optional[str] = None) -> None:
+        """Delete a user's session."""
+        self.backend.delete(self.make_key(user_id, session_id))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of CRUDBase.update against the previous update path.
+
+The previous path serialized the row with jsonable_encoder to find its
+fields, flushed the changes and refreshed the row with a second SELECT. The
+current path issues a single UPDATE ... RETURNING.
+
+Usage:
+    python scripts/bench_crud_update.py [--url sqlite+aiosqlite:///:memory:] [-n 2000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.models.item import Item  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+async def legacy_update(db: AsyncSession, db_obj: Item, obj_in: dict) -> Item:
+    """The update path before the RETURNING rewrite."""
+    obj_data = jsonable_encoder(db_obj)
+    for field in obj_data:
+        if field in obj_in:
+            setattr(db_obj, field, obj_in[field])
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def current_update(db: AsyncSession, db_obj: Item, obj_in: dict) -> Item:
+    return await crud.item.update(db, db_obj=db_obj, obj_in=obj_in)
+
+
+async def run(url: str, n: int) -> None:
+    engine = create_async_engine(url)
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(*args) -> None:
+        nonlocal statements
+        statements += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_maker() as db:
+        owner = User(email="bench@example.com", hashed_password="x")
+        db.add(owner)
+        await db.commit()
+        item = Item(title="bench", owner_id=owner.id)
+        db.add(item)
+        await db.commit()
+        await db.refresh(item)
+
+        for name, fn in (("jsonable_encoder + refresh", legacy_update), ("UPDATE ... RETURNING", current_update)):
+            for i in range(50):  # Warm up
+                await fn(db, item, {"title": f"warm {i}"})
+            statements = 0
+            started = time.perf_counter()
+            for i in range(n):
+                await fn(db, item, {"title": f"{name} {i}", "description": str(i)})
+            elapsed = time.perf_counter() - started
+            print(
+                f"{name:28s} {elapsed / n * 1e6:8.1f} us/update "
+                f"{statements / n:5.2f} statements/update"
+            )
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:", help="Async database URL")
+    parser.add_argument("-n", type=int, default=2000, help="Updates per variant")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.n))
+
+
+if __name__ == "__main__":
+    main()
@@ -22,8 +22,9 @@ setup(
         "openai>=0.28.0,<0.29.0",
         "tiktoken>=0.5.2,<0.6.0 ; python_version < '3.13'",
         "tiktoken>=0.6.0 ; python_version >= '3.13'",
+        "numpy>=1.24.0,<2.0.0",
         "anyio>=3.7.1,<4.0.0",
-        "httpx>=0.24.1,<0.26.0",
+        "httpx[http2]>=0.24.1,<0.26.0",
     ],
     extras_require={
         "dev": [
@@ -44,6 +45,7 @@ setup(
             "types-pytz>=2023.3.1.0",
             "coverage>=7.4.1",
             "responses>=0.24.1",
+            "fakeredis>=2.20.1",
             "aiosqlite>=0.19.0",
         ]
     },
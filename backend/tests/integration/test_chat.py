@@ -3,7 +3,8 @@ Integration tests for the chat endpoints.
 """
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
+from app.api.endpoints.chat import get_chat_agent
 from app.main import app
 
 client = TestClient(app)
@@ -11,8 +12,10 @@ client = TestClient(app)
 @pytest.fixture
 def mock_travel_agent():
     """Mock the travel agent for testing."""
-    with patch('app.api.endpoints.chat.travel_agent') as mock_agent:
-        yield mock_agent
+    mock_agent = MagicMock()
+    app.dependency_overrides[get_chat_agent] = lambda: mock_agent
+    yield mock_agent
+    app.dependency_overrides.pop(get_chat_agent, None)
 
 def test_chat_endpoint_authenticated(mock_travel_agent, test_user, user_token_headers):
     """Test the chat endpoint with authentication."""
@@ -0,0 +1,60 @@
+"""
+Unit tests for cancelling chat requests when the client disconnects.
+"""
+import asyncio
+
+import pytest
+
+from app.api.endpoints.chat import ClientDisconnected, _until_disconnected
+
+
+class FakeRequest:
+    """Delivers ``http.disconnect`` once ``disconnect`` is set."""
+
+    def __init__(self) -> None:
+        self.disconnect = asyncio.Event()
+
+    async def receive(self) -> dict:
+        await self.disconnect.wait()
+        return {"type": "http.disconnect"}
+
+
+@pytest.mark.asyncio
+async def test_returns_result_while_connected() -> None:
+    async def work() -> str:
+        return "Lima"
+
+    assert await _until_disconnected(FakeRequest(), work()) == "Lima"
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_work() -> None:
+    request = FakeRequest()
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def work() -> str:
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    async def disconnect() -> None:
+        await started.wait()
+        request.disconnect.set()
+
+    asyncio.create_task(disconnect())
+    with pytest.raises(ClientDisconnected):
+        await _until_disconnected(request, work())
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate() -> None:
+    async def work() -> str:
+        raise ValueError("Message cannot be empty")
+
+    with pytest.raises(ValueError):
+        await _until_disconnected(FakeRequest(), work())
@@ -0,0 +1,142 @@
+"""
+Unit tests for the WebSocket chat channel.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import AsyncIterator, List, Optional
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.endpoints import chat
+
+
+class FakeAgent:
+    """Streams fixed tokens; ``hang`` blocks after the first token until cancelled."""
+
+    def __init__(self, tokens: List[str], hang: bool = False) -> None:
+        self.tokens = tokens
+        self.hang = hang
+        self.calls: List[dict] = []
+        self.cancelled = False
+        self.resilience = SimpleNamespace(breaker=SimpleNamespace(reject_if_open=lambda: None))
+        self.admission = SimpleNamespace(check=lambda user_id: None)
+
+    async def stream_message(
+        self, message: str, *, user_id: Optional[int] = None, session_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        self.calls.append({"message": message, "user_id": user_id, "session_id": session_id})
+        try:
+            for token in self.tokens:
+                yield token
+                if self.hang:
+                    await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.fixture
+def app(monkeypatch) -> FastAPI:
+    async def authenticate(token):
+        return SimpleNamespace(id=7, is_active=True) if token == "good" else None
+
+    monkeypatch.setattr(chat, "_authenticate_socket", authenticate)
+    monkeypatch.setattr(chat.jwt, "get_unverified_claims", lambda token: {})
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/chat")
+    return app
+
+
+def use_agent(monkeypatch, agent: FakeAgent) -> None:
+    monkeypatch.setattr(chat, "get_travel_agent", lambda: agent)
+
+
+def test_rejects_unauthenticated_socket(app, monkeypatch) -> None:
+    use_agent(monkeypatch, FakeAgent(["x"]))
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with TestClient(app).websocket_connect("/chat/ws?token=bad"):
+            pass
+    assert exc.value.code == 1008
+
+
+def test_authentication_errors_close_the_socket(app, monkeypatch) -> None:
+    async def authenticate(token):
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(chat, "_authenticate_socket", authenticate)
+    use_agent(monkeypatch, FakeAgent(["x"]))
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with TestClient(app).websocket_connect("/chat/ws?token=good"):
+            pass
+    assert exc.value.code == 1011
+
+
+def test_expired_token_closes_the_session(app, monkeypatch) -> None:
+    agent = FakeAgent(["x"])
+    use_agent(monkeypatch, agent)
+    monkeypatch.setattr(chat.jwt, "get_unverified_claims", lambda token: {"exp": time.time() - 1})
+
+    with TestClient(app).websocket_connect("/chat/ws?token=good") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "message", "text": "Hi"})
+        assert ws.receive_json() == {"type": "error", "detail": "The access token has expired"}
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+        assert exc.value.code == 1008
+
+    assert agent.calls == []
+
+
+def test_streams_tokens_on_bound_session(app, monkeypatch) -> None:
+    agent = FakeAgent(["Hel", "lo"])
+    use_agent(monkeypatch, agent)
+
+    with TestClient(app).websocket_connect("/chat/ws?token=good&session_id=trip") as ws:
+        assert ws.receive_json() == {"type": "ready", "session_id": "trip"}
+        for _ in range(2):
+            ws.send_json({"type": "message", "text": "Hi"})
+            frames = [ws.receive_json() for _ in range(3)]
+            assert frames == [
+                {"type": "token", "token": "Hel"},
+                {"type": "token", "token": "lo"},
+                {"type": "done", "response": "Hello"},
+            ]
+
+    assert agent.calls == [{"message": "Hi", "user_id": 7, "session_id": "trip"}] * 2
+
+
+def test_cancel_stops_generation(app, monkeypatch) -> None:
+    agent = FakeAgent(["first", "never"], hang=True)
+    use_agent(monkeypatch, agent)
+
+    with TestClient(app).websocket_connect("/chat/ws?token=good") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "message", "text": "Plan a trip"})
+        assert ws.receive_json() == {"type": "token", "token": "first"}
+
+        # One generation at a time per connection
+        ws.send_json({"type": "message", "text": "Another"})
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"type": "cancel"})
+        assert ws.receive_json() == {"type": "cancelled"}
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+    assert agent.cancelled
+    assert len(agent.calls) == 1
+
+
+def test_invalid_frames_are_reported(app, monkeypatch) -> None:
+    use_agent(monkeypatch, FakeAgent(["x"]))
+
+    with TestClient(app).websocket_connect("/chat/ws?token=good") as ws:
+        ws.receive_json()
+        ws.send_text("not json")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"type": "message", "text": ""})
+        assert ws.receive_json() == {"type": "error", "detail": "Message text is required"}
@@ -0,0 +1,3 @@
+"""
+Unit tests for core application modules.
+"""
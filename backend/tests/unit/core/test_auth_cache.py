@@ -0,0 +1,149 @@
+"""
+Unit tests for the current-user caches.
+"""
+import time
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import fakeredis
+import pytest
+
+from app.api import deps
+from app.core import auth_cache
+from app.core.auth_cache import TokenCache, UserCache
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+def make_user(**overrides) -> User:
+    data = dict(
+        id=7,
+        email="ana@example.com",
+        hashed_password="$2b$12$hash",
+        full_name="Ana",
+        is_active=True,
+        is_superuser=False,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        updated_at=datetime(2024, 1, 2, tzinfo=timezone.utc),
+    )
+    data.update(overrides)
+    return User(**data)
+
+
+class TestTokenCache:
+    """Test cases for TokenCache."""
+
+    def test_round_trip(self) -> None:
+        cache = TokenCache(maxsize=10, ttl=60)
+        cache.set("token", 7, expires_at=time.time() + 60)
+
+        assert cache.get("token") == 7
+        assert cache.get("other") is None
+
+    def test_expired_tokens_are_not_cached(self) -> None:
+        cache = TokenCache(maxsize=10, ttl=60)
+        cache.set("token", 7, expires_at=time.time() - 1)
+
+        assert cache.get("token") is None
+
+
+class TestUserCache:
+    """Test cases for UserCache."""
+
+    def test_cached_user_omits_the_password_hash(self) -> None:
+        cache = UserCache(maxsize=10, ttl=60)
+        cache.set(make_user())
+
+        user = cache.get(7)
+
+        assert user.email == "ana@example.com"
+        assert user.hashed_password is None
+        assert cache.stats()["hits"] == 1
+
+    def test_redis_tier_is_shared_and_invalidated(self) -> None:
+        redis_client = fakeredis.FakeRedis()
+        writer = UserCache(maxsize=10, ttl=60, redis_client=redis_client, key_prefix="u:")
+        reader = UserCache(maxsize=10, ttl=60, redis_client=redis_client, key_prefix="u:")
+        writer.set(make_user())
+
+        user = reader.get(7)
+        assert user.is_active is True
+        assert user.created_at == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        writer.invalidate(7)
+        reader.clear()
+        assert reader.get(7) is None
+
+    def test_redis_errors_are_misses(self) -> None:
+        redis_client = MagicMock()
+        redis_client.get.side_effect = ConnectionError("down")
+        cache = UserCache(maxsize=10, ttl=60, redis_client=redis_client)
+
+        assert cache.get(7) is None
+        assert cache.stats()["redis_errors"] == 1
+
+
+def returning(db: AsyncMock, user: User) -> None:
+    """Make ``db.execute`` return ``user`` as the single row."""
+    db.execute.return_value = MagicMock()
+    db.execute.return_value.scalars.return_value.first.return_value = user
+
+
+class TestGetCurrentUser:
+    """Test cases for the cached get_current_user dependency."""
+
+    @pytest.fixture(autouse=True)
+    def caches(self, monkeypatch):
+        monkeypatch.setattr(auth_cache, "token_cache", TokenCache(maxsize=10, ttl=60))
+        monkeypatch.setattr(auth_cache, "user_cache", UserCache(maxsize=10, ttl=60))
+
+    @pytest.mark.asyncio
+    async def test_second_request_skips_the_database(self) -> None:
+        db = AsyncMock()
+        returning(db, make_user())
+        token = create_access_token(7)
+
+        first = await deps.get_current_user(db=db, token=token)
+        second = await deps.get_current_user(db=db, token=token)
+
+        assert first.id == second.id == 7
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reloads_the_user(self) -> None:
+        db = AsyncMock()
+        returning(db, make_user())
+        token = create_access_token(7)
+        await deps.get_current_user(db=db, token=token)
+
+        returning(db, make_user(is_active=False))
+        auth_cache.invalidate_user(7)
+
+        assert (await deps.get_current_user(db=db, token=token)).is_active is False
+        assert db.execute.await_count == 2
+
+
+class TestUserCacheCall:
+    """Test cases for user_cache_call."""
+
+    @pytest.mark.asyncio
+    async def test_in_process_tier_is_called_inline(self, monkeypatch) -> None:
+        monkeypatch.setattr(auth_cache, "user_cache", UserCache(maxsize=10, ttl=60))
+        hop = AsyncMock()
+        monkeypatch.setattr(auth_cache.anyio.to_thread, "run_sync", hop)
+
+        await auth_cache.user_cache_call(auth_cache.invalidate_user, 7)
+
+        hop.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_runs_in_a_thread(self, monkeypatch) -> None:
+        monkeypatch.setattr(
+            auth_cache, "user_cache", UserCache(maxsize=10, ttl=60, redis_client=fakeredis.FakeRedis())
+        )
+        hop = AsyncMock()
+        monkeypatch.setattr(auth_cache.anyio.to_thread, "run_sync", hop)
+
+        await auth_cache.user_cache_call(auth_cache.invalidate_user, 7)
+
+        hop.assert_awaited_once_with(auth_cache.invalidate_user, 7)
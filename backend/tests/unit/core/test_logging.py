@@ -0,0 +1,131 @@
+"""
+Unit tests for application logging.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+import pytest
+
+from app.core import logging as app_logging
+from app.core.config import settings
+from app.core.logging import DeferredQueueHandler, JSONFormatter, LazyJSON, RedactingFilter, log_payload
+
+
+class TestRedactingFilter:
+    """Test cases for RedactingFilter."""
+
+    @pytest.mark.parametrize("text, secret", [
+        ('{"password": "hunter22"}', "hunter22"),
+        ("api_key=abc123&x=1", "abc123"),
+        ("Authorization: Bearer eyJhbGciOi.x.y", "eyJhbGciOi.x.y"),
+        ("using key sk-ABCDEFGH12345678", "sk-ABCDEFGH12345678"),
+    ])
+    def test_secrets_are_masked(self, text: str, secret: str) -> None:
+        redacted = RedactingFilter(fields=["password", "api_key", "authorization"]).redact(text)
+        assert secret not in redacted
+        assert "[REDACTED]" in redacted
+
+    def test_record_arguments_are_redacted(self) -> None:
+        record = logging.makeLogRecord({"msg": "login %s", "args": ('{"password": "x1"}',)})
+        RedactingFilter(fields=["password"]).filter(record)
+        assert record.getMessage() == 'login {"password": "[REDACTED]"}'
+
+
+class TestLazyJSON:
+    """Test cases for LazyJSON and log_payload."""
+
+    def test_dump_is_compact_and_clipped(self) -> None:
+        assert str(LazyJSON({"a": [1, 2]})) == '{"a":[1,2]}'
+        assert str(LazyJSON({"text": "x" * 100}, max_chars=10)).startswith('{"text":"x...')
+
+    def test_payload_is_not_serialized_when_debug_is_off(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "LOG_PAYLOAD_SAMPLE_RATE", 1.0)
+        logger = logging.getLogger("test.payload.off")
+        logger.setLevel(logging.INFO)
+
+        class Exploding:
+            def __repr__(self) -> str:
+                raise AssertionError("serialized")
+
+        log_payload(logger, "payload", {"x": Exploding()})
+
+    def test_sampling(self, monkeypatch, caplog) -> None:
+        logger = logging.getLogger("test.payload.sampled")
+        caplog.set_level(logging.DEBUG, logger=logger.name)
+
+        monkeypatch.setattr(settings, "LOG_PAYLOAD_SAMPLE_RATE", 0.0)
+        log_payload(logger, "payload", {"x": 1})
+        assert caplog.records == []
+
+        monkeypatch.setattr(settings, "LOG_PAYLOAD_SAMPLE_RATE", 1.0)
+        log_payload(logger, "payload", {"x": 1})
+        assert caplog.records[0].getMessage() == 'payload: {"x":1}'
+
+
+def test_json_formatter_includes_extra_fields() -> None:
+    record = logging.makeLogRecord({"msg": "chat turn", "name": "app", "levelname": "INFO", "user_id": 7})
+    data = json.loads(JSONFormatter().format(record))
+    assert data["message"] == "chat turn"
+    assert data["user_id"] == 7
+
+
+class TestDeferredQueueHandler:
+    """Test cases for DeferredQueueHandler."""
+
+    def enqueue(self, record: logging.LogRecord) -> logging.LogRecord:
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+        DeferredQueueHandler(log_queue).handle(record)
+        return log_queue.get_nowait()
+
+    def test_payload_is_serialized_by_the_listener(self) -> None:
+        class Counting(LazyJSON):
+            dumps = 0
+
+            def __str__(self) -> str:
+                Counting.dumps += 1
+                return super().__str__()
+
+        record = logging.makeLogRecord({"msg": "%s: %s", "args": ("payload", Counting({"x": 1}))})
+        queued = self.enqueue(record)
+
+        assert Counting.dumps == 0
+        assert queued.getMessage() == 'payload: {"x":1}'
+        assert Counting.dumps == 1
+
+    def test_mutable_arguments_are_rendered_eagerly(self) -> None:
+        items = [1]
+        queued = self.enqueue(logging.makeLogRecord({"msg": "items %s", "args": (items,)}))
+        items.append(2)
+
+        assert queued.getMessage() == "items [1]"
+
+    def test_tracebacks_are_rendered_to_text(self) -> None:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            exc_info = sys.exc_info()
+        queued = self.enqueue(logging.makeLogRecord({"msg": "failed", "exc_info": exc_info}))
+
+        assert queued.exc_info is None
+        assert "ValueError: boom" in JSONFormatter().format(queued)
+        assert "ValueError: boom" in logging.Formatter().format(queued)
+
+
+def test_configure_logging_uses_a_queue(monkeypatch) -> None:
+    """Records are handed to a background listener instead of written inline."""
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    monkeypatch.setattr(settings, "LOG_LEVEL", "WARNING")
+    try:
+        app_logging.configure_logging()
+        app_logging.configure_logging()  # Idempotent
+
+        assert len(root.handlers) == 1
+        assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+        assert root.level == logging.WARNING
+    finally:
+        app_logging.shutdown_logging()
+        root.handlers, root.level = saved_handlers, saved_level
@@ -0,0 +1,91 @@
+"""
+Unit tests for off-loop password hashing.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import (
+    PasswordHashingBusy,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+
+
+@pytest.fixture(autouse=True)
+def hashing_pool():
+    yield
+    security.shutdown_password_hashing()
+
+
+class TestAsyncHashing:
+    """Test cases for the async hashing helpers."""
+
+    @pytest.mark.asyncio
+    async def test_hash_round_trip(self) -> None:
+        hashed = await get_password_hash_async("TestPassword123!")
+
+        assert verify_password("TestPassword123!", hashed)
+        assert await verify_password_async("TestPassword123!", hashed)
+        assert not await verify_password_async("wrong", hashed)
+
+    @pytest.mark.asyncio
+    async def test_hashing_runs_off_the_event_loop(self, monkeypatch) -> None:
+        threads = []
+        monkeypatch.setattr(
+            security.pwd_context, "hash", lambda password: threads.append(threading.current_thread().name) or "x"
+        )
+
+        await get_password_hash_async("secret")
+
+        assert threads[0].startswith("password-hash")
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_too_many_are_pending(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+        monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 2)
+        release = threading.Event()
+        monkeypatch.setattr(security.pwd_context, "verify", lambda *args: release.wait(5))
+
+        pending = [asyncio.ensure_future(verify_password_async("a", "b")) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHashingBusy) as exc_info:
+            await verify_password_async("a", "b")
+        assert exc_info.value.retry_after >= 1
+
+        release.set()
+        assert await asyncio.gather(*pending) == [True, True]
+        assert security._hash_pending == 0
+
+
+class TestTuning:
+    """Test cases for bcrypt cost auto-tuning."""
+
+    @pytest.fixture(autouse=True)
+    def restore_context(self):
+        saved = security.pwd_context.to_dict()
+        yield
+        security.pwd_context.load(saved)
+
+    def test_cost_grows_with_the_budget(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "PASSWORD_BCRYPT_MIN_ROUNDS", 4)
+        monkeypatch.setattr(settings, "PASSWORD_BCRYPT_MAX_ROUNDS", 31)
+
+        small = security.tune_password_hashing(target_seconds=0.0001)
+        large = security.tune_password_hashing(target_seconds=0.05)
+
+        assert small == 4
+        assert 4 < large <= 31
+
+    def test_hashes_below_the_tuned_cost_need_rehash(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "PASSWORD_BCRYPT_MIN_ROUNDS", 4)
+        monkeypatch.setattr(settings, "PASSWORD_BCRYPT_MAX_ROUNDS", 5)
+        old = security.pwd_context.handler("bcrypt").using(rounds=4).hash("secret")
+
+        assert security.tune_password_hashing(target_seconds=10) == 5
+        assert security.password_needs_rehash(old)
+        assert not security.password_needs_rehash(security.get_password_hash("secret"))
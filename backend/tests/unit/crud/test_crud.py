@@ -0,0 +1,211 @@
+"""
+Unit tests for the async CRUD layer, on an in-memory SQLite database.
+"""
+from datetime import datetime, timedelta
+from typing import AsyncGenerator
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import crud
+from app.core import auth_cache
+from app.core.auth_cache import UserCache
+from app.crud.base import InvalidCursor, decode_cursor, encode_cursor
+from app.models.base import Base
+from app.models.item import Item
+from app.models.user import User  # noqa: F401
+from app.schemas.item import ItemCreate, ItemUpdate
+from app.schemas.user import UserUpdate
+
+
+@pytest.fixture
+async def session() -> AsyncGenerator[AsyncSession, None]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        yield db
+    await engine.dispose()
+
+
+async def make_user(db: AsyncSession, email: str = "ana@example.com") -> User:
+    return await crud.user.create(db, obj_in={"email": email, "password": "TestPassword123!"})
+
+
+class TestCRUDItem:
+    """Test cases for the item CRUD."""
+
+    @pytest.mark.asyncio
+    async def test_create_update_remove(self, session: AsyncSession) -> None:
+        owner = await make_user(session)
+        item = await crud.item.create_with_owner(
+            session, obj_in=ItemCreate(title="Lisbon"), owner_id=owner.id
+        )
+
+        item = await crud.item.update(session, db_obj=item, obj_in=ItemUpdate(description="3 days"))
+        assert (await crud.item.get(session, item.id)).description == "3 days"
+
+        await crud.item.remove(session, id=item.id)
+        assert await crud.item.get(session, item.id) is None
+
+    @pytest.mark.asyncio
+    async def test_update_is_a_single_statement(self, session: AsyncSession) -> None:
+        owner = await make_user(session)
+        item = await crud.item.create_with_owner(session, obj_in=ItemCreate(title="a"), owner_id=owner.id)
+        statements = []
+        event.listen(
+            session.bind.sync_engine, "before_cursor_execute",
+            lambda conn, cursor, sql, *args: statements.append(sql),
+        )
+
+        updated = await crud.item.update(
+            session, db_obj=item, obj_in={"title": "b", "not_a_column": 1}
+        )
+
+        assert updated is item and item.title == "b"
+        assert len(statements) == 1 and statements[0].startswith("UPDATE")
+
+    @pytest.mark.asyncio
+    async def test_get_multi_by_owner(self, session: AsyncSession) -> None:
+        ana, bo = await make_user(session), await make_user(session, "bo@example.com")
+        for title in ("a", "b", "c"):
+            await crud.item.create_with_owner(session, obj_in=ItemCreate(title=title), owner_id=ana.id)
+        await crud.item.create_with_owner(session, obj_in=ItemCreate(title="x"), owner_id=bo.id)
+
+        items = await crud.item.get_multi_by_owner(session, owner_id=ana.id, skip=1, limit=5)
+
+        assert [i.title for i in items] == ["b", "c"]
+        assert len(await crud.item.get_multi(session)) == 4
+
+
+class TestCRUDUser:
+    """Test cases for the user CRUD."""
+
+    @pytest.mark.asyncio
+    async def test_authenticate(self, session: AsyncSession) -> None:
+        await make_user(session)
+
+        assert await crud.user.authenticate(session, email="ana@example.com", password="TestPassword123!")
+        assert await crud.user.authenticate(session, email="ana@example.com", password="nope") is None
+
+    @pytest.mark.asyncio
+    async def test_update_rehashes_password_and_invalidates_cache(
+        self, session: AsyncSession, monkeypatch
+    ) -> None:
+        cache = UserCache(maxsize=10, ttl=60)
+        monkeypatch.setattr(auth_cache, "user_cache", cache)
+        user = await make_user(session)
+        cache.set(user)
+
+        await crud.user.update(session, db_obj=user, obj_in=UserUpdate(password="NewPassword456!"))
+
+        assert cache.get(user.id) is None
+        assert await crud.user.authenticate(session, email="ana@example.com", password="NewPassword456!")
+
+
+class TestKeysetPagination:
+    """Test cases for cursor pagination."""
+
+    def test_cursor_round_trip(self) -> None:
+        created_at = datetime(2024, 5, 1, 12, 30)
+        assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "e30"])
+    def test_malformed_cursor(self, cursor: str) -> None:
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_every_row_once(self, session: AsyncSession) -> None:
+        ana, bo = await make_user(session), await make_user(session, "bo@example.com")
+        start = datetime(2024, 1, 1)
+        # Rows sharing a created_at are ordered by id
+        for n in range(7):
+            session.add(Item(title=f"a{n}", owner_id=ana.id, created_at=start + timedelta(hours=n // 2)))
+        session.add(Item(title="b", owner_id=bo.id, created_at=start))
+        await session.commit()
+
+        titles, cursor = [], ""
+        while cursor is not None:
+            page, cursor = await crud.item.get_page(session, cursor=cursor, limit=3)
+            titles.append([item.title for item in page])
+
+        assert titles == [["a0", "a1", "b"], ["a2", "a3", "a4"], ["a5", "a6"]]
+
+    @pytest.mark.asyncio
+    async def test_sort_key_is_never_null(self, session: AsyncSession) -> None:
+        owner = await make_user(session)
+        item = await crud.item.create_with_owner(session, obj_in=ItemCreate(title="t"), owner_id=owner.id)
+        assert decode_cursor(encode_cursor(item.created_at, item.id))[1] == item.id
+
+        # A NULL created_at would make a cursor the next request rejects
+        with pytest.raises(IntegrityError):
+            await session.execute(
+                Item.__table__.insert().values(title="null", owner_id=owner.id, created_at=None)
+            )
+
+    @pytest.mark.asyncio
+    async def test_page_query_uses_the_keyset_index(self, session: AsyncSession) -> None:
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+            statements.append((statement, parameters))
+
+        engine = session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            await crud.item.get_page(session, cursor=encode_cursor(datetime(2024, 1, 1), 1), limit=10)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        (statement, parameters), = statements
+        conn = await session.connection()
+        plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        details = " ".join(row[-1] for row in plan)
+
+        assert "ix_items_created_at_id" in details
+        assert "TEMP B-TREE" not in details  # No sort of the whole table
+
+
+class TestBulkOperations:
+    """Test cases for the bulk CRUD methods."""
+
+    @pytest.mark.asyncio
+    async def test_create_update_remove_many(self, session: AsyncSession) -> None:
+        owner = await make_user(session)
+
+        items = await crud.item.create_many_with_owner(
+            session, objs_in=[ItemCreate(title=t) for t in ("a", "b", "c")], owner_id=owner.id
+        )
+        assert [i.title for i in items] == ["a", "b", "c"]
+        assert all(i.id is not None for i in items)
+
+        updated = await crud.item.update_many(
+            session, objs_in=[{"id": items[0].id, "title": "A"}, {"id": items[2].id, "description": "x"}]
+        )
+        assert [(i.title, i.description) for i in updated] == [("A", None), ("c", "x")]
+
+        assert await crud.item.remove_many(session, ids=[items[0].id, items[1].id]) == 2
+        assert [i.title for i in await crud.item.get_multi(session)] == ["c"]
+
+    @pytest.mark.asyncio
+    async def test_upsert_many(self, session: AsyncSession) -> None:
+        owner = await make_user(session)
+        existing = await crud.item.create_with_owner(
+            session, obj_in=ItemCreate(title="old"), owner_id=owner.id
+        )
+
+        rows = await crud.item.upsert_many(session, objs_in=[
+            {"id": existing.id, "title": "new", "owner_id": owner.id},
+            {"title": "fresh", "owner_id": owner.id},
+        ])
+
+        assert sorted(i.title for i in rows) == ["fresh", "new"]
+        assert (await crud.item.get(session, existing.id)).title == "new"
+
+    @pytest.mark.asyncio
+    async def test_empty_batches_skip_the_database(self) -> None:
+        assert await crud.item.create_many(None, objs_in=[]) == []
+        assert await crud.item.remove_many(None, ids=[]) == 0
@@ -0,0 +1,91 @@
+"""
+Unit tests for the database bootstrap and schema version check.
+"""
+from typing import AsyncGenerator
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import crud
+from app.core.config import settings
+from app.models.base import Base
+from app.db import init_db as init_db_module
+from app.db.init_db import (
+    SCHEMA_VERSION,
+    SchemaVersionError,
+    get_schema_version,
+    init_db,
+    verify_schema_version,
+)
+
+
+@pytest.fixture
+async def session(tmp_path) -> AsyncGenerator[AsyncSession, None]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        yield db
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_verify_fails_before_bootstrap(session: AsyncSession) -> None:
+    with pytest.raises(SchemaVersionError):
+        await verify_schema_version(session)
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_is_idempotent(session: AsyncSession, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "FIRST_SUPERUSER", "admin@example.com")
+    monkeypatch.setattr(settings, "FIRST_SUPERUSER_PASSWORD", "changethis1")
+
+    await init_db(session)
+    await init_db(session)
+
+    await verify_schema_version(session)
+    assert await get_schema_version(session) == SCHEMA_VERSION
+    admin = await crud.user.get_by_email(session, email="admin@example.com")
+    assert admin.is_superuser
+    assert len(await crud.user.get_multi(session)) == 1
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_validates_the_first_superuser(session: AsyncSession, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "FIRST_SUPERUSER", "admin@example.com")
+    monkeypatch.setattr(settings, "FIRST_SUPERUSER_PASSWORD", "changethis")
+
+    with pytest.raises(ValidationError):
+        await init_db(session)
+
+    assert await crud.user.get_by_email(session, email="admin@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_an_older_stamp(session: AsyncSession, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "FIRST_SUPERUSER", "")
+    await init_db(session)
+
+    monkeypatch.setattr(init_db_module, "SCHEMA_VERSION", SCHEMA_VERSION + 1)
+
+    with pytest.raises(SchemaVersionError):
+        await init_db_module.verify_schema_version(session)
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_adds_indexes_to_existing_tables(session: AsyncSession, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "FIRST_SUPERUSER", "")
+    conn = await session.connection()
+    await conn.run_sync(Base.metadata.create_all)
+    # As deployed before the keyset indexes existed
+    await conn.execute(text("DROP INDEX ix_items_created_at_id"))
+    await conn.execute(text("DROP INDEX ix_users_created_at_id"))
+
+    await init_db(session)
+
+    def index_names(sync_conn) -> set:
+        inspector = inspect(sync_conn)
+        return {ix["name"] for table in ("items", "users") for ix in inspector.get_indexes(table)}
+
+    names = await (await session.connection()).run_sync(index_names)
+    assert {"ix_items_created_at_id", "ix_users_created_at_id"} <= names
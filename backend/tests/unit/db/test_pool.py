@@ -0,0 +1,55 @@
+"""
+Unit tests for connection pool configuration and instrumentation.
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import NullPool, StaticPool
+
+from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, engine_options, instrument_engine, pool_stats
+
+
+class TestEngineOptions:
+    """Test cases for engine_options."""
+
+    def test_postgres_uses_the_configured_queue_pool(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+        options = engine_options("postgresql://db/app", name="pg")
+
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == 3
+        assert options["pool_logging_name"] == "pg"
+
+    def test_sqlite_modes(self, monkeypatch) -> None:
+        assert engine_options("sqlite:///:memory:", name="m")["poolclass"] is StaticPool
+        assert engine_options("sqlite:////tmp/app.db", name="f")["poolclass"] is InstrumentedQueuePool
+
+        monkeypatch.setattr(settings, "DB_SQLITE_POOLED", False)
+        assert engine_options("sqlite:////tmp/app.db", name="f")["poolclass"] is NullPool
+
+
+def test_pool_metrics(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", **engine_options(
+        f"sqlite:///{tmp_path / 'app.db'}", name="test-pool"
+    ))
+    instrument_engine(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert pool_stats()["test-pool"]["checked_out"] == 1
+        with pytest.raises(PoolTimeout):
+            engine.connect()
+    with engine.connect():
+        pass
+
+    stats = pool_stats()["test-pool"]
+    assert stats["checkouts"] == 2
+    assert stats["connects"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["wait_max"] >= 0.05
+    engine.dispose()
@@ -0,0 +1,125 @@
+"""
+Unit tests for read-replica routing, on SQLite files standing in for the
+primary and its replicas.
+"""
+from typing import AsyncGenerator, Tuple
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app import crud
+from app.core.security import get_password_hash
+from app.db.replicas import ReplicaSet, RoutingSession, on_primary, use_primary
+from app.models.base import Base
+from app.models.user import User
+
+
+async def make_engine(path) -> AsyncEngine:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE whoami (name TEXT)"))
+        await conn.execute(text(f"INSERT INTO whoami VALUES ('{path.stem}')"))
+    return engine
+
+
+@pytest.fixture
+async def databases(tmp_path) -> AsyncGenerator[Tuple[AsyncEngine, ReplicaSet], None]:
+    primary = await make_engine(tmp_path / "primary")
+    replicas = ReplicaSet([await make_engine(tmp_path / "r1"), await make_engine(tmp_path / "r2")], max_lag=5)
+    yield primary, replicas
+    await primary.dispose()
+    await replicas.dispose()
+
+
+def session_for(primary: AsyncEngine, replicas: ReplicaSet) -> AsyncSession:
+    maker = async_sessionmaker(primary, sync_session_class=RoutingSession, replicas=replicas)
+    return maker()
+
+
+def whoami_query():
+    from sqlalchemy import column, select, table
+    return select(column("name")).select_from(table("whoami"))
+
+
+async def whoami(db: AsyncSession) -> str:
+    return await db.scalar(whoami_query())
+
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_over_replicas(databases) -> None:
+    primary, replicas = databases
+    async with session_for(primary, replicas) as db:
+        assert [await whoami(db) for _ in range(4)] == ["r1", "r2", "r1", "r2"]
+
+
+@pytest.mark.asyncio
+async def test_writes_and_later_reads_go_to_the_primary(databases) -> None:
+    primary, replicas = databases
+    async with session_for(primary, replicas) as db:
+        await db.execute(text("UPDATE whoami SET name = 'primary!'"))
+        assert await whoami(db) == "primary!"
+
+
+@pytest.mark.asyncio
+async def test_use_primary(databases) -> None:
+    primary, replicas = databases
+    async with session_for(primary, replicas) as db:
+        use_primary(db)
+        assert await whoami(db) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_replicas_are_skipped(databases, monkeypatch) -> None:
+    primary, replicas = databases
+    replicas.replicas[0].healthy = False
+    async with session_for(primary, replicas) as db:
+        assert {await whoami(db) for _ in range(3)} == {"r2"}
+
+    replicas.replicas[1].healthy = False
+    async with session_for(primary, replicas) as db:
+        assert await whoami(db) == "primary"
+
+    await replicas.check()
+    assert [r.healthy for r in replicas.replicas] == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_fails_the_check(databases) -> None:
+    _, replicas = databases
+    replicas.max_lag = -1
+
+    await replicas.check()
+
+    assert replicas.pick() is None
+
+
+@pytest.mark.asyncio
+async def test_on_primary_pins_one_statement(databases) -> None:
+    primary, replicas = databases
+    async with session_for(primary, replicas) as db:
+        assert await db.scalar(on_primary(whoami_query())) == "primary"
+        assert await whoami(db) == "r1"
+
+
+@pytest.mark.asyncio
+async def test_login_reads_the_user_from_the_primary(databases) -> None:
+    primary, replicas = databases
+    for replica in replicas.replicas:
+        async with replica.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    async with primary.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # A fresh account the replicas have not replayed yet
+        await conn.execute(
+            User.__table__.insert().values(
+                id=1, email="new@example.com", hashed_password=get_password_hash("s3cret-pass")
+            )
+        )
+
+    async with session_for(primary, replicas) as db:
+        user = await crud.user.authenticate(db, email="new@example.com", password="s3cret-pass")
+        assert user is not None
+        assert (await crud.user.get(db, 1)).email == "new@example.com"
+        # Other reads of the same session still go to a replica
+        assert await whoami(db) == "r1"
@@ -0,0 +1,147 @@
+"""
+Unit tests for LLM admission control.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.langchain.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    Priority,
+    classify_priority,
+)
+from app.services.langchain.agent import TravelAgent, LANGCHAIN_AVAILABLE
+from app.services.langchain.client import LlamaClient
+
+
+async def hold(controller: AdmissionController, order: list, name: str, user_id, priority, release: asyncio.Event):
+    async with controller.slot(user_id, priority):
+        order.append(name)
+        await release.wait()
+
+
+class TestClassifyPriority:
+    """Test cases for classify_priority."""
+
+    @pytest.mark.parametrize("message, expected", [
+        ("Please confirm my booking for Friday", Priority.HIGH),
+        ("I need a refund for my ticket", Priority.HIGH),
+        ("Thanks!", Priority.LOW),
+        ("hello", Priority.LOW),
+        ("What is the best time to visit Tokyo?", Priority.NORMAL),
+    ])
+    def test_lanes(self, message: str, expected: Priority) -> None:
+        assert classify_priority(message) == expected
+
+
+class TestAdmissionController:
+    """Test cases for AdmissionController."""
+
+    @pytest.mark.asyncio
+    async def test_high_priority_jumps_the_queue(self) -> None:
+        controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait=5, per_user_limit=10)
+        order: list = []
+        release = asyncio.Event()
+        busy = asyncio.create_task(hold(controller, order, "busy", 1, Priority.NORMAL, asyncio.Event()))
+        await asyncio.sleep(0)
+
+        tasks = [
+            asyncio.create_task(hold(controller, order, "small talk", 2, Priority.LOW, release)),
+            asyncio.create_task(hold(controller, order, "question", 3, Priority.NORMAL, release)),
+            asyncio.create_task(hold(controller, order, "booking", 4, Priority.HIGH, release)),
+        ]
+        await asyncio.sleep(0)
+        busy.cancel()
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert order == ["busy", "booking", "question", "small talk"]
+
+    @pytest.mark.asyncio
+    async def test_users_are_served_round_robin(self) -> None:
+        controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait=5, per_user_limit=10)
+        order: list = []
+        release = asyncio.Event()
+        release.set()
+        await controller.acquire("holder")
+
+        tasks = [
+            asyncio.create_task(hold(controller, order, name, user, Priority.NORMAL, release))
+            for name, user in [("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b")]
+        ]
+        await asyncio.sleep(0)
+        controller.release("holder")
+        await asyncio.gather(*tasks)
+
+        assert order == ["a1", "b1", "a2", "a3"]
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_shed_immediately(self) -> None:
+        controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait=5, per_user_limit=10)
+        await controller.acquire(1)
+        waiter = asyncio.create_task(controller.acquire(2))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire(3)
+
+        assert exc_info.value.retry_after >= 1
+        assert controller.stats()["rejected"] == 1
+        waiter.cancel()
+
+    @pytest.mark.asyncio
+    async def test_per_user_limit(self) -> None:
+        controller = AdmissionController(max_concurrency=10, max_queue=10, max_wait=5, per_user_limit=2)
+        await controller.acquire(1)
+        await controller.acquire(1)
+
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(1)
+        await controller.acquire(2)
+
+    @pytest.mark.asyncio
+    async def test_wait_is_bounded(self) -> None:
+        controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait=0.01, per_user_limit=10)
+        await controller.acquire(1)
+
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(2)
+
+        assert controller.stats() == {
+            "active": 1, "queued": 0, "admitted": 1, "rejected": 1, "timeouts": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_queue(self) -> None:
+        controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait=5, per_user_limit=10)
+        await controller.acquire(1)
+        waiter = asyncio.create_task(controller.acquire(2))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+
+        controller.release(1)
+
+        assert controller.stats()["active"] == 0
+        assert controller.stats()["queued"] == 0
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_agent_raises_when_overloaded(monkeypatch) -> None:
+    """A shed request surfaces as AdmissionRejected instead of an apology message."""
+    monkeypatch.setenv("LLAMA_API_KEY", "secret")
+    agent = TravelAgent(model_name="test-model")
+    agent.admission = AdmissionController(max_concurrency=1, max_queue=0, max_wait=1, per_user_limit=5)
+    agent.client = LlamaClient(
+        agent.api_url,
+        agent.api_key,
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+    )
+    await agent.admission.acquire(99)
+
+    with pytest.raises(AdmissionRejected):
+        await agent.process_message("Where should I go in Peru?", user_id=1)
+    await agent.aclose()
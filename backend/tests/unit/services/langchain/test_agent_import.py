@@ -0,0 +1,95 @@
+"""
+Import-time budget of the agent module and lazy construction of the agent.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.services.langchain import agent as agent_module
+
+BACKEND_DIR = Path(__file__).resolve().parents[4]
+
+# Generous, so only a regression to import-time work (not a slow CI host) trips it
+IMPORT_BUDGET_SECONDS = 5.0
+
+# Parts of langchain_core only the agent itself needs; the message types are imported eagerly
+DEFERRED_CORE_MODULES = (
+    "langchain_core.chat_history",
+    "langchain_core.language_models",
+    "langchain_core.prompts",
+    "langchain_core.runnables",
+)
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.services.langchain.agent as agent
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "elapsed": elapsed,
+    "modules": sorted(m for m in sys.modules if m.split(".")[0] in ("langchain", "langchain_community")),
+    "core_modules": sorted(m for m in sys.modules if m.startswith("langchain_core.")),
+    "agent_built": agent._travel_agent is not None,
+}))
+"""
+
+
+def test_import_is_cheap_and_side_effect_free() -> None:
+    # A fresh interpreter, since this process has already imported everything
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR)}
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert probe["modules"] == []
+    assert not [m for m in probe["core_modules"] if m.startswith(DEFERRED_CORE_MODULES)]
+    assert probe["agent_built"] is False
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+@pytest.fixture
+def fresh_agent_state(monkeypatch):
+    monkeypatch.setattr(agent_module, "_travel_agent", None)
+    monkeypatch.setattr(agent_module, "_travel_agent_failed", False)
+
+
+def test_agent_is_built_once_on_first_use(fresh_agent_state, monkeypatch) -> None:
+    built = []
+
+    class FakeAgent:
+        def __init__(self) -> None:
+            built.append(self)
+
+    monkeypatch.setattr(agent_module, "LANGCHAIN_AVAILABLE", True)
+    monkeypatch.setattr(agent_module, "TravelAgent", FakeAgent)
+
+    assert agent_module.get_travel_agent() is built[0]
+    assert agent_module.get_travel_agent() is built[0]
+    assert agent_module.travel_agent is built[0]
+    assert len(built) == 1
+
+
+def test_failed_build_is_not_retried(fresh_agent_state, monkeypatch) -> None:
+    attempts = []
+
+    def failing_agent() -> None:
+        attempts.append(1)
+        raise ValueError("LLAMA_API_KEY or META_API_KEY environment variable is not set")
+
+    monkeypatch.setattr(agent_module, "LANGCHAIN_AVAILABLE", True)
+    monkeypatch.setattr(agent_module, "TravelAgent", failing_agent)
+
+    assert agent_module.get_travel_agent() is None
+    assert agent_module.get_travel_agent() is None
+    assert len(attempts) == 1
@@ -0,0 +1,138 @@
+"""
+Unit tests for the exact-match LLM response cache.
+"""
+import json
+
+import httpx
+import pytest
+
+from app.services.langchain.agent import TravelAgent, LANGCHAIN_AVAILABLE
+from app.services.langchain.cache import ResponseCache, make_cache_key
+from app.services.langchain.client import LlamaClient
+
+
+def payload(*contents: str, temperature: float = 0.0) -> dict:
+    return {
+        "model": "m",
+        "temperature": temperature,
+        "messages": [{"role": "user", "content": c} for c in contents],
+    }
+
+
+class TestMakeCacheKey:
+    """Test cases for make_cache_key."""
+
+    def test_normalizes_case_and_whitespace(self) -> None:
+        """Prompts differing only in case or spacing share a key."""
+        assert make_cache_key(payload("Best time to visit  Rome?")) == make_cache_key(
+            payload(" best time to visit rome? ")
+        )
+
+    def test_covers_history_and_parameters(self) -> None:
+        """Different history or sampling parameters produce different keys."""
+        base = make_cache_key(payload("Rome?"))
+        assert make_cache_key(payload("Hi", "Rome?")) != base
+        assert make_cache_key(payload("Rome?", temperature=0.2)) != base
+
+    def test_ignores_stream_flag(self) -> None:
+        """Streamed and non-streamed requests share cached responses."""
+        assert make_cache_key({**payload("Rome?"), "stream": True}) == make_cache_key(payload("Rome?"))
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    @pytest.mark.asyncio
+    async def test_get_set_and_stats(self) -> None:
+        """Hits and misses are counted."""
+        cache = ResponseCache(maxsize=10, ttl=60, max_temperature=0.3)
+        assert await cache.get("k") is None
+        await cache.set("k", "v")
+        assert await cache.get("k") == "v"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_is_cacheable_by_temperature(self) -> None:
+        cache = ResponseCache(maxsize=10, max_temperature=0.3)
+        assert cache.is_cacheable(0.0)
+        assert not cache.is_cacheable(0.7)
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_is_shared(self) -> None:
+        """An entry written by one worker is served to another through Redis."""
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeRedis()
+        writer = ResponseCache(maxsize=10, ttl=60, redis_client=client, key_prefix="t:")
+        reader = ResponseCache(maxsize=10, ttl=60, redis_client=client, key_prefix="t:")
+
+        await writer.set("k", "v")
+
+        assert await reader.get("k") == "v"
+        assert reader.stats()["redis_hits"] == 1
+        assert 0 < client.ttl("t:k") <= 60
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_are_misses(self) -> None:
+        """A failing Redis tier never breaks a lookup."""
+        class BrokenRedis:
+            def get(self, key):
+                raise ConnectionError("down")
+
+        cache = ResponseCache(maxsize=10, redis_client=BrokenRedis())
+        assert await cache.get("k") is None
+        assert cache.stats()["redis_errors"] == 1
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+class TestTravelAgentResponseCache:
+    """Test cases for the response cache in TravelAgent."""
+
+    @pytest.fixture
+    def requests(self) -> list:
+        return []
+
+    @pytest.fixture
+    def agent(self, monkeypatch, requests: list) -> TravelAgent:
+        monkeypatch.setenv("LLAMA_API_KEY", "secret")
+        agent = TravelAgent(model_name="test-model", temperature=0.0)
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            text = f"reply {len(requests)}"
+            return httpx.Response(200, json={"completion_message": {"content": {"text": text}}})
+
+        agent.client = LlamaClient(agent.api_url, agent.api_key, transport=httpx.MockTransport(handler))
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_is_served_from_cache(self, agent: TravelAgent, requests: list) -> None:
+        """The same prompt in a fresh session does not reach the API twice."""
+        assert await agent.process_message("Visa for Japan?", session_id="a") == "reply 1"
+        assert await agent.process_message("visa for  japan?", session_id="b") == "reply 1"
+
+        assert len(requests) == 1
+        # The cached answer is still recorded in the second session
+        history = agent.sessions.get_history(session_id="b")
+        assert [m.content for m in history.messages] == ["visa for  japan?", "reply 1"]
+        assert agent.stats()["response_cache"]["hits"] == 1
+        await agent.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_replays_cached_response(self, agent: TravelAgent, requests: list) -> None:
+        """A cached response is streamed back as a single chunk."""
+        await agent.process_message("Visa for Japan?", session_id="a")
+
+        chunks = [c async for c in agent.stream_message("Visa for Japan?", session_id="b")]
+
+        assert chunks == ["reply 1"]
+        assert len(requests) == 1
+        await agent.aclose()
+
+    @pytest.mark.asyncio
+    async def test_high_temperature_bypasses_cache(self, agent: TravelAgent, requests: list) -> None:
+        agent.temperature = 0.9
+        await agent.process_message("Visa for Japan?", session_id="a")
+        await agent.process_message("Visa for Japan?", session_id="b")
+
+        assert len(requests) == 2
+        await agent.aclose()
@@ -0,0 +1,123 @@
+"""
+Unit tests for cancelling generations whose caller went away.
+"""
+import asyncio
+from typing import Any, AsyncIterator, Dict
+
+import pytest
+
+from app.services.langchain.agent import TravelAgent, LANGCHAIN_AVAILABLE
+from app.services.langchain.cancellation import CancellationStats
+from app.services.langchain.providers import LLMProvider, ProviderRouter
+
+
+class HangingProvider(LLMProvider):
+    """Streams one token, then waits forever; records whether it was torn down."""
+
+    name = "hanging"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.started = asyncio.Event()
+        self.closed = False
+
+    async def complete(self, payload: Dict[str, Any]) -> str:
+        self.started.set()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.closed = True
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        try:
+            yield "Lima"
+            await asyncio.Event().wait()
+        finally:
+            self.closed = True
+
+
+def test_stats_estimate_tokens_saved() -> None:
+    stats = CancellationStats()
+    stats.record(500)
+    stats.record(500, streamed_tokens=120, stream=True)
+    stats.record(100, streamed_tokens=150, stream=True)
+
+    assert stats.stats() == {
+        "cancelled": 3,
+        "cancelled_streams": 2,
+        "tokens_streamed": 270,
+        "tokens_saved": 880,
+    }
+
+
+@pytest.fixture
+async def agent(monkeypatch) -> TravelAgent:
+    monkeypatch.setenv("LLAMA_API_KEY", "secret")
+    agent = TravelAgent(model_name="test-model", max_tokens=500)
+    agent.response_cache = agent.semantic_cache = None
+    provider = HangingProvider()
+    agent.router = ProviderRouter([provider])
+    agent.provider = provider
+    yield agent
+    await agent.aclose()
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_closing_a_stream_cancels_the_provider_stream(agent: TravelAgent) -> None:
+    stream = agent.stream_message("Where should I go in Peru?", user_id=1)
+    assert await stream.__anext__() == "Lima"
+
+    await stream.aclose()
+
+    assert agent.provider.closed
+    assert agent.admission.stats()["active"] == 0
+    assert await agent.sessions.get_history(1, None).aget_messages() == []
+    stats = agent.stats()["cancellations"]
+    assert stats["cancelled_streams"] == 1
+    assert stats["tokens_streamed"] >= 1
+    assert stats["tokens_saved"] == 500 - stats["tokens_streamed"]
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_cancelling_a_request_cancels_the_provider_call(agent: TravelAgent) -> None:
+    task = asyncio.create_task(agent.process_message("Where should I go in Peru?", user_id=1))
+    await agent.provider.started.wait()
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0)  # Let the shared upstream call observe its cancellation
+
+    assert agent.provider.closed
+    assert agent.admission.stats()["active"] == 0
+    assert await agent.sessions.get_history(1, None).aget_messages() == []
+    assert agent.stats()["cancellations"]["cancelled"] == 1
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_shared_call_counts_as_cancelled_only_without_waiters(agent: TravelAgent) -> None:
+    assert agent.inflight is not None
+    first = asyncio.create_task(agent.process_message("Where should I go in Peru?", user_id=1))
+    second = asyncio.create_task(agent.process_message("Where should I go in Peru?", user_id=2))
+    await agent.provider.started.wait()
+    await asyncio.sleep(0)
+    assert agent.inflight.stats()["collapsed"] == 1
+
+    # One waiter disconnects; the upstream call keeps going for the other
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    await asyncio.sleep(0)
+    assert not agent.provider.closed
+    assert agent.stats()["cancellations"]["cancelled"] == 0
+
+    second.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await second
+    await asyncio.sleep(0)
+    assert agent.provider.closed
+    assert agent.stats()["cancellations"]["cancelled"] == 1
+    assert agent.inflight.stats()["abandoned"] == 1
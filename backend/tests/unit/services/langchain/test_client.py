@@ -0,0 +1,167 @@
+"""
+Unit tests for the pooled async Llama API client.
+"""
+import json
+
+import httpx
+import pytest
+
+from app.services.langchain.agent import TravelAgent, LANGCHAIN_AVAILABLE
+from app.services.langchain.client import LlamaAPIError, LlamaClient
+from app.services.langchain.providers import parse_stream_chunk
+
+
+def completion(text: str) -> dict:
+    return {"completion_message": {"content": {"type": "text", "text": text}}}
+
+
+def sse_stream(*tokens: str) -> bytes:
+    events = [
+        {"event": {"event_type": "progress", "delta": {"type": "text", "text": token}}}
+        for token in tokens
+    ]
+    return "".join(f"data: {json.dumps(e)}\n\n" for e in events).encode() + b"data: [DONE]\n\n"
+
+
+class TestLlamaClient:
+    """Test cases for LlamaClient."""
+
+    @pytest.mark.asyncio
+    async def test_complete_posts_payload_with_auth(self) -> None:
+        """The payload is posted as JSON with the bearer token attached."""
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["auth"] = request.headers["Authorization"]
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(200, json=completion("hi"))
+
+        client = LlamaClient(
+            "https://llm.test/v1/chat/completions",
+            "secret",
+            transport=httpx.MockTransport(handler),
+        )
+        result = await client.complete({"model": "m", "messages": []})
+
+        assert result == completion("hi")
+        assert seen["auth"] == "Bearer secret"
+        assert seen["body"] == {"model": "m", "messages": []}
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused_between_requests(self) -> None:
+        """The same pooled AsyncClient serves every request until closed."""
+        client = LlamaClient(
+            "https://llm.test/v1/chat/completions",
+            "secret",
+            max_connections=5,
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+        )
+        first = client.client
+        await client.complete({})
+        assert client.client is first
+        assert client.limits.max_connections == 5
+
+        await client.aclose()
+        assert client.client is not first
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_complete_raises_on_http_error(self) -> None:
+        """Non-2xx responses surface as httpx.HTTPStatusError."""
+        client = LlamaClient(
+            "https://llm.test/v1/chat/completions",
+            "secret",
+            transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+        )
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.complete({})
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_decoded_events(self) -> None:
+        """Each SSE data line is decoded and the stream stops at [DONE]."""
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(200, content=sse_stream("Hel", "lo"))
+
+        client = LlamaClient(
+            "https://llm.test/v1/chat/completions",
+            "secret",
+            transport=httpx.MockTransport(handler),
+        )
+        events = [event async for event in client.stream({"model": "m"})]
+
+        assert seen["body"] == {"model": "m", "stream": True}
+        assert [e["event"]["delta"]["text"] for e in events] == ["Hel", "lo"]
+        await client.aclose()
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+class TestTravelAgentAsync:
+    """Test cases for the async TravelAgent.process_message path."""
+
+    @pytest.fixture
+    def agent(self, monkeypatch) -> TravelAgent:
+        monkeypatch.setenv("LLAMA_API_KEY", "secret")
+        return TravelAgent(model_name="test-model")
+
+    @pytest.mark.asyncio
+    async def test_process_message_records_history(self, agent: TravelAgent) -> None:
+        """A successful completion is returned and appended to memory."""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, json=completion(f"reply {len(requests)}"))
+
+        agent.client = LlamaClient(agent.api_url, agent.api_key, transport=httpx.MockTransport(handler))
+
+        assert await agent.process_message("  Hello  ") == "reply 1"
+        assert await agent.process_message("Again") == "reply 2"
+
+        # The second request carries the first turn as history
+        assert [m["content"] for m in requests[1]["messages"][1:]] == ["Hello", "reply 1", "Again"]
+        await agent.aclose()
+
+    @pytest.mark.asyncio
+    async def test_process_message_raises_on_api_error(self, agent: TravelAgent) -> None:
+        """An error payload from the API is raised as LlamaAPIError."""
+        agent.client = LlamaClient(
+            agent.api_url,
+            agent.api_key,
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json={"error": {"message": "quota"}})
+            ),
+        )
+        with pytest.raises(LlamaAPIError):
+            await agent.process_message("Hello")
+        await agent.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_message_commits_after_completion(self, agent: TravelAgent) -> None:
+        """Tokens are yielded as they arrive and memory is updated only at the end."""
+        agent.client = LlamaClient(
+            agent.api_url,
+            agent.api_key,
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=sse_stream("Par", "is"))
+            ),
+        )
+        history = agent.sessions.get_history(1, "trip")
+        tokens = []
+        async for token in agent.stream_message("Where to?", user_id=1, session_id="trip"):
+            tokens.append(token)
+            assert len(history.messages) == 0
+
+        assert tokens == ["Par", "is"]
+        assert [m.content for m in history.messages] == ["Where to?", "Paris"]
+        await agent.aclose()
+
+    def test_parse_stream_chunk_openai_shape(self) -> None:
+        """OpenAI-style deltas are understood as well as Llama events."""
+        chunk = {"choices": [{"delta": {"content": "Hi"}}]}
+        assert parse_stream_chunk(chunk) == "Hi"
+        assert parse_stream_chunk({"choices": [{"delta": {}}]}) == ""
@@ -0,0 +1,118 @@
+"""
+Unit tests for single-flight request coalescing.
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.langchain.agent import TravelAgent, LANGCHAIN_AVAILABLE
+from app.services.langchain.client import LlamaClient
+from app.services.langchain.coalescing import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_upstream_call(self) -> None:
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def upstream() -> str:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "result"
+
+        waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*waiters) == ["result"] * 5
+        assert calls == 1
+        assert flight.stats() == {"leaders": 1, "collapsed": 4, "abandoned": 0, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_exception_is_shared(self) -> None:
+        flight = SingleFlight()
+
+        async def upstream() -> str:
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flight.do("k", upstream), flight.do("k", upstream), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.leaders == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self) -> None:
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def upstream() -> str:
+            await release.wait()
+            return "result"
+
+        first = asyncio.create_task(flight.do("k", upstream))
+        second = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "result"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_upstream_is_cancelled_without_waiters(self) -> None:
+        abandoned = []
+        flight = SingleFlight(on_abandon=lambda: abandoned.append(1))
+        cancelled = asyncio.Event()
+
+        async def upstream() -> str:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "result"
+
+        waiter = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert len(flight) == 0
+        assert abandoned == [1]
+        assert flight.stats()["abandoned"] == 1
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_agent_collapses_identical_concurrent_prompts(monkeypatch) -> None:
+    """Identical first messages from many users reach the API once."""
+    monkeypatch.setenv("LLAMA_API_KEY", "secret")
+    agent = TravelAgent(model_name="test-model")
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"completion_message": {"content": {"text": "Pack light."}}})
+
+    agent.client = LlamaClient(agent.api_url, agent.api_key, transport=httpx.MockTransport(handler))
+
+    replies = await asyncio.gather(
+        *(agent.process_message("What should I pack?", user_id=user_id) for user_id in range(10))
+    )
+
+    assert replies == ["Pack light."] * 10
+    assert len(requests) == 1
+    assert agent.stats()["coalescing"]["collapsed"] == 9
+    await agent.aclose()
@@ -0,0 +1,126 @@
+"""
+Unit tests for the token-budgeted prompt window.
+"""
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.services.langchain.context import (
+    SUMMARY_PREFIX,
+    ContextWindow,
+    TokenCounter,
+    get_context_budget,
+)
+from app.services.langchain.memory import PydanticV2CompatibleChatMessageHistory
+
+
+class WordCounter(TokenCounter):
+    """Counts one token per word so budgets are easy to reason about."""
+
+    def _encode_len(self, text: str) -> int:
+        return len(text.split())
+
+
+def conversation(turns: int) -> list:
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question number {i}"))
+        messages.append(AIMessage(content=f"answer number {i}"))
+    return messages
+
+
+class TestTokenCounter:
+    """Test cases for TokenCounter."""
+
+    def test_counts_are_cached(self) -> None:
+        counter = WordCounter()
+        calls = []
+        original = counter._encode_len
+        counter._encode_len = lambda text: calls.append(text) or original(text)
+
+        assert counter.count("a b c") == 3
+        assert counter.count("a b c") == 3
+        assert calls == ["a b c"]
+
+    def test_counts_tokens(self) -> None:
+        assert TokenCounter().count("Best time to visit Tokyo?") > 0
+
+
+class TestContextWindow:
+    """Test cases for ContextWindow."""
+
+    def test_short_history_is_sent_verbatim(self) -> None:
+        window = ContextWindow(budget=1000, counter=WordCounter(), summary_max_tokens=50)
+        messages = window.build("system", conversation(2), "new")
+
+        assert [m["role"] for m in messages] == ["system", "user", "assistant", "user", "assistant", "user"]
+        assert messages[-1]["content"] == "new"
+
+    def test_old_turns_are_summarized_within_budget(self) -> None:
+        counter = WordCounter()
+        window = ContextWindow(budget=60, counter=counter, summary_max_tokens=20)
+        history = conversation(20)
+        messages = window.build("system", history, "new", state_key="s")
+
+        total = sum(counter.count_message(m["content"]) for m in messages)
+        assert total <= 60
+        assert messages[1]["content"].startswith(SUMMARY_PREFIX)
+        # The most recent turn is always kept verbatim
+        assert messages[-2]["content"] == "answer number 19"
+
+    def test_summary_is_extended_incrementally(self) -> None:
+        folded = []
+
+        def summarizer(summary: str, messages) -> str:
+            folded.append([m.content for m in messages])
+            return (summary + " " if summary else "") + f"{len(messages)} msgs"
+
+        window = ContextWindow(budget=60, counter=WordCounter(), summary_max_tokens=20, summarizer=summarizer)
+        history = conversation(20)
+        window.build("system", history, "new", state_key="s")
+        first = len(folded[0])
+
+        history += conversation(1)
+        window.build("system", history, "newer", state_key="s")
+
+        # Only the messages that just left the window are summarized again
+        assert len(folded) == 2
+        assert len(folded[1]) == 2
+        assert sum(len(batch) for batch in folded) == first + 2
+
+    def test_summary_rebuilt_when_history_was_trimmed(self) -> None:
+        window = ContextWindow(budget=60, counter=WordCounter(), summary_max_tokens=20)
+        history = conversation(20)
+        window.build("system", history, "new", state_key="s")
+
+        trimmed = history[6:]
+        messages = window.build("system", trimmed, "new", state_key="s")
+        assert "question number 0" not in messages[1]["content"]
+
+
+    def test_summary_stays_incremental_at_the_history_cap(self) -> None:
+        folded = []
+
+        def summarizer(summary: str, messages) -> str:
+            folded.append([m.content for m in messages])
+            return (summary + " " if summary else "") + f"{len(messages)} msgs"
+
+        window = ContextWindow(budget=60, counter=WordCounter(), summary_max_tokens=20, summarizer=summarizer)
+        history = PydanticV2CompatibleChatMessageHistory(max_messages=12)
+        for turn in range(12):
+            history.add_turn(f"question number {turn}", f"answer number {turn}")
+            window.build("system", history.messages, "new", state_key="s", offset=history.offset)
+
+        # The history sits at its cap and loses its head every turn, yet each
+        # turn only folds the two messages that just left the window
+        assert len(history) == 12 and history.offset == 12
+        assert [len(batch) for batch in folded[1:]] == [2] * (len(folded) - 1)
+        # Nothing was folded twice
+        assert sum(len(batch) for batch in folded) == window._summaries.get("s").folded
+
+
+def test_budget_per_model(monkeypatch) -> None:
+    monkeypatch.setattr(
+        "app.services.langchain.context.settings.LLM_CONTEXT_TOKEN_BUDGETS", {"small": 100}
+    )
+    monkeypatch.setattr("app.services.langchain.context.settings.LLM_DEFAULT_CONTEXT_TOKEN_BUDGET", 42)
+    assert get_context_budget("small") == 100
+    assert get_context_budget("other") == 42
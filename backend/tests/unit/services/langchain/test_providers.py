@@ -0,0 +1,236 @@
+"""
+Unit tests for the LLM provider registry and router.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.langchain.admission import Priority
+from app.services.langchain.agent import TravelAgent, LANGCHAIN_AVAILABLE
+from app.services.langchain.cache import make_cache_key
+from app.services.langchain.client import LlamaClient
+from app.services.langchain.providers import (
+    LLMProvider,
+    OpenAICompatibleProvider,
+    ProviderRouter,
+    StaticProvider,
+    create_router,
+    parse_completion,
+)
+
+
+class FakeProvider(LLMProvider):
+    """Provider answering with its name, or failing when ``fail`` is set."""
+
+    def __init__(self, name: str, fail: bool = False, fallback_only: bool = False) -> None:
+        super().__init__()
+        self.name = name
+        self.fail = fail
+        self.fallback_only = fallback_only
+        self.calls: List[Dict[str, Any]] = []
+
+    async def complete(self, payload: Dict[str, Any]) -> str:
+        self.calls.append(payload)
+        if self.fail:
+            raise httpx.ConnectError("down")
+        return self.name
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        self.calls.append(payload)
+        if self.fail:
+            raise httpx.ConnectError("down")
+        yield self.name
+
+
+def router_for(*providers: LLMProvider, **kwargs: Any) -> ProviderRouter:
+    return ProviderRouter(list(providers), min_samples=2, max_error_rate=0.5, window=10, **kwargs)
+
+
+class TestParseCompletion:
+    """Test cases for parse_completion."""
+
+    def test_both_response_shapes(self) -> None:
+        assert parse_completion({"completion_message": {"content": {"text": "a"}}}) == "a"
+        assert parse_completion({"choices": [{"message": {"content": "b"}}]}) == "b"
+
+
+class TestProviderRouter:
+    """Test cases for ProviderRouter."""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_on_failure(self) -> None:
+        router = router_for(FakeProvider("primary", fail=True), FakeProvider("backup"))
+
+        assert (await router.complete({})).text == "backup"
+        assert router.fallbacks == 1
+        assert router.stats()["providers"]["primary"]["error_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_raises_when_every_provider_fails(self) -> None:
+        router = router_for(FakeProvider("a", fail=True), FakeProvider("b", fail=True))
+        with pytest.raises(httpx.ConnectError):
+            await router.complete({})
+
+    def test_ranks_measured_providers_by_latency(self) -> None:
+        slow, fast = FakeProvider("slow"), FakeProvider("fast")
+        router = router_for(slow, fast)
+        assert [p.name for p in router.rank()] == ["slow", "fast"]  # Registration order when cold
+
+        for _ in range(2):
+            router._stats["slow"].record(True, 2.0)
+            router._stats["fast"].record(True, 0.2)
+
+        assert [p.name for p in router.rank()] == ["fast", "slow"]
+
+    def test_unhealthy_and_fallback_only_providers_go_last(self) -> None:
+        local = FakeProvider("local", fallback_only=True)
+        flaky, steady = FakeProvider("flaky"), FakeProvider("steady")
+        router = router_for(local, flaky, steady)
+        for _ in range(2):
+            router._stats["flaky"].record(True, 0.1)
+            router._stats["steady"].record(True, 1.0)
+        for _ in range(3):
+            router._stats["flaky"].record(False)
+
+        assert [p.name for p in router.rank()] == ["steady", "flaky", "local"]
+
+    @pytest.mark.asyncio
+    async def test_cheap_requests_go_to_the_cheap_provider(self) -> None:
+        router = router_for(FakeProvider("large"), FakeProvider("small"), cheap_provider="small")
+
+        assert (await router.complete({}, cheap=True)).text == "small"
+        assert (await router.complete({})).text == "large"
+
+    @pytest.mark.asyncio
+    async def test_stream_falls_back_before_first_token(self) -> None:
+        router = router_for(FakeProvider("primary", fail=True), StaticProvider("offline"))
+
+        chunks = [chunk async for chunk in router.stream({})]
+        assert [chunk.text for chunk in chunks] == ["offline"]
+        assert chunks[0].provider.fallback_only
+
+    def test_unknown_cheap_provider_is_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            router_for(FakeProvider("a"), cheap_provider="b")
+
+
+class TestCreateRouter:
+    """Test cases for create_router."""
+
+    def test_builds_configured_providers(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "LLM_PROVIDERS", ["llama", "openai", "local"])
+        router = create_router("https://llm.test/v1/chat/completions", "secret")
+
+        assert list(router.providers) == ["llama", "openai", "local"]
+        assert router.get("openai").model == settings.OPENAI_COMPAT_MODEL
+
+    def test_rejects_unknown_provider(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "LLM_PROVIDERS", ["llama", "nope"])
+        with pytest.raises(ValueError):
+            create_router("https://llm.test/v1/chat/completions", "secret")
+
+    @pytest.mark.asyncio
+    async def test_openai_compatible_provider_overrides_model(self) -> None:
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["body"] = request.read()
+            return httpx.Response(200, json={"choices": [{"message": {"content": "hola"}}]})
+
+        provider = OpenAICompatibleProvider(
+            "http://oss.test/v1/chat/completions",
+            None,
+            model="small-model",
+            client=LlamaClient(
+                "http://oss.test/v1/chat/completions", None, transport=httpx.MockTransport(handler)
+            ),
+        )
+
+        assert await provider.complete({"model": "big-model", "messages": []}) == "hola"
+        assert json.loads(seen["body"])["model"] == "small-model"
+        await provider.aclose()
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_agent_falls_back_to_local_provider(monkeypatch) -> None:
+    """When the Llama API is down the local stand-in answers."""
+    monkeypatch.setenv("LLAMA_API_KEY", "secret")
+    monkeypatch.setattr(settings, "LLM_PROVIDERS", ["llama", "local"])
+    monkeypatch.setattr(settings, "LLM_RETRY_MAX_ATTEMPTS", 1)
+    agent = TravelAgent(model_name="test-model", temperature=0)
+    agent.client = LlamaClient(
+        agent.api_url, agent.api_key, transport=httpx.MockTransport(lambda request: httpx.Response(503))
+    )
+
+    reply = await agent.process_message("Is Lisbon nice in March?")
+
+    assert reply == settings.LLM_LOCAL_FALLBACK_MESSAGE
+    assert agent.stats()["providers"]["fallbacks"] == 1
+    # The stand-in answer is neither remembered nor cached
+    assert await agent.sessions.get_history(None, None).aget_messages() == []
+    assert agent.stats()["response_cache"]["entries"] == 0
+    await agent.aclose()
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_agent_caches_under_the_model_that_answered(monkeypatch) -> None:
+    """A cheap answer is not replayed to requests routed to the main model."""
+    monkeypatch.setenv("LLAMA_API_KEY", "secret")
+    agent = TravelAgent(model_name="big-model", temperature=0)
+    agent.semantic_cache = None
+    large, small = FakeProvider("large"), FakeProvider("small")
+    small.model = "small-model"
+    agent.router = router_for(large, small, cheap_provider="small")
+
+    assert await agent.process_message("thanks", session_id="a") == "small"
+    assert await agent.process_message("thanks", session_id="b") == "small"
+    assert len(small.calls) == 1  # Served from the cache, keyed on small-model
+
+    assert await agent.process_message("thanks", session_id="c", priority=Priority.NORMAL) == "large"
+    assert len(large.calls) == 1
+    await agent.aclose()
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_agent_caches_a_fallback_answer_under_the_fallback_model(monkeypatch) -> None:
+    monkeypatch.setenv("LLAMA_API_KEY", "secret")
+    monkeypatch.setattr(settings, "LLM_RETRY_MAX_ATTEMPTS", 1)
+    agent = TravelAgent(model_name="big-model", temperature=0)
+    agent.semantic_cache = None
+    primary, backup = FakeProvider("primary", fail=True), FakeProvider("backup")
+    backup.model = "backup-model"
+    agent.router = router_for(primary, backup)
+    stored = []
+    store = agent.response_cache.set
+
+    async def spy(key, value):
+        stored.append(key)
+        await store(key, value)
+
+    monkeypatch.setattr(agent.response_cache, "set", spy)
+
+    assert await agent.process_message("Is Lisbon nice in March?") == "backup"
+
+    routed = primary.calls[0]
+    assert stored == [make_cache_key({**routed, "model": "backup-model"})]
+    assert make_cache_key(routed) not in stored
+    await agent.aclose()
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_agent_without_a_llama_provider(monkeypatch) -> None:
+    monkeypatch.setenv("LLAMA_API_KEY", "secret")
+    monkeypatch.setattr(settings, "LLM_PROVIDERS", ["local"])
+    agent = TravelAgent(model_name="test-model")
+
+    assert agent.client is None
+    with pytest.raises(ValueError):
+        agent.client = LlamaClient(agent.api_url, agent.api_key)
+    await agent.aclose()
@@ -0,0 +1,104 @@
+"""
+Unit tests for the Redis-backed chat message history.
+
+These run against fakeredis, an in-process stand-in for a Redis server.
+"""
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.services.langchain.memory import RedisChatMessageHistory
+from app.services.langchain.sessions import RedisSessionBackend, SessionStore
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+class TestRedisChatMessageHistory:
+    """Test cases for RedisChatMessageHistory."""
+
+    def test_round_trips_messages(self, redis_client) -> None:
+        history = RedisChatMessageHistory(redis_client, "chat:1")
+        history.add_user_message("Best time to visit Tokyo?")
+        history.add_ai_message("Spring or autumn.")
+        history.add_system_message("Be brief.")
+
+        assert [(m.type, m.content) for m in history.messages] == [
+            ("human", "Best time to visit Tokyo?"),
+            ("ai", "Spring or autumn."),
+            ("system", "Be brief."),
+        ]
+        assert len(history) == 3
+
+    def test_serializes_compactly(self, redis_client) -> None:
+        history = RedisChatMessageHistory(redis_client, "chat:1")
+        history.add_user_message("hi")
+        assert redis_client.lrange("chat:1", 0, -1) == [b'{"t":"h","c":"hi"}']
+
+    def test_add_turn_uses_one_pipeline(self, redis_client, monkeypatch) -> None:
+        history = RedisChatMessageHistory(redis_client, "chat:1", max_messages=10, ttl=60)
+        executed = []
+        original = redis_client.pipeline
+
+        def pipeline(*args, **kwargs):
+            pipe = original(*args, **kwargs)
+            execute = pipe.execute
+            pipe.execute = lambda *a, **kw: executed.append(1) or execute(*a, **kw)
+            return pipe
+
+        monkeypatch.setattr(redis_client, "pipeline", pipeline)
+        history.add_turn("question", "answer")
+
+        assert executed == [1]
+        assert [m.content for m in history.messages] == ["question", "answer"]
+
+    def test_trims_and_expires(self, redis_client) -> None:
+        history = RedisChatMessageHistory(redis_client, "chat:1", max_messages=4, ttl=60)
+        for i in range(3):
+            history.add_turn(f"q{i}", f"a{i}")
+
+        assert [m.content for m in history.messages] == ["q1", "a1", "q2", "a2"]
+        assert 0 < redis_client.ttl("chat:1") <= 60
+        assert 0 < redis_client.ttl("chat:1:count") <= 60
+
+    def test_offset_counts_trimmed_messages(self, redis_client) -> None:
+        history = RedisChatMessageHistory(redis_client, "chat:1", max_messages=4)
+        for i in range(3):
+            history.add_turn(f"q{i}", f"a{i}")
+
+        offset, messages = history.window()
+        assert offset == 2
+        assert [m.content for m in messages] == ["q1", "a1", "q2", "a2"]
+
+        history.clear()
+        assert history.window() == (0, [])
+
+    def test_clear(self, redis_client) -> None:
+        history = RedisChatMessageHistory(redis_client, "chat:1")
+        history.add_turn("q", "a")
+        history.clear()
+        assert history.messages == []
+
+    @pytest.mark.asyncio
+    async def test_async_helpers(self, redis_client) -> None:
+        history = RedisChatMessageHistory(redis_client, "chat:1")
+        await history.aadd_turn("q", "a")
+        assert [m.content for m in await history.aget_messages()] == ["q", "a"]
+        offset, messages = await history.aget_window()
+        assert offset == 0 and len(messages) == 2
+
+
+def test_sessions_are_shared_between_backends(redis_client) -> None:
+    """Two workers pointing at the same Redis see the same conversation."""
+    worker_a = SessionStore(RedisSessionBackend(client=redis_client))
+    worker_b = SessionStore(RedisSessionBackend(client=redis_client))
+
+    worker_a.get_history(7, "trip").add_turn("Paris in May?", "Lovely.")
+
+    assert [m.content for m in worker_b.get_history(7, "trip").messages] == ["Paris in May?", "Lovely."]
+    assert worker_b.get_history(8, "trip").messages == []
+
+    worker_b.clear(7, "trip")
+    assert worker_a.get_history(7, "trip").messages == []
@@ -0,0 +1,220 @@
+"""
+Unit tests for retries, circuit breaking and hedging of LLM calls.
+"""
+import asyncio
+import json
+from typing import List, Union
+
+import httpx
+import pytest
+
+from app.services.langchain.agent import TravelAgent, LANGCHAIN_AVAILABLE
+from app.services.langchain.client import LlamaClient
+from app.services.langchain.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    RetryPolicy,
+)
+
+API_URL = "https://llm.test/v1/chat/completions"
+
+
+class FakeLLM:
+    """A scripted local LLM server.
+
+    Each request consumes the next script entry: an int is answered with that
+    status code, a float delays a successful answer by that many seconds.
+    Requests beyond the script succeed immediately.
+    """
+
+    def __init__(self, *script: Union[int, float]) -> None:
+        self.script: List[Union[int, float]] = list(script)
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        step = self.script.pop(0) if self.script else 200
+        if isinstance(step, float):
+            await asyncio.sleep(step)
+            step = 200
+        if step != 200:
+            return httpx.Response(step, json={"error": {"message": "fake failure"}})
+        text = f"answer {self.requests}"
+        return httpx.Response(200, json={"completion_message": {"content": {"text": text}}})
+
+    def client(self) -> LlamaClient:
+        return LlamaClient(API_URL, "secret", transport=httpx.MockTransport(self))
+
+
+def no_wait_retries(attempts: int = 3) -> RetryPolicy:
+    return RetryPolicy(max_attempts=attempts, base_delay=0, max_delay=0)
+
+
+class TestRetries:
+    """Test cases for retries."""
+
+    @pytest.mark.asyncio
+    async def test_retryable_failures_are_retried(self) -> None:
+        fake = FakeLLM(503, 502)
+        client = fake.client()
+        caller = ResilientCaller(retry=no_wait_retries())
+
+        result = await caller.call(lambda: client.complete({}))
+
+        assert result["completion_message"]["content"]["text"] == "answer 3"
+        assert caller.retries == 2
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self) -> None:
+        fake = FakeLLM(400)
+        client = fake.client()
+        caller = ResilientCaller(retry=no_wait_retries())
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await caller.call(lambda: client.complete({}))
+
+        assert fake.requests == 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self) -> None:
+        fake = FakeLLM(503, 503, 503, 503)
+        client = fake.client()
+        caller = ResilientCaller(retry=no_wait_retries(attempts=3))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await caller.call(lambda: client.complete({}))
+
+        assert fake.requests == 3
+        await client.aclose()
+
+    def test_backoff_is_jittered_and_capped(self) -> None:
+        policy = RetryPolicy(max_attempts=5, base_delay=0.1, max_delay=0.3)
+        delays = [policy.backoff(4) for _ in range(50)]
+        assert all(0 <= d <= 0.3 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_backoff_honours_retry_after(self) -> None:
+        policy = RetryPolicy(max_attempts=3, base_delay=0, max_delay=5)
+        response = httpx.Response(429, headers={"Retry-After": "2"}, request=httpx.Request("POST", API_URL))
+        error = httpx.HTTPStatusError("busy", request=response.request, response=response)
+        assert policy.backoff(1, error) == 2
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_on_failure_rate_and_probes_after_cooldown(self) -> None:
+        breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, window=10, open_seconds=0.05)
+        for success in (True, False, True, False):
+            breaker.record_success() if success else breaker.record_failure()
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+        breaker._opened_at -= 1  # Cool-down elapsed
+        breaker.check()  # The probe goes through
+        assert breaker.state == "half_open"
+        with pytest.raises(CircuitOpenError):
+            breaker.check()  # Only one probe at a time
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_probe_reopens(self) -> None:
+        breaker = CircuitBreaker(failure_rate=0.5, min_calls=1, window=10, open_seconds=30)
+        breaker.record_failure()
+        breaker._opened_at -= 60
+        breaker.check()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.opened == 2
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_fails_fast(self) -> None:
+        fake = FakeLLM(*[503] * 10)
+        client = fake.client()
+        caller = ResilientCaller(
+            retry=no_wait_retries(attempts=1),
+            breaker=CircuitBreaker(failure_rate=0.5, min_calls=3, window=10, open_seconds=30),
+        )
+        for _ in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                await caller.call(lambda: client.complete({}))
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await caller.call(lambda: client.complete({}))
+
+        assert fake.requests == 3
+        assert exc_info.value.retry_after > 0
+        await client.aclose()
+
+
+class TestHedging:
+    """Test cases for hedged requests."""
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self) -> None:
+        fake = FakeLLM(1.0)
+        client = fake.client()
+        caller = ResilientCaller(
+            retry=no_wait_retries(), hedge=True, hedge_min_delay=0.01, hedge_min_samples=1
+        )
+        caller.latency.record(0.01)
+
+        result = await asyncio.wait_for(caller.call(lambda: client.complete({})), 0.5)
+
+        assert result["completion_message"]["content"]["text"] == "answer 2"
+        assert (caller.hedges, caller.hedge_wins) == (1, 1)
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_latency_samples(self) -> None:
+        fake = FakeLLM(0.05)
+        client = fake.client()
+        caller = ResilientCaller(hedge=True, hedge_min_delay=0.01, hedge_min_samples=5)
+
+        await caller.call(lambda: client.complete({}))
+
+        assert fake.requests == 1
+        await client.aclose()
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+class TestTravelAgentResilience:
+    """Test cases for resilience in TravelAgent."""
+
+    @pytest.fixture
+    def agent(self, monkeypatch) -> TravelAgent:
+        monkeypatch.setenv("LLAMA_API_KEY", "secret")
+        agent = TravelAgent(model_name="test-model")
+        agent.resilience = ResilientCaller(retry=no_wait_retries())
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_process_message_retries_transient_errors(self, agent: TravelAgent) -> None:
+        fake = FakeLLM(503)
+        agent.client = fake.client()
+
+        assert await agent.process_message("Rome in winter?") == "answer 2"
+        await agent.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_retries_before_first_token(self, agent: TravelAgent) -> None:
+        attempts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(json.loads(request.content))
+            if len(attempts) == 1:
+                return httpx.Response(502)
+            body = 'data: {"choices": [{"delta": {"content": "Hi"}}]}\n\ndata: [DONE]\n\n'
+            return httpx.Response(200, content=body.encode())
+
+        agent.client = LlamaClient(API_URL, "secret", transport=httpx.MockTransport(handler))
+
+        assert [t async for t in agent.stream_message("Hello there")] == ["Hi"]
+        assert len(attempts) == 2
+        await agent.aclose()
@@ -0,0 +1,122 @@
+"""
+Unit tests for the semantic LLM response cache.
+"""
+import json
+
+import httpx
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.langchain.agent import TravelAgent, LANGCHAIN_AVAILABLE
+from app.services.langchain.client import LlamaClient
+from app.services.langchain.semantic_cache import (
+    HashingEmbedder,
+    SemanticCache,
+    semantic_namespace,
+)
+
+# Maps known paraphrases onto the same direction, like a sentence embedding model would
+SYNONYMS = {"inexpensive": "cheap", "budget": "cheap"}
+
+
+def synonym_embedder(text: str) -> "np.ndarray":
+    words = " ".join(SYNONYMS.get(w, w) for w in text.lower().replace("?", "").split())
+    return HashingEmbedder(64)(words)
+
+
+class TestHashingEmbedder:
+    """Test cases for HashingEmbedder."""
+
+    def test_similar_questions_are_close(self) -> None:
+        embed = HashingEmbedder()
+        a, b = embed("Best time to visit Tokyo?"), embed("best time to visit tokyo")
+        assert np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)) == pytest.approx(1.0)
+
+    def test_word_order_matters(self) -> None:
+        """Reversed routes do not look identical."""
+        embed = HashingEmbedder()
+        a, b = embed("flights from Paris to Rome"), embed("flights from Rome to Paris")
+        assert np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)) < 0.92
+
+
+    def test_synonyms_are_not_matched(self) -> None:
+        """Real paraphrases need an embedding model; hashing only sees shared words."""
+        embed = HashingEmbedder()
+        a, b = embed("cheap flights to Paris in May"), embed("inexpensive May flights to Paris")
+        assert np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)) < 0.92
+
+
+class TestSemanticCache:
+    """Test cases for SemanticCache."""
+
+    @pytest.fixture
+    def cache(self) -> SemanticCache:
+        return SemanticCache(embedder=synonym_embedder, capacity=3, threshold=0.9, ttl=60)
+
+    @pytest.mark.asyncio
+    async def test_paraphrase_hits(self, cache: SemanticCache) -> None:
+        await cache.set(1, "cheap flights to Paris in May", "Try midweek departures.")
+
+        assert await cache.get(1, "inexpensive flights to Paris in May?") == "Try midweek departures."
+        assert await cache.get(1, "hotels in Rome") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_namespaces_are_isolated(self, cache: SemanticCache) -> None:
+        """A response is only reused under the same conversation context."""
+        await cache.set(1, "cheap flights to Paris", "answer")
+        assert await cache.get(2, "cheap flights to Paris") is None
+
+    @pytest.mark.asyncio
+    async def test_capacity_evicts_least_recently_used(self, cache: SemanticCache) -> None:
+        for text in ("visa for Japan", "visa for Chile", "visa for Kenya"):
+            await cache.set(1, text, text)
+        await cache.get(1, "visa for Japan")  # Refresh the oldest entry
+
+        await cache.set(1, "visa for Peru", "visa for Peru")
+
+        assert len(cache) == 3
+        assert cache.evictions == 1
+        assert await cache.get(1, "visa for Japan") == "visa for Japan"
+        assert await cache.get(1, "visa for Chile") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_miss(self) -> None:
+        cache = SemanticCache(embedder=synonym_embedder, capacity=2, threshold=0.9, ttl=0)
+        await cache.set(1, "cheap flights", "answer")
+        assert await cache.get(1, "cheap flights") is None
+
+    def test_namespace_ignores_only_the_new_message(self) -> None:
+        base = {"model": "m", "messages": [{"role": "system", "content": "s"}]}
+        a = {**base, "messages": base["messages"] + [{"role": "user", "content": "a"}]}
+        b = {**base, "messages": base["messages"] + [{"role": "user", "content": "b"}]}
+        c = {**b, "temperature": 0.2}
+        assert semantic_namespace(a) == semantic_namespace(b)
+        assert semantic_namespace(a) != semantic_namespace(c)
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+class TestTravelAgentSemanticCache:
+    """Test cases for the semantic cache in TravelAgent."""
+
+    @pytest.mark.asyncio
+    async def test_paraphrase_is_served_from_cache(self, monkeypatch) -> None:
+        monkeypatch.setenv("LLAMA_API_KEY", "secret")
+        agent = TravelAgent(model_name="test-model", temperature=0.0)
+        agent.semantic_cache = SemanticCache(embedder=synonym_embedder, capacity=10, threshold=0.9)
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, json={"completion_message": {"content": {"text": "Fly midweek."}}})
+
+        agent.client = LlamaClient(agent.api_url, agent.api_key, transport=httpx.MockTransport(handler))
+
+        await agent.process_message("cheap flights to Paris in May", session_id="a")
+        reply = await agent.process_message("budget flights to Paris in May?", session_id="b")
+
+        assert reply == "Fly midweek."
+        assert len(requests) == 1
+        assert agent.stats()["semantic_cache"]["hits"] == 1
+        await agent.aclose()
@@ -0,0 +1,103 @@
+"""
+Unit tests for per-user, per-session conversation storage.
+"""
+import json
+
+import httpx
+import pytest
+
+from app.core.cache import LRUCache
+from app.services.langchain.agent import TravelAgent, LANGCHAIN_AVAILABLE
+from app.services.langchain.client import LlamaClient
+from app.services.langchain.sessions import InMemorySessionBackend, SessionStore
+
+
+class TestLRUCache:
+    """Test cases for the shared LRU cache."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.evictions == 1
+
+    def test_expired_entries_are_dropped(self, monkeypatch) -> None:
+        now = [100.0]
+        monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(maxsize=10, ttl=5)
+        cache.set("a", 1)
+
+        now[0] += 4
+        assert cache.get("a") == 1
+        now[0] += 6
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestSessionStore:
+    """Test cases for SessionStore."""
+
+    def test_sessions_are_isolated_per_user_and_session(self) -> None:
+        store = SessionStore(InMemorySessionBackend(max_sessions=10))
+        store.get_history(1, "a").add_user_message("mine")
+
+        assert len(store.get_history(1, "a")) == 1
+        assert len(store.get_history(1, "b")) == 0
+        assert len(store.get_history(2, "a")) == 0
+
+    def test_default_session_id(self) -> None:
+        store = SessionStore(InMemorySessionBackend(max_sessions=10))
+        assert store.get_history(1) is store.get_history(1, "default")
+
+    def test_bounded_number_of_sessions(self) -> None:
+        backend = InMemorySessionBackend(max_sessions=2)
+        store = SessionStore(backend)
+        first = store.get_history(1)
+        store.get_history(2)
+        store.get_history(3)
+
+        assert len(backend) == 2
+        assert store.get_history(1) is not first
+
+    def test_history_length_is_capped(self) -> None:
+        store = SessionStore(InMemorySessionBackend(max_sessions=10, max_messages=4))
+        history = store.get_history(1)
+        for n in range(5):
+            history.add_turn(f"question {n}", f"answer {n}")
+            assert len(history) <= 4
+
+        assert [m.content for m in history.messages] == [
+            "question 3", "answer 3", "question 4", "answer 4",
+        ]
+
+    def test_clear(self) -> None:
+        store = SessionStore(InMemorySessionBackend(max_sessions=10))
+        store.get_history(1).add_user_message("hello")
+        store.clear(1)
+        assert len(store.get_history(1)) == 0
+
+
+@pytest.mark.skipif(not LANGCHAIN_AVAILABLE, reason="LangChain is not available")
+@pytest.mark.asyncio
+async def test_agent_only_sends_the_callers_history(monkeypatch) -> None:
+    """Each user's request only carries their own session history."""
+    monkeypatch.setenv("LLAMA_API_KEY", "secret")
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content)["messages"])
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    agent = TravelAgent(model_name="test-model")
+    agent.client = LlamaClient(agent.api_url, agent.api_key, transport=httpx.MockTransport(handler))
+
+    await agent.process_message("from alice", user_id=1)
+    await agent.process_message("from bob", user_id=2)
+
+    assert [m["content"] for m in sent[1]] == ["You are a helpful travel assistant.", "from bob"]
+    await agent.aclose()
@@ -6,6 +6,22 @@ interface Message {
   sender: 'user' | 'assistant';
 }
 
+interface StreamEvent {
+  event: string;
+  data: { token?: string; response?: string; detail?: string };
+}
+
+// Parse one Server-Sent Event block ("event: ..." / "data: ..." lines)
+const parseSseEvent = (raw: string): StreamEvent | null => {
+  let event = 'message';
+  let data = '';
+  for (const line of raw.split('\n')) {
+    if (line.startsWith('event:')) event = line.slice(6).trim();
+    else if (line.startsWith('data:')) data += line.slice(5).trim();
+  }
+  return data ? { event, data: JSON.parse(data) } : null;
+};
+
 const ChatWidget: React.FC = () => {
   const [messages, setMessages] = useState<Message[]>([
     {
@@ -16,6 +32,7 @@ const ChatWidget: React.FC = () => {
   ]);
   const [inputValue, setInputValue] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   // Auto-scroll to bottom of messages
@@ -39,30 +56,56 @@ const ChatWidget: React.FC = () => {
     setInputValue('');
     setIsLoading(true);
     
+    const assistantId = (Date.now() + 1).toString();
+
+    // Append a streamed token, creating the assistant message on the first one
+    const appendToken = (token: string) => {
+      setIsStreaming(true);
+      setMessages((prev) =>
+        prev.some((m) => m.id === assistantId)
+          ? prev.map((m) => (m.id === assistantId ? { ...m, text: m.text + token } : m))
+          : [...prev, { id: assistantId, text: token, sender: 'assistant' }]
+      );
+    };
+
     try {
-      // Call the backend API
-      const response = await fetch('http://localhost:8000/api/v1/chat', {
+      // Call the streaming backend API and render tokens as they arrive
+      const response = await fetch('http://localhost:8000/api/v1/chat/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          Accept: 'text/event-stream',
         },
         body: JSON.stringify({ text: inputValue }),
       });
       
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error('Failed to get response from server');
       }
       
-      const data = await response.json();
-      
-      // Add assistant's response
-      const assistantMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        text: data.response,
-        sender: 'assistant',
-      };
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
       
-      setMessages((prev) => [...prev, assistantMessage]);
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop() ?? '';
+        
+        for (const raw of events) {
+          const event = parseSseEvent(raw);
+          if (!event) continue;
+          if (event.event === 'error') {
+            throw new Error(event.data.detail ?? 'Streaming failed');
+          }
+          if (event.event === 'message' && event.data.token) {
+            appendToken(event.data.token);
+          }
+        }
+      }
     } catch (error) {
       console.error('Error:', error);
       const errorMessage: Message = {
@@ -73,6 +116,7 @@ const ChatWidget: React.FC = () => {
       setMessages((prev) => [...prev, errorMessage]);
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   };
 
@@ -96,7 +140,7 @@ const ChatWidget: React.FC = () => {
               </div>
             </div>
           ))}
-          {isLoading && (
+          {isLoading && !isStreaming && (
             <div className="message message-assistant">
               <div className="loading-dots">
                 <div className="loading-dot"></div>